@@ -1,7 +1,7 @@
 """Initial migration
 
 Revision ID: 001
-Revises: 
+Revises:
 Create Date: 2026-01-24 00:00:00.000000
 
 """
@@ -16,140 +16,133 @@ branch_labels = None
 depends_on = None
 
 
+# 所有初始表集中定义在同一个 MetaData 中，upgrade/downgrade 时通过
+# create_all/drop_all 一次性完成建表，由 SQLAlchemy 负责依赖排序
+metadata = sa.MetaData()
+
+sa.Table(
+    'schools',
+    metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+)
+
+sa.Table(
+    'users',
+    metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('role', sa.Enum('SYSTEM_ADMIN', 'SCHOOL_ADMIN', 'TEACHER', 'STUDENT', name='userrole'), nullable=False),
+    sa.Column('school_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('username'),
+    sa.Index('ix_users_id', 'id', unique=False),
+    sa.Index('ix_users_username', 'username', unique=True)
+)
+
+sa.Table(
+    'samples',
+    metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('image_path', sa.String(length=500), nullable=False),
+    sa.Column('original_filename', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PROCESSED', 'FAILED', name='samplestatus'), nullable=False),
+    sa.Column('extracted_region_path', sa.String(length=500), nullable=True),
+    sa.Column('sample_metadata', sa.Text(), nullable=True),
+    sa.Column('uploaded_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.Index('ix_samples_id', 'id', unique=False)
+)
+
+sa.Table(
+    'sample_regions',
+    metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sample_id', sa.Integer(), nullable=False),
+    sa.Column('bbox', sa.String(length=100), nullable=False),
+    sa.Column('is_auto_detected', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.ForeignKeyConstraint(['sample_id'], ['samples.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.Index('ix_sample_regions_id', 'id', unique=False)
+)
+
+sa.Table(
+    'recognition_logs',
+    metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('result', sa.Text(), nullable=False),
+    sa.Column('confidence', sa.Float(), nullable=False),
+    sa.Column('is_unknown', sa.Boolean(), nullable=True),
+    sa.Column('image_path', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.Index('ix_recognition_logs_id', 'id', unique=False)
+)
+
+sa.Table(
+    'models',
+    metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.String(length=50), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('accuracy', sa.Float(), nullable=True),
+    sa.Column('training_samples_count', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('model_metadata', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('version'),
+    sa.Index('ix_models_id', 'id', unique=False)
+)
+
+sa.Table(
+    'training_jobs',
+    metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', 'CANCELLED', name='trainingjobstatus'), nullable=False),
+    sa.Column('progress', sa.Float(), nullable=True),
+    sa.Column('model_version_id', sa.Integer(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.ForeignKeyConstraint(['model_version_id'], ['models.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.Index('ix_training_jobs_id', 'id', unique=False)
+)
+
+sa.Table(
+    'user_features',
+    metadata,
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('feature_vector', sa.Text(), nullable=False),
+    sa.Column('sample_ids', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id'),
+    sa.Index('ix_user_features_id', 'id', unique=False)
+)
+
+
 def upgrade() -> None:
-    # Create schools table
-    op.create_table(
-        'schools',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('name', sa.String(length=100), nullable=False),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('name')
-    )
-    
-    # Create users table
-    op.create_table(
-        'users',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('username', sa.String(length=50), nullable=False),
-        sa.Column('password_hash', sa.String(length=255), nullable=False),
-        sa.Column('role', sa.Enum('SYSTEM_ADMIN', 'SCHOOL_ADMIN', 'TEACHER', 'STUDENT', name='userrole'), nullable=False),
-        sa.Column('school_id', sa.Integer(), nullable=True),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
-        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
-        sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('username')
-    )
-    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
-    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
-    
-    # Create samples table
-    op.create_table(
-        'samples',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('image_path', sa.String(length=500), nullable=False),
-        sa.Column('original_filename', sa.String(length=255), nullable=False),
-        sa.Column('status', sa.Enum('PENDING', 'PROCESSED', 'FAILED', name='samplestatus'), nullable=False),
-        sa.Column('extracted_region_path', sa.String(length=500), nullable=True),
-        sa.Column('sample_metadata', sa.Text(), nullable=True),
-        sa.Column('uploaded_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
-        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_samples_id'), 'samples', ['id'], unique=False)
-    
-    # Create sample_regions table
-    op.create_table(
-        'sample_regions',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('sample_id', sa.Integer(), nullable=False),
-        sa.Column('bbox', sa.String(length=100), nullable=False),
-        sa.Column('is_auto_detected', sa.Integer(), nullable=True),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
-        sa.ForeignKeyConstraint(['sample_id'], ['samples.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_sample_regions_id'), 'sample_regions', ['id'], unique=False)
-    
-    # Create recognition_logs table
-    op.create_table(
-        'recognition_logs',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=True),
-        sa.Column('result', sa.Text(), nullable=False),
-        sa.Column('confidence', sa.Float(), nullable=False),
-        sa.Column('is_unknown', sa.Boolean(), nullable=True),
-        sa.Column('image_path', sa.String(length=500), nullable=True),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_recognition_logs_id'), 'recognition_logs', ['id'], unique=False)
-    
-    # Create models table
-    op.create_table(
-        'models',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('version', sa.String(length=50), nullable=False),
-        sa.Column('file_path', sa.String(length=500), nullable=False),
-        sa.Column('accuracy', sa.Float(), nullable=True),
-        sa.Column('training_samples_count', sa.Integer(), nullable=True),
-        sa.Column('is_active', sa.Boolean(), nullable=True),
-        sa.Column('model_metadata', sa.Text(), nullable=True),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('version')
-    )
-    op.create_index(op.f('ix_models_id'), 'models', ['id'], unique=False)
-    
-    # Create training_jobs table
-    op.create_table(
-        'training_jobs',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', 'CANCELLED', name='trainingjobstatus'), nullable=False),
-        sa.Column('progress', sa.Float(), nullable=True),
-        sa.Column('model_version_id', sa.Integer(), nullable=True),
-        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
-        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
-        sa.Column('error_message', sa.Text(), nullable=True),
-        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
-        sa.ForeignKeyConstraint(['model_version_id'], ['models.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_training_jobs_id'), 'training_jobs', ['id'], unique=False)
-    
-    # Create user_features table
-    op.create_table(
-        'user_features',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('feature_vector', sa.Text(), nullable=False),
-        sa.Column('sample_ids', sa.Text(), nullable=True),
-        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id'),
-        sa.UniqueConstraint('user_id')
-    )
-    op.create_index(op.f('ix_user_features_id'), 'user_features', ['id'], unique=False)
+    # 在迁移事务内一次性创建全部表及其索引
+    metadata.create_all(bind=op.get_bind(), checkfirst=False)
 
 
 def downgrade() -> None:
-    op.drop_index(op.f('ix_user_features_id'), table_name='user_features')
-    op.drop_table('user_features')
-    op.drop_index(op.f('ix_training_jobs_id'), table_name='training_jobs')
-    op.drop_table('training_jobs')
-    op.drop_index(op.f('ix_models_id'), table_name='models')
-    op.drop_table('models')
-    op.drop_index(op.f('ix_recognition_logs_id'), table_name='recognition_logs')
-    op.drop_table('recognition_logs')
-    op.drop_index(op.f('ix_sample_regions_id'), table_name='sample_regions')
-    op.drop_table('sample_regions')
-    op.drop_index(op.f('ix_samples_id'), table_name='samples')
-    op.drop_table('samples')
-    op.drop_index(op.f('ix_users_username'), table_name='users')
-    op.drop_index(op.f('ix_users_id'), table_name='users')
-    op.drop_table('users')
-    op.drop_table('schools')
+    metadata.drop_all(bind=op.get_bind(), checkfirst=False)
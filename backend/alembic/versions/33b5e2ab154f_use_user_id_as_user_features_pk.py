@@ -0,0 +1,55 @@
+"""Use user_id as the primary key of user_features
+
+Revision ID: 33b5e2ab154f
+Revises: bfd869867112
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '33b5e2ab154f'
+down_revision = 'bfd869867112'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'mysql':
+        # 单条 ALTER 完成：去掉代理主键 id 及其索引，user_id 由唯一索引改为主键
+        # （001 中未命名的 UNIQUE(user_id) 在 MySQL 中名为 user_id）
+        op.execute(
+            "ALTER TABLE user_features "
+            "DROP INDEX ix_user_features_id, "
+            "DROP PRIMARY KEY, "
+            "DROP COLUMN id, "
+            "ADD PRIMARY KEY (user_id), "
+            "DROP INDEX user_id"
+        )
+        return
+
+    op.drop_index('ix_user_features_id', table_name='user_features')
+    op.drop_constraint('user_features_pkey', 'user_features', type_='primary')
+    op.drop_column('user_features', 'id')
+    op.create_primary_key('user_features_pkey', 'user_features', ['user_id'])
+    op.drop_constraint('user_features_user_id_key', 'user_features', type_='unique')
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == 'mysql':
+        op.execute(
+            "ALTER TABLE user_features "
+            "DROP PRIMARY KEY, "
+            "ADD COLUMN id INTEGER NOT NULL AUTO_INCREMENT FIRST, "
+            "ADD PRIMARY KEY (id), "
+            "ADD UNIQUE INDEX user_id (user_id), "
+            "ADD INDEX ix_user_features_id (id)"
+        )
+        return
+
+    op.create_unique_constraint('user_features_user_id_key', 'user_features', ['user_id'])
+    op.drop_constraint('user_features_pkey', 'user_features', type_='primary')
+    op.add_column('user_features', sa.Column('id', sa.Integer(), sa.Identity(), nullable=False))
+    op.create_primary_key('user_features_pkey', 'user_features', ['id'])
+    op.create_index('ix_user_features_id', 'user_features', ['id'], unique=False)
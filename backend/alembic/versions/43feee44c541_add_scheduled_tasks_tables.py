@@ -8,6 +8,7 @@ Create Date: 2026-02-01 14:55:41.644771
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import mysql
+from app.utils.migration_helpers import create_index_nonblocking
 
 # revision identifiers, used by Alembic.
 revision = '43feee44c541'
@@ -99,7 +100,7 @@ def upgrade() -> None:
                nullable=True,
                existing_server_default=sa.text("'0'"))
     # Note: ix_api_tokens_user_id index is kept as it's needed for foreign key constraint
-    op.create_index(op.f('ix_api_tokens_id'), 'api_tokens', ['id'], unique=False)
+    create_index_nonblocking('ix_api_tokens_id', 'api_tokens', ['id'])
     op.add_column('training_jobs', sa.Column('scheduled_task_id', sa.Integer(), nullable=True, comment='定时任务ID'))
     op.create_foreign_key(None, 'training_jobs', 'scheduled_tasks', ['scheduled_task_id'], ['id'])
     # Note: user_id index on user_features is kept as it's needed for foreign key constraint
@@ -0,0 +1,35 @@
+"""Add composite indexes for scheduled task and execution listing
+
+Revision ID: 49226fc96e56
+Revises: 620093f4a8be
+Create Date: 2026-10-16 11:30:00.000000
+
+"""
+from alembic import op
+from app.utils.migration_helpers import create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = '49226fc96e56'
+down_revision = '620093f4a8be'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_nonblocking(
+        'ix_sched_school_status_created', 'scheduled_tasks', ['school_id', 'status', 'created_at']
+    )
+    create_index_nonblocking(
+        'ix_exec_task_started', 'scheduled_task_executions', ['scheduled_task_id', 'started_at']
+    )
+
+
+def downgrade() -> None:
+    # MySQL 在创建复合索引后会删除外键自动生成的单列索引，
+    # 需先补建单列索引，否则删除复合索引会因外键缺少索引而失败（错误 1553）
+    create_index_nonblocking(
+        'ix_scheduled_task_executions_scheduled_task_id', 'scheduled_task_executions', ['scheduled_task_id']
+    )
+    create_index_nonblocking('ix_scheduled_tasks_school_id', 'scheduled_tasks', ['school_id'])
+    op.drop_index('ix_exec_task_started', table_name='scheduled_task_executions')
+    op.drop_index('ix_sched_school_status_created', table_name='scheduled_tasks')
@@ -0,0 +1,39 @@
+"""Add covering indexes for auth lookups
+
+Revision ID: 501d8bd1427a
+Revises: 5a4d43ed9d23
+Create Date: 2026-10-16 07:30:00.000000
+
+"""
+from alembic import op
+from app.utils.migration_helpers import create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = '501d8bd1427a'
+down_revision = '5a4d43ed9d23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    context = op.get_context()
+    if context.dialect.name == 'postgresql':
+        # PostgreSQL: 只索引有效Token的部分索引 + INCLUDE覆盖索引
+        with context.autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY ix_api_tokens_lookup ON api_tokens (token) "
+                "WHERE is_active AND NOT is_revoked"
+            )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY ix_users_username_pwd ON users (username) "
+                "INCLUDE (password_hash, role)"
+            )
+    else:
+        # MySQL: 复合索引覆盖Token校验与登录查询的全部列
+        create_index_nonblocking('ix_api_tokens_lookup', 'api_tokens', ['token', 'is_active', 'is_revoked'])
+        create_index_nonblocking('ix_users_username_pwd', 'users', ['username', 'password_hash', 'role'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_username_pwd', table_name='users')
+    op.drop_index('ix_api_tokens_lookup', table_name='api_tokens')
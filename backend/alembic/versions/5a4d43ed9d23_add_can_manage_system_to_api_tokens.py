@@ -7,6 +7,7 @@ Create Date: 2026-02-02 04:30:19.842666
 """
 from alembic import op
 import sqlalchemy as sa
+from app.utils.migration_helpers import add_columns
 
 
 # revision identifiers, used by Alembic.
@@ -17,7 +18,7 @@ depends_on = None
 
 
 def upgrade() -> None:
-    op.add_column('api_tokens', sa.Column('can_manage_system', sa.Boolean(), nullable=False, server_default='0'))
+    add_columns('api_tokens', sa.Column('can_manage_system', sa.Boolean(), nullable=False, server_default='0'))
 
 
 def downgrade() -> None:
@@ -0,0 +1,30 @@
+"""Add composite indexes for sample listing
+
+Revision ID: 620093f4a8be
+Revises: eea167b22caa
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+from app.utils.migration_helpers import create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = '620093f4a8be'
+down_revision = 'eea167b22caa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_nonblocking('ix_samples_uploaded_at', 'samples', ['uploaded_at'])
+    create_index_nonblocking('ix_samples_user_uploaded', 'samples', ['user_id', 'uploaded_at'])
+    create_index_nonblocking('ix_samples_status_uploaded', 'samples', ['status', 'uploaded_at'])
+
+
+def downgrade() -> None:
+    # MySQL 在创建复合索引后会删除外键自动生成的 user_id 索引，
+    # 需先补建单列索引，否则删除复合索引会因外键缺少索引而失败（错误 1553）
+    create_index_nonblocking('ix_samples_user_id', 'samples', ['user_id'])
+    op.drop_index('ix_samples_status_uploaded', table_name='samples')
+    op.drop_index('ix_samples_user_uploaded', table_name='samples')
+    op.drop_index('ix_samples_uploaded_at', table_name='samples')
@@ -8,6 +8,7 @@ Create Date: 2026-01-31 14:52:00.000000
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import mysql
+from app.utils.migration_helpers import create_index_nonblocking
 
 # revision identifiers, used by Alembic.
 revision = '6b87c62d8e9a'
@@ -47,8 +48,8 @@ def upgrade() -> None:
         mysql_default_charset='utf8mb4',
         mysql_engine='InnoDB'
     )
-    op.create_index(op.f('ix_api_tokens_token'), 'api_tokens', ['token'], unique=True)
-    op.create_index(op.f('ix_api_tokens_user_id'), 'api_tokens', ['user_id'])
+    create_index_nonblocking('ix_api_tokens_token', 'api_tokens', ['token'], unique=True)
+    create_index_nonblocking('ix_api_tokens_user_id', 'api_tokens', ['user_id'])
 
 
 def downgrade() -> None:
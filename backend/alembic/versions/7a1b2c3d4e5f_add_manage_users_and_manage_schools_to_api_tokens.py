@@ -8,6 +8,7 @@ Create Date: 2026-02-01 00:00:00.000000
 from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.dialects import mysql
+from app.utils.migration_helpers import add_columns, drop_columns
 
 # revision identifiers, used by Alembic.
 revision = '7a1b2c3d4e5f'
@@ -17,20 +18,14 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # Add can_manage_users column before can_manage_training
-    op.add_column('api_tokens',
-        sa.Column('can_manage_users', mysql.TINYINT(), nullable=False, server_default='0')
-    )
-
-    # Add can_manage_schools column before can_manage_training
-    op.add_column('api_tokens',
-        sa.Column('can_manage_schools', mysql.TINYINT(), nullable=False, server_default='0')
+    # Add can_manage_users and can_manage_schools in a single ALTER TABLE
+    add_columns(
+        'api_tokens',
+        sa.Column('can_manage_users', mysql.TINYINT(), nullable=False, server_default='0'),
+        sa.Column('can_manage_schools', mysql.TINYINT(), nullable=False, server_default='0'),
     )
 
 
 def downgrade() -> None:
-    # Drop can_manage_users column
-    op.drop_column('api_tokens', 'can_manage_users')
-
-    # Drop can_manage_schools column
-    op.drop_column('api_tokens', 'can_manage_schools')
+    # Drop can_manage_users and can_manage_schools in a single ALTER TABLE
+    drop_columns('api_tokens', 'can_manage_users', 'can_manage_schools')
@@ -0,0 +1,86 @@
+"""Derive samples.original_filename from image_path
+
+Revision ID: 7b60cbdd53bd
+Revises: 501d8bd1427a
+Create Date: 2026-10-16 08:00:00.000000
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+from app.utils.migration_helpers import add_columns, drop_columns
+
+# revision identifiers, used by Alembic.
+revision = '7b60cbdd53bd'
+down_revision = '501d8bd1427a'
+branch_labels = None
+depends_on = None
+
+
+def _filename_from_image_path(image_path: str) -> str:
+    """从存储路径还原上传时的文件名（本迁移编写时的解析规则，固定在迁移中，不随应用代码变化）
+
+    此前的上传文件保存为 "{user_id}_{YYYYmmdd}_{HHMMSS}_{原文件名}"，去掉前缀即为原文件名；
+    不符合该格式的路径直接返回文件名部分。
+    """
+    basename = os.path.basename(image_path)
+    parts = basename.split("_", 3)
+    if len(parts) == 4 and all(part.isdigit() for part in parts[:3]):
+        return parts[3]
+    return basename
+
+
+samples = sa.table(
+    'samples',
+    sa.column('id', sa.Integer),
+    sa.column('image_path', sa.String),
+    sa.column('original_filename', sa.String),
+    sa.column('display_name', sa.String),
+)
+
+
+def upgrade() -> None:
+    add_columns('samples', sa.Column('display_name', sa.String(length=255), nullable=True))
+
+    # 只为无法从 image_path 还原文件名的行保留原文件名
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(samples.c.id, samples.c.image_path, samples.c.original_filename)
+    ).all()
+    mismatched = [
+        {'sample_id': row.id, 'name': row.original_filename}
+        for row in rows
+        if _filename_from_image_path(row.image_path) != row.original_filename
+    ]
+    if mismatched:
+        bind.execute(
+            samples.update()
+            .where(samples.c.id == sa.bindparam('sample_id'))
+            .values(display_name=sa.bindparam('name')),
+            mismatched
+        )
+
+    drop_columns('samples', 'original_filename')
+
+
+def downgrade() -> None:
+    add_columns('samples', sa.Column('original_filename', sa.String(length=255), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(samples.c.id, samples.c.image_path, samples.c.display_name)
+    ).all()
+    if rows:
+        bind.execute(
+            samples.update()
+            .where(samples.c.id == sa.bindparam('sample_id'))
+            .values(original_filename=sa.bindparam('name')),
+            [
+                {'sample_id': row.id, 'name': row.display_name or _filename_from_image_path(row.image_path)}
+                for row in rows
+            ]
+        )
+
+    op.alter_column('samples', 'original_filename', existing_type=sa.String(length=255), nullable=False)
+    drop_columns('samples', 'display_name')
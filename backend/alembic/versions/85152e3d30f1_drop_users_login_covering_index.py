@@ -0,0 +1,34 @@
+"""Drop the login covering index on users (username, password_hash, role)
+
+Revision ID: 85152e3d30f1
+Revises: ad6bcc21f799
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+from app.utils.migration_helpers import create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = '85152e3d30f1'
+down_revision = 'ad6bcc21f799'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 登录查询按 username 唯一索引取单行即可，覆盖索引收益很小，
+    # 却在索引中额外保存了一份密码哈希
+    op.drop_index('ix_users_username_pwd', table_name='users')
+
+
+def downgrade() -> None:
+    # 与 501d8bd1427a 中的登录覆盖索引定义一致
+    context = op.get_context()
+    if context.dialect.name == 'postgresql':
+        with context.autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY ix_users_username_pwd ON users (username) "
+                "INCLUDE (password_hash, role)"
+            )
+    else:
+        create_index_nonblocking('ix_users_username_pwd', 'users', ['username', 'password_hash', 'role'])
@@ -0,0 +1,27 @@
+"""Add (owner, id) indexes for keyset pagination of recognition and quota usage logs
+
+Revision ID: ad6bcc21f799
+Revises: eccd5b828a9a
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+from app.utils.migration_helpers import create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = 'ad6bcc21f799'
+down_revision = 'eccd5b828a9a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_nonblocking('ix_recognition_logs_user_id_id', 'recognition_logs', ['user_id', 'id'])
+    create_index_nonblocking('ix_quota_usage_user_id_id', 'quota_usage_logs', ['user_id', 'id'])
+    create_index_nonblocking('ix_quota_usage_school_id_id', 'quota_usage_logs', ['school_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quota_usage_school_id_id', table_name='quota_usage_logs')
+    op.drop_index('ix_quota_usage_user_id_id', table_name='quota_usage_logs')
+    op.drop_index('ix_recognition_logs_user_id_id', table_name='recognition_logs')
@@ -0,0 +1,118 @@
+"""Store users.role as SMALLINT and api_tokens permissions as a bitmask
+
+Revision ID: bfd869867112
+Revises: 7b60cbdd53bd
+Create Date: 2026-10-16 08:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.migration_helpers import add_columns, drop_columns, create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = 'bfd869867112'
+down_revision = '7b60cbdd53bd'
+branch_labels = None
+depends_on = None
+
+# 与 app.models.user.ROLE_CODES 保持一致
+ROLE_CODES = {
+    'SYSTEM_ADMIN': 0,
+    'SCHOOL_ADMIN': 1,
+    'TEACHER': 2,
+    'STUDENT': 3,
+}
+
+# 与 app.models.api_token.TokenPermission 保持一致: (列名, 权限位, 原默认值)
+PERMISSION_COLUMNS = [
+    ('can_read_samples', 0x01, '1'),
+    ('can_write_samples', 0x02, '0'),
+    ('can_recognize', 0x04, '0'),
+    ('can_read_users', 0x08, '1'),
+    ('can_manage_users', 0x10, '0'),
+    ('can_manage_schools', 0x20, '0'),
+    ('can_manage_training', 0x40, '0'),
+    ('can_manage_system', 0x80, '0'),
+]
+DEFAULT_PERMISSIONS = 0x01 | 0x08
+
+
+def _drop_login_index() -> None:
+    op.drop_index('ix_users_username_pwd', table_name='users')
+
+
+def _create_login_index() -> None:
+    # 与 501d8bd1427a 中的登录覆盖索引定义一致
+    context = op.get_context()
+    if context.dialect.name == 'postgresql':
+        with context.autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY ix_users_username_pwd ON users (username) "
+                "INCLUDE (password_hash, role)"
+            )
+    else:
+        create_index_nonblocking('ix_users_username_pwd', 'users', ['username', 'password_hash', 'role'])
+
+
+def upgrade() -> None:
+    # users.role: ENUM -> SMALLINT
+    add_columns('users', sa.Column('role_code', sa.SmallInteger(), nullable=True))
+    cases = " ".join(f"WHEN '{name}' THEN {code}" for name, code in ROLE_CODES.items())
+    op.execute(f"UPDATE users SET role_code = CASE role {cases} END")
+    _drop_login_index()
+    drop_columns('users', 'role')
+    op.alter_column(
+        'users', 'role_code',
+        new_column_name='role',
+        existing_type=sa.SmallInteger(),
+        nullable=False
+    )
+    _create_login_index()
+
+    # api_tokens.can_*: 8 个布尔列 -> permissions 位掩码
+    add_columns(
+        'api_tokens',
+        sa.Column('permissions', sa.Integer(), nullable=False, server_default=str(DEFAULT_PERMISSIONS))
+    )
+    mask_sql = " + ".join(
+        f"CASE WHEN {column} THEN {bit} ELSE 0 END" for column, bit, _ in PERMISSION_COLUMNS
+    )
+    op.execute(f"UPDATE api_tokens SET permissions = {mask_sql}")
+    drop_columns('api_tokens', *(column for column, _, _ in PERMISSION_COLUMNS))
+
+
+def downgrade() -> None:
+    add_columns(
+        'api_tokens',
+        *(
+            sa.Column(column, sa.Boolean(), nullable=False, server_default=default)
+            for column, _, default in PERMISSION_COLUMNS
+        )
+    )
+    api_tokens = sa.table(
+        'api_tokens',
+        sa.column('permissions', sa.Integer),
+        *(sa.column(column, sa.Boolean) for column, _, _ in PERMISSION_COLUMNS)
+    )
+    op.execute(
+        api_tokens.update().values({
+            column: api_tokens.c.permissions.op('&')(bit) != 0
+            for column, bit, _ in PERMISSION_COLUMNS
+        })
+    )
+    drop_columns('api_tokens', 'permissions')
+
+    role_enum = sa.Enum(*ROLE_CODES, name='userrole')
+    role_enum.create(op.get_bind(), checkfirst=True)
+    add_columns('users', sa.Column('role_name', role_enum, nullable=True))
+    cases = " ".join(f"WHEN {code} THEN '{name}'" for name, code in ROLE_CODES.items())
+    op.execute(f"UPDATE users SET role_name = CASE role {cases} END")
+    _drop_login_index()
+    drop_columns('users', 'role')
+    op.alter_column(
+        'users', 'role_name',
+        new_column_name='role',
+        existing_type=role_enum,
+        nullable=False
+    )
+    _create_login_index()
@@ -0,0 +1,106 @@
+"""Split sample_regions.bbox into coordinate columns
+
+Revision ID: c6a77ff683fc
+Revises: 33b5e2ab154f
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from app.utils.migration_helpers import add_columns, drop_columns
+
+# revision identifiers, used by Alembic.
+revision = 'c6a77ff683fc'
+down_revision = '33b5e2ab154f'
+branch_labels = None
+depends_on = None
+
+COORDINATE_COLUMNS = ('x', 'y', 'w', 'h')
+
+sample_regions = sa.table(
+    'sample_regions',
+    sa.column('id', sa.Integer),
+    sa.column('bbox', sa.String),
+    *(sa.column(name, sa.SmallInteger) for name in COORDINATE_COLUMNS)
+)
+
+
+def _parse_bbox(value):
+    """解析原 JSON 格式的 bbox，无法解析时返回全零区域"""
+    try:
+        bbox = json.loads(value)
+        return {
+            'x': int(round(bbox['x'])),
+            'y': int(round(bbox['y'])),
+            'w': int(round(bbox['width'])),
+            'h': int(round(bbox['height'])),
+        }
+    except (TypeError, ValueError, KeyError):
+        return {'x': 0, 'y': 0, 'w': 0, 'h': 0}
+
+
+def upgrade() -> None:
+    add_columns(
+        'sample_regions',
+        *(sa.Column(name, sa.SmallInteger(), nullable=True) for name in COORDINATE_COLUMNS)
+    )
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(sample_regions.c.id, sample_regions.c.bbox)).all()
+    if rows:
+        bind.execute(
+            sample_regions.update()
+            .where(sample_regions.c.id == sa.bindparam('region_id'))
+            .values({name: sa.bindparam(f'new_{name}') for name in COORDINATE_COLUMNS}),
+            [
+                {'region_id': row.id, **{f'new_{k}': v for k, v in _parse_bbox(row.bbox).items()}}
+                for row in rows
+            ]
+        )
+
+    for name in COORDINATE_COLUMNS:
+        op.alter_column('sample_regions', name, existing_type=sa.SmallInteger(), nullable=False)
+
+    op.execute("UPDATE sample_regions SET is_auto_detected = 1 WHERE is_auto_detected IS NULL")
+    op.alter_column(
+        'sample_regions', 'is_auto_detected',
+        type_=sa.Boolean(),
+        existing_type=sa.Integer(),
+        nullable=False,
+        server_default=sa.true()
+    )
+    drop_columns('sample_regions', 'bbox')
+
+
+def downgrade() -> None:
+    add_columns('sample_regions', sa.Column('bbox', sa.String(length=100), nullable=True))
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(sample_regions.c.id, *(sample_regions.c[name] for name in COORDINATE_COLUMNS))
+    ).all()
+    if rows:
+        bind.execute(
+            sample_regions.update()
+            .where(sample_regions.c.id == sa.bindparam('region_id'))
+            .values(bbox=sa.bindparam('new_bbox')),
+            [
+                {
+                    'region_id': row.id,
+                    'new_bbox': json.dumps({'x': row.x, 'y': row.y, 'width': row.w, 'height': row.h}),
+                }
+                for row in rows
+            ]
+        )
+
+    op.alter_column('sample_regions', 'bbox', existing_type=sa.String(length=100), nullable=False)
+    op.alter_column(
+        'sample_regions', 'is_auto_detected',
+        type_=sa.Integer(),
+        existing_type=sa.Boolean(),
+        nullable=True,
+        server_default=None
+    )
+    drop_columns('sample_regions', *COORDINATE_COLUMNS)
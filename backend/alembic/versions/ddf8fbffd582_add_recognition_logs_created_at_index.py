@@ -0,0 +1,23 @@
+"""Add index on recognition_logs.created_at
+
+Revision ID: ddf8fbffd582
+Revises: c6a77ff683fc
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+from app.utils.migration_helpers import create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = 'ddf8fbffd582'
+down_revision = 'c6a77ff683fc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_nonblocking('ix_recognition_logs_created_at', 'recognition_logs', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recognition_logs_created_at', table_name='recognition_logs')
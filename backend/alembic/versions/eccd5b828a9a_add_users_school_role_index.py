@@ -0,0 +1,26 @@
+"""Add composite index on users (school_id, role)
+
+Revision ID: eccd5b828a9a
+Revises: 49226fc96e56
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+from app.utils.migration_helpers import create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = 'eccd5b828a9a'
+down_revision = '49226fc96e56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_nonblocking('ix_users_school_role', 'users', ['school_id', 'role'])
+
+
+def downgrade() -> None:
+    # MySQL 在创建复合索引后会删除外键自动生成的 school_id 索引，
+    # 需先补建单列索引，否则删除复合索引会因外键缺少索引而失败（错误 1553）
+    create_index_nonblocking('ix_users_school_id', 'users', ['school_id'])
+    op.drop_index('ix_users_school_role', table_name='users')
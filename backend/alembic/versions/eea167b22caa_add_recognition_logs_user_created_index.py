@@ -0,0 +1,28 @@
+"""Add composite index on recognition_logs (user_id, created_at)
+
+Revision ID: eea167b22caa
+Revises: ddf8fbffd582
+Create Date: 2026-10-16 10:30:00.000000
+
+"""
+from alembic import op
+from app.utils.migration_helpers import create_index_nonblocking
+
+# revision identifiers, used by Alembic.
+revision = 'eea167b22caa'
+down_revision = 'ddf8fbffd582'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_nonblocking(
+        'ix_recognition_logs_user_created', 'recognition_logs', ['user_id', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    # MySQL 在创建复合索引后会删除外键自动生成的 user_id 索引，
+    # 需先补建单列索引，否则删除复合索引会因外键缺少索引而失败（错误 1553）
+    create_index_nonblocking('ix_recognition_logs_user_id', 'recognition_logs', ['user_id'])
+    op.drop_index('ix_recognition_logs_user_created', table_name='recognition_logs')
@@ -1,15 +1,42 @@
-from .auth import router as auth_router
-from .users import router as users_router
-from .training import router as training_router
-from .recognition import router as recognition_router
-from .schools import router as schools_router
-from .samples import router as samples_router
-from .config import router as config_router
-from .system import router as system_router
-from .token import router as token_router, token_management_router as tokens_management_router
-from .scheduled_tasks import router as scheduled_tasks_router
-from .quotas import router as quotas_router
-from .monitoring import router as monitoring_router
+"""
+API路由
+
+路由模块在首次访问时才导入（PEP 562 模块级 __getattr__），
+只导入 app.api 包或其中个别模块的场景（脚本、迁移、测试）不会加载其余路由。
+注意：app.main 会挂载全部路由，服务进程启动时仍会导入所有路由模块，
+启动时间和内存占用并不因此减少；`from app.api import *` 同样会导入全部路由。
+"""
+import importlib
+
+# 导出名称 -> (模块名, 属性名)
+_LAZY_ROUTERS = {
+    "auth_router": ("auth", "router"),
+    "users_router": ("users", "router"),
+    "training_router": ("training", "router"),
+    "recognition_router": ("recognition", "router"),
+    "schools_router": ("schools", "router"),
+    "samples_router": ("samples", "router"),
+    "config_router": ("config", "router"),
+    "system_router": ("system", "router"),
+    "token_router": ("token", "router"),
+    "tokens_management_router": ("token", "token_management_router"),
+    "scheduled_tasks_router": ("scheduled_tasks", "router"),
+    "quotas_router": ("quotas", "router"),
+    "monitoring_router": ("monitoring", "router"),
+}
+
+
+def __getattr__(name):
+    try:
+        module_name, attr = _LAZY_ROUTERS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, attr)
+    # 缓存到模块全局变量，后续访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "auth_router",
@@ -1,24 +1,49 @@
 from datetime import timedelta, datetime
 from typing import Optional
+from anyio import from_thread
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from pydantic import BaseModel, field_serializer
+from pydantic import BaseModel, ConfigDict
 from ..core.database import get_db
 from ..core.config import settings
+from ..models.school import School
 from ..models.user import User
-from ..utils.security import verify_password, get_password_hash, create_access_token
-from ..utils.dependencies import get_current_user, CurrentUserResponse, _get_current_user
+from ..utils.security import (
+    get_password_hash,
+    averify_password,
+    averify_credentials,
+    aget_password_hash,
+    create_access_token,
+    decode_access_token,
+    add_token_to_blacklist,
+)
+from ..utils.dependencies import get_current_user, CurrentUserResponse, _get_current_user, oauth2_scheme
 
 router = APIRouter(prefix="/auth", tags=["认证"])
 
+# 用户不存在时用于校验的占位哈希
+_DUMMY_PASSWORD_HASH = get_password_hash("dummy-password")
+
+# 登录查询语句在模块加载时构建一次，只查询认证所需的列；
+# 语句结构固定，编译结果由引擎的语句缓存复用
+_LOGIN_LOOKUP_STMT = select(User.username, User.password_hash, User.role).where(
+    User.username == bindparam("username")
+)
+
 
 class Token(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str
 
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: int
     username: str
     nickname: Optional[str] = None
@@ -28,38 +53,31 @@ class UserResponse(BaseModel):
     is_switched: bool = False  # 是否为切换后的用户
     original_user_id: Optional[int] = None  # 原始管理员用户ID
 
-    @field_serializer('created_at', mode='wrap')
-    def serialize_datetime(self, value: Optional[datetime], _info):
-        """序列化datetime字段为ISO格式字符串"""
-        return value.isoformat() if value else None
-
-    class Config:
-        from_attributes = True
-
 
 @router.post("/login", response_model=Token)
-async def login(
+def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    """用户登录"""
-    user = db.query(User).filter(User.username == form_data.username).first()
-    
-    # 详细的错误提示
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="用户不存在，请检查用户名是否正确",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not verify_password(form_data.password, user.password_hash):
+    """用户登录
+
+    同步处理函数：数据库查询由FastAPI在线程池中执行，避免阻塞事件循环；
+    密码校验提交到进程池中执行，多个登录请求可并行利用多核。
+    """
+    user = db.execute(_LOGIN_LOOKUP_STMT, {"username": form_data.username}).first()
+
+    # 用户不存在时同样执行一次密码校验，保证响应时间一致，避免用户名枚举
+    hash_to_check = user.password_hash if user else _DUMMY_PASSWORD_HASH
+    password_ok = from_thread.run(
+        averify_credentials, form_data.username, form_data.password, hash_to_check
+    )
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="密码错误，请检查密码是否正确",
+            detail="用户名或密码错误",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username, "role": user.role.value},
@@ -76,19 +94,16 @@ class UserRegister(BaseModel):
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(
+def register(
     user_data: UserRegister,
     db: Session = Depends(get_db)
 ):
-    """用户注册"""
-    # 检查用户名是否已存在
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="用户名已存在"
-        )
-    
+    """用户注册
+
+    直接执行 INSERT，由 username 唯一约束原子地拦截重复用户名（不再预先查询）；
+    数据库支持 RETURNING 时在同一次往返中取回生成的 id 与 created_at，否则（如 MySQL）
+    按主键读回数据库生成的 created_at，保证与之后查询到的值一致。
+    """
     # 验证角色
     from ..models.user import UserRole
     try:
@@ -98,19 +113,43 @@ async def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"无效的角色: {user_data.role}"
         )
-    
-    # 创建新用户
-    new_user = User(
+
+    stmt = insert(User).values(
         username=user_data.username,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=from_thread.run(aget_password_hash, user_data.password),
         role=role,
-        school_id=user_data.school_id
+        school_id=user_data.school_id,
+    )
+    try:
+        if db.get_bind().dialect.insert_returning:
+            row = db.execute(stmt.returning(User.id, User.created_at)).one()
+            user_id, created_at = row.id, row.created_at
+        else:
+            user_id = db.execute(stmt).inserted_primary_key[0]
+            created_at = db.execute(select(User.created_at).where(User.id == user_id)).scalar_one()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # 插入失败后再判断违反的约束：只有用户名重复才提示"用户名已存在"
+        if db.execute(select(User.id).where(User.username == user_data.username)).first():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="用户名已存在"
+            )
+        if user_data.school_id is not None and db.get(School, user_data.school_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="学校不存在"
+            )
+        raise
+
+    return UserResponse(
+        id=user_id,
+        username=user_data.username,
+        role=role.value,
+        school_id=user_data.school_id,
+        created_at=created_at,
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    return new_user
 
 
 @router.get("/me", response_model=UserResponse)
@@ -120,16 +159,28 @@ async def get_current_user_info(current_user: CurrentUserResponse = Depends(get_
 
 
 class LogoutResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     message: str
     success: bool
 
 
 @router.post("/logout", response_model=LogoutResponse)
-async def logout(original_user: User = Depends(_get_current_user), db: Session = Depends(get_db)):
+def logout(
+    original_user: User = Depends(_get_current_user),
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
     """用户登出
 
-    清除切换状态。前端应该删除本地存储的token。
+    将当前JWT令牌加入黑名单并清除切换状态。前端应该删除本地存储的token。
     """
+    # 将JWT令牌加入黑名单（API Token通过撤销接口管理）
+    if token and not token.startswith("hwtk_"):
+        payload = decode_access_token(token)
+        if payload:
+            add_token_to_blacklist(token, payload.get("exp"))
+
     # 清除切换状态
     if original_user.switched_user_id:
         original_user.switched_user_id = None
@@ -148,12 +199,14 @@ class PasswordChangeRequest(BaseModel):
 
 
 class PasswordChangeResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     message: str
     success: bool
 
 
 @router.post("/change-password", response_model=PasswordChangeResponse)
-async def change_password(
+def change_password(
     password_data: PasswordChangeRequest,
     current_user: User = Depends(_get_current_user),
     db: Session = Depends(get_db)
@@ -163,7 +216,7 @@ async def change_password(
     需要验证旧密码是否正确，然后更新为新密码。
     """
     # 验证旧密码
-    if not verify_password(password_data.old_password, current_user.password_hash):
+    if not from_thread.run(averify_password, password_data.old_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="原密码错误，请重新输入"
@@ -177,7 +230,7 @@ async def change_password(
         )
 
     # 更新密码
-    current_user.password_hash = get_password_hash(password_data.new_password)
+    current_user.password_hash = from_thread.run(aget_password_hash, password_data.new_password)
     db.commit()
 
     return PasswordChangeResponse(
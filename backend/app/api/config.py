@@ -1,20 +1,49 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+import hashlib
+from functools import lru_cache
+from typing import Tuple
+from fastapi import APIRouter, Request, Response
+from pydantic import BaseModel, ConfigDict
 from ..core.config import settings
+from ..utils.reloadable import on_settings_reload
 
 router = APIRouter(prefix="/config", tags=["配置"])
 
 
 class ConfigResponse(BaseModel):
     """Configuration response"""
+    model_config = ConfigDict(frozen=True)
+
     max_upload_size: int
     max_upload_size_mb: int
 
 
+@lru_cache(maxsize=4)
+def _build_config(max_upload_size: int) -> Tuple[bytes, str]:
+    """构建序列化后的配置响应及其ETag（以配置值为键缓存，配置重载后自动生成新值）"""
+    config = ConfigResponse(
+        max_upload_size=max_upload_size,
+        max_upload_size_mb=max_upload_size // (1024 * 1024)
+    )
+    body = config.model_dump_json().encode()
+    etag = '"' + hashlib.md5(body).hexdigest() + '"'
+    return body, etag
+
+
+on_settings_reload(_build_config.cache_clear)
+
+
 @router.get("", response_model=ConfigResponse)
-async def get_config():
-    """获取系统配置"""
-    return ConfigResponse(
-        max_upload_size=settings.MAX_UPLOAD_SIZE,
-        max_upload_size_mb=settings.MAX_UPLOAD_SIZE // (1024 * 1024)
+async def get_config(request: Request):
+    """获取系统配置
+
+    直接返回缓存的JSON字节，跳过FastAPI对响应模型的再次校验与序列化。
+    """
+    body, etag = _build_config(settings.MAX_UPLOAD_SIZE)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "public, max-age=3600"}
     )
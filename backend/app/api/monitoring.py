@@ -3,20 +3,185 @@
 提供性能指标、日志查询和系统健康检查
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import func, select, text
 from sqlalchemy.orm import Session
-from ..core.database import get_db
+from ..core.database import get_db, engine
 from ..middleware.performance import metrics_collector
 from ..utils.structured_logger import get_structured_logger
+from ..utils.ttl_cache import TTLCache
+from ..utils.cache import get_cache
+from ..services.inference_client import get_inference_client
 from ..core.config import settings
+from typing import Callable, Iterator, Tuple
+import asyncio
+import json
 import psutil
 import os
+import time
 
 router = APIRouter(prefix="/api/monitoring", tags=["monitoring"])
 
 logger = get_structured_logger(__name__, log_dir=settings.UPLOAD_DIR.replace('uploads', 'logs'))
 
+# 监控汇总结果缓存，仪表盘高频轮询时避免重复聚合；
+# 键包含客户端传入的指标名称，限制条目数，避免任意指标名使缓存无限增长
+_metrics_cache = TTLCache(ttl=lambda: settings.METRICS_CACHE_TTL_SECONDS, maxsize=256)
+
+# 系统资源快照：由后台任务定期刷新，健康检查直接读取，避免在请求中阻塞采样
+HEALTH_SNAPSHOT_INTERVAL = 2.0
+_process = psutil.Process(os.getpid())
+_health_snapshot: Dict[str, Any] = {}
+
+
+def refresh_health_snapshot() -> Dict[str, Any]:
+    """采集一次系统资源使用情况并更新快照"""
+    global _health_snapshot
+
+    # interval=None 返回自上次调用以来的CPU使用率，不阻塞
+    cpu_percent = psutil.cpu_percent(interval=None)
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage(settings.UPLOAD_DIR)
+
+    _health_snapshot = {
+        "cpu_percent": cpu_percent,
+        "memory": {
+            "total": memory.total,
+            "available": memory.available,
+            "percent": memory.percent,
+            "used": memory.used
+        },
+        "disk": {
+            "total": disk.total,
+            "used": disk.used,
+            "free": disk.free,
+            "percent": disk.percent
+        },
+        "process": {
+            "pid": _process.pid,
+            "memory_percent": _process.memory_percent(),
+            "create_time": datetime.fromtimestamp(_process.create_time()).isoformat(),
+            "status": _process.status()
+        }
+    }
+    return _health_snapshot
+
+
+async def run_health_snapshotter(interval: float = HEALTH_SNAPSHOT_INTERVAL) -> None:
+    """后台任务：定期刷新系统资源快照（在应用生命周期内运行）"""
+    while True:
+        try:
+            await asyncio.to_thread(refresh_health_snapshot)
+        except Exception as e:
+            logger.error(f"刷新系统资源快照失败: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+# 组件连通性探测：后台定期探测并缓存结果，健康检查的调用频率不会传导到下游服务
+COMPONENT_PROBE_INTERVAL = 5.0
+COMPONENT_PROBE_TIMEOUT = 2.0
+# 超过该时长未刷新的探测结果视为未知
+COMPONENT_STATUS_MAX_AGE = 15.0
+_component_status: Dict[str, Tuple[str, float]] = {}
+
+
+def _probe_database() -> str:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return "healthy"
+
+
+def _probe_redis() -> str:
+    cache = get_cache()
+    if not cache.use_redis:
+        # Redis不可用时缓存已降级为内存缓存
+        return "unavailable"
+    cache.redis_client.ping()
+    return "healthy"
+
+
+async def _probe_inference_service() -> str:
+    ready = await get_inference_client().is_ready(COMPONENT_PROBE_TIMEOUT)
+    return "healthy" if ready else "unhealthy"
+
+
+async def probe_components() -> None:
+    """探测各依赖组件并记录结果及探测时间"""
+    probes = {
+        "database": asyncio.to_thread(_probe_database),
+        "inference_service": _probe_inference_service(),
+        "redis": asyncio.to_thread(_probe_redis),
+    }
+    results = await asyncio.gather(*probes.values(), return_exceptions=True)
+    checked_at = time.monotonic()
+    for name, result in zip(probes, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"组件 {name} 健康探测失败: {str(result)}")
+            result = "unhealthy"
+        _component_status[name] = (result, checked_at)
+
+
+def get_component_status() -> Dict[str, str]:
+    """读取缓存的组件状态（过期或尚未探测的组件返回 unknown）"""
+    now = time.monotonic()
+    statuses = {}
+    for name in ("database", "inference_service", "redis"):
+        value, checked_at = _component_status.get(name, ("unknown", 0.0))
+        statuses[name] = value if now - checked_at <= COMPONENT_STATUS_MAX_AGE else "unknown"
+    return statuses
+
+
+async def run_component_prober(interval: float = COMPONENT_PROBE_INTERVAL) -> None:
+    """后台任务：定期探测依赖组件（在应用生命周期内运行）"""
+    while True:
+        try:
+            await probe_components()
+        except Exception as e:
+            logger.error(f"组件健康探测失败: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+def tail_lines(
+    path: str,
+    limit: int,
+    predicate: Optional[Callable[[bytes], bool]] = None,
+    chunk_size: int = 65536
+) -> Iterator[str]:
+    """
+    从文件末尾向前按块读取，依次返回（最新在前）满足条件的行
+
+    只读取找到 limit 条匹配行所需的尾部数据，不随文件大小线性增长。
+
+    Args:
+        path: 文件路径
+        limit: 最多返回的行数
+        predicate: 行过滤函数（作用于未解码的原始字节），为空时返回所有非空行
+        chunk_size: 每次向前读取的字节数
+    """
+    found = 0
+    with open(path, 'rb') as f:
+        position = os.fstat(f.fileno()).st_size
+        remainder = b''
+        while position > 0 and found < limit:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            lines = block.split(b'\n')
+            # 第一段可能是被块边界截断的行，留到下一轮与更前面的数据拼接
+            remainder = lines.pop(0) if position > 0 else b''
+            for raw in reversed(lines):
+                raw = raw.strip()
+                if not raw or (predicate and not predicate(raw)):
+                    continue
+                # 只解码通过过滤的行
+                yield raw.decode('utf-8', errors='replace')
+                found += 1
+                if found >= limit:
+                    return
+
 
 @router.get("/metrics")
 async def get_metrics(
@@ -35,6 +200,11 @@ async def get_metrics(
     Returns:
         性能指标数据
     """
+    cache_key = ("metrics", metric_name, minutes, format_type)
+    cached = _metrics_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         if metric_name:
             # 获取特定指标
@@ -45,10 +215,7 @@ async def get_metrics(
                 metrics = {
                     "metric_name": metric_name,
                     "time_range_minutes": minutes,
-                    "count": len(metrics_collector.get_metrics(metric_name, minutes)),
-                    "average": metrics_collector.get_average(metric_name, minutes),
-                    "p95": metrics_collector.get_percentile(metric_name, 95, minutes),
-                    "p99": metrics_collector.get_percentile(metric_name, 99, minutes)
+                    **metrics_collector.get_summary(metric_name, minutes)
                 }
         else:
             # 获取所有关键指标的汇总
@@ -58,21 +225,18 @@ async def get_metrics(
                 "http_errors_total"
             ]
 
-            metrics = {}
-            for key_metric in key_metrics:
-                raw_data = metrics_collector.get_metrics(key_metric, minutes)
-                metrics[key_metric] = {
-                    "count": len(raw_data),
-                    "average": metrics_collector.get_average(key_metric, minutes),
-                    "p95": metrics_collector.get_percentile(key_metric, 95, minutes),
-                    "p99": metrics_collector.get_percentile(key_metric, 99, minutes)
-                }
+            metrics = {
+                key_metric: metrics_collector.get_summary(key_metric, minutes)
+                for key_metric in key_metrics
+            }
 
-        return {
+        result = {
             "success": True,
             "data": metrics,
             "timestamp": datetime.utcnow().isoformat()
         }
+        _metrics_cache.set(cache_key, result)
+        return result
 
     except Exception as e:
         logger.error(f"获取性能指标失败: {str(e)}", exc_info=True)
@@ -96,46 +260,11 @@ async def health_check(detailed: bool = False):
     }
 
     if detailed:
-        # 检查系统资源
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-
-        # 检查磁盘使用
-        disk = psutil.disk_usage(settings.UPLOAD_DIR)
-
-        # 检查进程状态
-        process = psutil.Process(os.getpid())
-
-        health_status.update({
-            "system": {
-                "cpu_percent": cpu_percent,
-                "memory": {
-                    "total": memory.total,
-                    "available": memory.available,
-                    "percent": memory.percent,
-                    "used": memory.used
-                },
-                "disk": {
-                    "total": disk.total,
-                    "used": disk.used,
-                    "free": disk.free,
-                    "percent": disk.percent
-                },
-                "process": {
-                    "pid": process.pid,
-                    "memory_percent": process.memory_percent(),
-                    "create_time": datetime.fromtimestamp(process.create_time()).isoformat(),
-                    "status": process.status()
-                }
-            }
-        })
+        # 读取后台任务维护的资源快照（尚未生成时即时采集一次）
+        health_status["system"] = _health_snapshot or refresh_health_snapshot()
 
-        # 检查各组件状态
-        health_status["components"] = {
-            "database": "unknown",  # TODO: 实现数据库连接检查
-            "inference_service": "unknown",  # TODO: 实现推理服务连接检查
-            "redis": "unknown"  # TODO: 实现Redis连接检查
-        }
+        # 读取后台任务缓存的组件状态
+        health_status["components"] = get_component_status()
 
     return health_status
 
@@ -162,10 +291,7 @@ async def query_logs(
         日志记录列表
     """
     try:
-        # 这里需要实现日志查询逻辑
-        # 由于使用的是文件日志，需要读取并解析日志文件
-        # 简化实现：返回最近的日志条目
-
+        # 使用文件日志，从文件末尾向前读取最近的日志条目
         log_file = settings.UPLOAD_DIR.replace('uploads', 'logs') + "/backend.log"
 
         if not os.path.exists(log_file):
@@ -176,29 +302,31 @@ async def query_logs(
                 "timestamp": datetime.utcnow().isoformat()
             }
 
-        # 读取并过滤日志
-        logs = []
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if len(logs) >= limit:
-                    break
-
-                # 简单的关键词过滤
-                if keyword and keyword.lower() not in line.lower():
-                    continue
-
-                # 简单的级别过滤
-                if level and level not in line:
-                    continue
-
-                logs.append(line.strip())
-
-        return {
-            "success": True,
-            "data": logs,
-            "count": len(logs),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        # 最新的日志在前
+        # 过滤条件只编码一次，逐行比较原始字节，未指定关键词时不做大小写转换
+        level_bytes = level.encode() if level else None
+        keyword_bytes = keyword.lower().encode('utf-8') if keyword else None
+
+        def matches(raw: bytes) -> bool:
+            # 简单的级别过滤
+            if level_bytes and level_bytes not in raw:
+                return False
+            # 简单的关键词过滤
+            if keyword_bytes and keyword_bytes not in raw.lower():
+                return False
+            return True
+
+        def generate() -> Iterator[str]:
+            # 边读取边输出，首批匹配行读到即可开始发送，无需在内存中拼出完整列表
+            count = 0
+            yield '{"success": true, "data": ['
+            for line in tail_lines(log_file, limit, matches):
+                yield (", " if count else "") + json.dumps(line, ensure_ascii=False)
+                count += 1
+            yield f'], "count": {count}, "timestamp": {json.dumps(datetime.utcnow().isoformat())}}}'
+
+        # 同步生成器由Starlette在线程池中迭代，文件读取不阻塞事件循环
+        return StreamingResponse(generate(), media_type="application/json")
 
     except Exception as e:
         logger.error(f"查询日志失败: {str(e)}", exc_info=True)
@@ -213,31 +341,30 @@ async def get_statistics(db: Session = Depends(get_db)):
     Returns:
         系统统计数据
     """
+    cached = _metrics_cache.get(("stats",))
+    if cached is not None:
+        return cached
+
     try:
         from ..models.user import User
         from ..models.sample import Sample
         from ..models.recognition_log import RecognitionLog
         from ..models.training_job import TrainingJob
 
-        # 统计用户数量
-        total_users = db.query(User).count()
-
-        # 统计样本数量
-        total_samples = db.query(Sample).count()
-
-        # 统计识别次数
-        total_recognitions = db.query(RecognitionLog).count()
-
-        # 统计训练任务数量
-        total_trainings = db.query(TrainingJob).count()
-
-        # 统计最近24小时的识别次数
+        # 所有计数合并为一条带标量子查询的SELECT，一次数据库往返
         yesterday = datetime.utcnow() - timedelta(days=1)
-        recent_recognitions = db.query(RecognitionLog).filter(
-            RecognitionLog.created_at >= yesterday
-        ).count()
-
-        return {
+        counts = db.execute(select(
+            select(func.count()).select_from(User).scalar_subquery(),
+            select(func.count()).select_from(Sample).scalar_subquery(),
+            select(func.count()).select_from(RecognitionLog).scalar_subquery(),
+            select(func.count()).select_from(TrainingJob).scalar_subquery(),
+            select(func.count()).select_from(RecognitionLog).where(
+                RecognitionLog.created_at >= yesterday
+            ).scalar_subquery(),
+        )).one()
+        total_users, total_samples, total_recognitions, total_trainings, recent_recognitions = counts
+
+        result = {
             "success": True,
             "data": {
                 "users": {
@@ -256,6 +383,8 @@ async def get_statistics(db: Session = Depends(get_db)):
             },
             "timestamp": datetime.utcnow().isoformat()
         }
+        _metrics_cache.set(("stats",), result)
+        return result
 
     except Exception as e:
         logger.error(f"获取统计信息失败: {str(e)}", exc_info=True)
@@ -275,6 +404,7 @@ async def clear_old_metrics(hours: int = Query(24, ge=1, le=168)):
     """
     try:
         metrics_collector.clear_old_metrics(hours)
+        _metrics_cache.clear()
 
         logger.info(f"已清理{hours}小时前的性能指标数据")
 
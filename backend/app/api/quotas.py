@@ -1,6 +1,6 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, load_only
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -86,6 +86,10 @@ class QuotaUsageLogResponse(BaseModel):
 
 # ==================== Helper Functions ====================
 
+# 列表查询只投影响应所需的列，避免构建完整的ORM对象
+_QUOTA_RESPONSE_COLUMNS = tuple(getattr(Quota, name) for name in QuotaResponse.model_fields)
+
+
 def _quota_to_response(quota: Quota) -> QuotaResponse:
     """将Quota对象转换为响应模型"""
     return QuotaResponse(
@@ -113,6 +117,52 @@ def _quota_to_response(quota: Quota) -> QuotaResponse:
     )
 
 
+def load_quota_with_owner(
+    quota_id: int,
+    db: Session = Depends(get_db)
+) -> Tuple[Quota, Optional[User]]:
+    """
+    依赖项：一次JOIN查询同时加载配额及其所属用户
+
+    学校配额没有所属用户，此时返回的用户为 None。
+    """
+    row = (
+        db.query(Quota, User)
+        .outerjoin(User, User.id == Quota.user_id)
+        .options(load_only(User.id, User.school_id))
+        .filter(Quota.id == quota_id)
+        .first()
+    )
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="配额不存在"
+        )
+
+    return row
+
+
+def _check_school_admin_access(
+    quota: Quota,
+    owner: Optional[User],
+    current_user: CurrentUserResponse,
+    detail: str
+) -> None:
+    """检查学校管理员是否有权操作该配额（只能操作本校的配额）"""
+    if quota.quota_type == "user":
+        if not owner or owner.school_id != current_user.school_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+    elif quota.quota_type == "school" and quota.school_id != current_user.school_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=detail
+        )
+
+
 # ==================== API Endpoints ====================
 
 @router.get("", response_model=List[QuotaResponse])
@@ -174,25 +224,18 @@ async def list_quotas(
         if school_id:
             query = query.filter(Quota.school_id == school_id)
 
-    quotas = query.all()
-    return [_quota_to_response(q) for q in quotas]
+    # 数据来自数据库，可信任，直接构造响应模型跳过校验
+    rows = query.with_entities(*_QUOTA_RESPONSE_COLUMNS).all()
+    return [QuotaResponse.model_construct(**row._asdict()) for row in rows]
 
 
 @router.get("/{quota_id}", response_model=QuotaResponse)
 async def get_quota(
-    quota_id: int,
-    db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(get_current_user)
+    current_user: CurrentUserResponse = Depends(get_current_user),
+    quota_and_owner: Tuple[Quota, Optional[User]] = Depends(load_quota_with_owner)
 ):
     """获取单个配额详情"""
-    quota = db.query(Quota).filter(Quota.id == quota_id).first()
-
-    if not quota:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="配额不存在"
-        )
-
+    quota, owner = quota_and_owner
     # 权限检查
     if current_user.role == UserRole.STUDENT:
         raise HTTPException(
@@ -208,18 +251,7 @@ async def get_quota(
             )
 
     elif current_user.role == UserRole.SCHOOL_ADMIN:
-        if quota.quota_type == "user":
-            user = db.query(User).filter(User.id == quota.user_id).first()
-            if not user or user.school_id != current_user.school_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="无权查看该配额"
-                )
-        elif quota.quota_type == "school" and quota.school_id != current_user.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权查看该配额"
-            )
+        _check_school_admin_access(quota, owner, current_user, "无权查看该配额")
 
     return _quota_to_response(quota)
 
@@ -244,12 +276,14 @@ async def create_quota(
             detail="学校配额必须指定school_id"
         )
 
-    # 检查是否已存在
-    existing = db.query(Quota).filter(
-        Quota.quota_type == request.quota_type,
-        Quota.user_id == request.user_id,
-        Quota.school_id == request.school_id
-    ).first()
+    # 检查是否已存在（EXISTS查询，无需加载整行）
+    existing = db.query(
+        db.query(Quota).filter(
+            Quota.quota_type == request.quota_type,
+            Quota.user_id == request.user_id,
+            Quota.school_id == request.school_id
+        ).exists()
+    ).scalar()
 
     if existing:
         raise HTTPException(
@@ -279,38 +313,20 @@ async def create_quota(
 
 @router.put("/{quota_id}", response_model=QuotaResponse)
 async def update_quota(
-    quota_id: int,
     request: QuotaRequest,
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(get_current_user)
+    current_user: CurrentUserResponse = Depends(get_current_user),
+    quota_and_owner: Tuple[Quota, Optional[User]] = Depends(load_quota_with_owner)
 ):
     """更新配额"""
-    quota = db.query(Quota).filter(Quota.id == quota_id).first()
-
-    if not quota:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="配额不存在"
-        )
-
+    quota, owner = quota_and_owner
     # 权限检查
     if current_user.role == UserRole.SYSTEM_ADMIN:
         # 系统管理员可以更新所有配额
         pass
     elif current_user.role == UserRole.SCHOOL_ADMIN:
         # 学校管理员只能更新自己学校的配额
-        if quota.quota_type == "user":
-            user = db.query(User).filter(User.id == quota.user_id).first()
-            if not user or user.school_id != current_user.school_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="无权更新该配额"
-                )
-        elif quota.quota_type == "school" and quota.school_id != current_user.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权更新该配额"
-            )
+        _check_school_admin_access(quota, owner, current_user, "无权更新该配额")
     else:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -355,25 +371,18 @@ async def batch_update_quotas(
                 description=request.description
             )
         elif current_user.role == UserRole.SCHOOL_ADMIN:
-            # 学校管理员只能更新自己学校的用户配额
-            valid_user_ids = [
-                user.id for user in db.query(User.id).filter(
-                    User.id.in_(request.user_ids),
-                    User.school_id == current_user.school_id
-                ).all()
-            ]
-
-            if valid_user_ids:
-                updated_count += QuotaService.batch_update_user_quotas(
-                    db=db,
-                    user_ids=valid_user_ids,
-                    minute_limit=request.minute_limit,
-                    hour_limit=request.hour_limit,
-                    day_limit=request.day_limit,
-                    month_limit=request.month_limit,
-                    total_limit=request.total_limit,
-                    description=request.description
-                )
+            # 学校管理员只能更新自己学校的用户配额（在UPDATE语句中过滤）
+            updated_count += QuotaService.batch_update_user_quotas(
+                db=db,
+                user_ids=request.user_ids,
+                minute_limit=request.minute_limit,
+                hour_limit=request.hour_limit,
+                day_limit=request.day_limit,
+                month_limit=request.month_limit,
+                total_limit=request.total_limit,
+                description=request.description,
+                restrict_school_id=current_user.school_id
+            )
         else:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -404,36 +413,18 @@ async def batch_update_quotas(
 
 @router.post("/{quota_id}/reset", response_model=QuotaResponse)
 async def reset_quota(
-    quota_id: int,
     request: QuotaResetRequest,
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(get_current_user)
+    current_user: CurrentUserResponse = Depends(get_current_user),
+    quota_and_owner: Tuple[Quota, Optional[User]] = Depends(load_quota_with_owner)
 ):
     """重置配额使用次数"""
-    quota = db.query(Quota).filter(Quota.id == quota_id).first()
-
-    if not quota:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="配额不存在"
-        )
-
+    quota, owner = quota_and_owner
     # 权限检查
     if current_user.role == UserRole.SYSTEM_ADMIN:
         pass
     elif current_user.role == UserRole.SCHOOL_ADMIN:
-        if quota.quota_type == "user":
-            user = db.query(User).filter(User.id == quota.user_id).first()
-            if not user or user.school_id != current_user.school_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="无权重置该配额"
-                )
-        elif quota.quota_type == "school" and quota.school_id != current_user.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权重置该配额"
-            )
+        _check_school_admin_access(quota, owner, current_user, "无权重置该配额")
     else:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -443,7 +434,7 @@ async def reset_quota(
     # 重置配额
     quota = QuotaService.reset_quota_usage(
         db=db,
-        quota_id=quota_id,
+        quota_id=quota.id,
         reset_type=request.reset_type
     )
 
@@ -452,19 +443,12 @@ async def reset_quota(
 
 @router.delete("/{quota_id}")
 async def delete_quota(
-    quota_id: int,
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(require_system_admin)
+    current_user: CurrentUserResponse = Depends(require_system_admin),
+    quota_and_owner: Tuple[Quota, Optional[User]] = Depends(load_quota_with_owner)
 ):
     """删除配额（仅系统管理员）"""
-    quota = db.query(Quota).filter(Quota.id == quota_id).first()
-
-    if not quota:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="配额不存在"
-        )
-
+    quota, _ = quota_and_owner
     db.delete(quota)
     db.commit()
 
@@ -473,20 +457,18 @@ async def delete_quota(
 
 @router.get("/{quota_id}/logs", response_model=List[QuotaUsageLogResponse])
 async def get_quota_logs(
-    quota_id: int,
+    response: Response,
     limit: int = Query(100, ge=1, le=1000),
+    before_id: Optional[int] = Query(None, description="只返回ID小于该值的日志（用于向前翻页）"),
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(get_current_user)
+    current_user: CurrentUserResponse = Depends(get_current_user),
+    quota_and_owner: Tuple[Quota, Optional[User]] = Depends(load_quota_with_owner)
 ):
-    """获取配额使用日志"""
-    quota = db.query(Quota).filter(Quota.id == quota_id).first()
-
-    if not quota:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="配额不存在"
-        )
+    """获取配额使用日志
 
+    按ID倒序进行键集分页，下一页的游标通过 X-Next-Before-Id 响应头返回。
+    """
+    quota, owner = quota_and_owner
     # 权限检查
     if current_user.role == UserRole.STUDENT:
         raise HTTPException(
@@ -502,25 +484,17 @@ async def get_quota_logs(
             )
 
     elif current_user.role == UserRole.SCHOOL_ADMIN:
-        if quota.quota_type == "user":
-            user = db.query(User).filter(User.id == quota.user_id).first()
-            if not user or user.school_id != current_user.school_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="无权查看该配额日志"
-                )
-        elif quota.quota_type == "school" and quota.school_id != current_user.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权查看该配额日志"
-            )
+        _check_school_admin_access(quota, owner, current_user, "无权查看该配额日志")
 
     # 获取日志
     logs = QuotaService.get_quota_usage_logs(
         db=db,
         user_id=quota.user_id if quota.quota_type == "user" else None,
         school_id=quota.school_id if quota.quota_type == "school" else None,
-        limit=limit
+        limit=limit,
+        before_id=before_id
     )
 
+    if logs:
+        response.headers["X-Next-Before-Id"] = str(logs[-1]["id"])
     return [QuotaUsageLogResponse(**log) for log in logs]
@@ -1,20 +1,25 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from datetime import datetime
-import os
-import shutil
+import orjson
 from ..core.database import get_db
 from ..core.config import settings
 from ..models.recognition_log import RecognitionLog
 from ..models.user import UserRole
 from ..utils.dependencies import require_teacher_or_above, get_current_user, CurrentUserResponse
-from ..utils.validators import validate_upload_file
-from ..services.inference_client import InferenceClient
+from ..utils.ttl_cache import TTLCache
+from ..utils.validators import validate_upload_content_type, upload_too_large_error, UPLOAD_CHUNK_SIZE
+from ..services.inference_client import get_inference_client
 from ..services.quota_service import QuotaService
 
-router = APIRouter(prefix="/recognition", tags=["识别"])
+router = APIRouter(prefix="/recognition", tags=["识别"], default_response_class=ORJSONResponse)
+
+# 识别日志列表缓存：读多写少，短时间内的重复轮询直接复用结果；写入新日志时清空
+# 键来自客户端的分页参数，限制条目数，避免不同的分页组合使缓存无限增长
+_logs_cache = TTLCache(ttl=lambda: settings.RECOGNITION_LOGS_CACHE_TTL_SECONDS, maxsize=256)
 
 
 class RecognitionResult(BaseModel):
@@ -38,8 +43,8 @@ async def recognize(
     current_user: CurrentUserResponse = Depends(require_teacher_or_above)
 ):
     """识别单张图片"""
-    # 验证文件类型和大小
-    await validate_upload_file(file, settings.MAX_UPLOAD_SIZE)
+    # 验证文件类型（大小在读取上传内容时校验）
+    validate_upload_content_type(file)
 
     # 检查配额
     is_allowed, deny_reason, usage_snapshot = QuotaService.check_quota(
@@ -59,108 +64,124 @@ async def recognize(
             }
         )
 
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    temp_path = os.path.join(settings.UPLOAD_DIR, f"temp_{timestamp}_{file.filename}")
-
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # 上传内容直接读入内存并发送给推理服务，边读边累计大小，超过限制立即中止
+    image_data = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        if len(image_data) + len(chunk) > settings.MAX_UPLOAD_SIZE:
+            raise upload_too_large_error(settings.MAX_UPLOAD_SIZE)
+        image_data += chunk
 
+    client = get_inference_client()
+    # 调用推理服务
     try:
-        client = InferenceClient()
-        # 调用推理服务
-        try:
-            recognition_result = await client.recognize(temp_path)
-
-            # 构建结果
-            top_k = recognition_result.get("top_k", [])
-            is_unknown = recognition_result.get("is_unknown", True)
-            confidence = recognition_result.get("confidence", 0.0)
-
-            user_id = None
-            username = None
-            if top_k and not is_unknown:
-                user_id = top_k[0].get("user_id")
-                username = top_k[0].get("username")
-
-            result = RecognitionResult(
-                user_id=user_id,
-                username=username,
-                confidence=confidence,
-                is_unknown=is_unknown,
-                top_k=top_k
-            )
-        except NotImplementedError:
-            # 如果gRPC未实现，返回模拟结果
-            result = RecognitionResult(
-                user_id=None,
-                username=None,
-                confidence=0.0,
-                is_unknown=True,
-                top_k=[]
-            )
-
-        # 保存识别日志
-        import json
-        log = RecognitionLog(
-            user_id=result.user_id,
-            result=json.dumps(result.top_k, ensure_ascii=False),
-            confidence=result.confidence,
-            is_unknown=result.is_unknown,
-            image_path=temp_path
+        recognition_result = await client.recognize_bytes(image_data)
+
+        # 构建结果
+        top_k = recognition_result.get("top_k", [])
+        is_unknown = recognition_result.get("is_unknown", True)
+        confidence = recognition_result.get("confidence", 0.0)
+
+        user_id = None
+        username = None
+        if top_k and not is_unknown:
+            user_id = top_k[0].get("user_id")
+            username = top_k[0].get("username")
+
+        result = RecognitionResult(
+            user_id=user_id,
+            username=username,
+            confidence=confidence,
+            is_unknown=is_unknown,
+            top_k=top_k
         )
-        db.add(log)
-        db.commit()
-        db.refresh(log)
-
-        # 增加配额使用次数
-        user_quota = QuotaService.get_or_create_user_quota(db, current_user.id, current_user.school_id)
-        school_quota = None
-        if current_user.school_id:
-            school_quota = QuotaService.get_or_create_school_quota(db, current_user.school_id)
-
-        QuotaService.increment_quota_usage(
-            db=db,
-            user_id=current_user.id,
-            school_id=current_user.school_id,
-            recognition_log_id=log.id,
-            user_quota=user_quota,
-            school_quota=school_quota,
-            is_allowed=True,
-            deny_reason=None
+    except NotImplementedError:
+        # 如果gRPC未实现，返回模拟结果
+        result = RecognitionResult(
+            user_id=None,
+            username=None,
+            confidence=0.0,
+            is_unknown=True,
+            top_k=[]
         )
 
-        return RecognitionResponse(
-            result=result,
-            sample_id=None,
-            created_at=log.created_at
-        )
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    # 保存识别日志
+    log = RecognitionLog(
+        user_id=result.user_id,
+        result=orjson.dumps(result.top_k).decode(),
+        confidence=result.confidence,
+        is_unknown=result.is_unknown,
+        image_path=None
+    )
+    db.add(log)
+    db.commit()
+    db.refresh(log)
+    _logs_cache.clear()
+
+    # 增加配额使用次数
+    user_quota = QuotaService.get_or_create_user_quota(db, current_user.id, current_user.school_id)
+    school_quota = None
+    if current_user.school_id:
+        school_quota = QuotaService.get_or_create_school_quota(db, current_user.school_id)
+
+    QuotaService.increment_quota_usage(
+        db=db,
+        user_id=current_user.id,
+        school_id=current_user.school_id,
+        recognition_log_id=log.id,
+        user_quota=user_quota,
+        school_quota=school_quota,
+        is_allowed=True,
+        deny_reason=None
+    )
+
+    return RecognitionResponse(
+        result=result,
+        sample_id=None,
+        created_at=log.created_at
+    )
+
+
+# 日志列表只查询需要返回的列，直接使用元组构建响应，无需实例化ORM对象
+_RECOGNITION_LOG_FIELDS = ("id", "user_id", "confidence", "is_unknown", "result", "created_at")
+_RECOGNITION_LOG_COLUMNS = tuple(getattr(RecognitionLog, name) for name in _RECOGNITION_LOG_FIELDS)
 
 
 @router.get("/logs", response_model=List[dict])
-async def get_recognition_logs(
-    limit: int = 50,
+def get_recognition_logs(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    before_id: Optional[int] = Query(None, description="只返回ID小于该值的日志（用于向前翻页）"),
     db: Session = Depends(get_db),
     current_user: CurrentUserResponse = Depends(get_current_user)
 ):
-    """获取识别日志"""
-    query = db.query(RecognitionLog)
-    
-    if current_user.role == "student":
-        query = query.filter(RecognitionLog.user_id == current_user.id)
-    
-    logs = query.order_by(RecognitionLog.created_at.desc()).limit(limit).all()
-    return [
-        {
-            "id": log.id,
-            "user_id": log.user_id,
-            "confidence": log.confidence,
-            "is_unknown": log.is_unknown,
-            "result": log.result,
-            "created_at": log.created_at
-        }
-        for log in logs
-    ]
+    """获取识别日志
+
+    按ID倒序（与创建时间顺序一致）进行键集分页：下一页的游标通过
+    X-Next-Before-Id 响应头返回，作为下一次请求的 before_id。
+    """
+    # 学生只能查看自己的日志，其他角色看到的结果相同，可共用缓存
+    owner_id = current_user.id if current_user.role == "student" else None
+    cache_key = (owner_id, limit, before_id)
+    logs = _logs_cache.get(cache_key)
+
+    if logs is None:
+        query = db.query(RecognitionLog)
+
+        if owner_id is not None:
+            query = query.filter(RecognitionLog.user_id == owner_id)
+
+        if before_id is not None:
+            query = query.filter(RecognitionLog.id < before_id)
+
+        rows = (
+            query.with_entities(*_RECOGNITION_LOG_COLUMNS)
+            .order_by(RecognitionLog.id.desc())
+            .limit(limit)
+            .all()
+        )
+        logs = [dict(zip(_RECOGNITION_LOG_FIELDS, row)) for row in rows]
+        _logs_cache.set(cache_key, logs)
+
+    if logs:
+        response.headers["X-Next-Before-Id"] = str(logs[-1]["id"])
+    return logs
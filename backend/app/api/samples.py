@@ -1,21 +1,136 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Form
-from sqlalchemy.orm import Session, joinedload
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from pydantic import BaseModel, Field
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextlib
+import hashlib
+import orjson
 import os
-import shutil
-import json
-import threading
-from ..core.database import get_db
+import time
+from ..core.database import get_db, SessionLocal
 from ..core.config import settings
 from ..models.sample import Sample, SampleStatus, SampleRegion
 from ..models.user import User
-from ..utils.dependencies import get_current_user, require_teacher_or_above, CurrentUserResponse
-from ..utils.validators import validate_upload_file
+from ..utils.dependencies import get_current_user, require_teacher_or_above, CurrentUserResponse, get_or_load
+from ..utils.upload_stream import receive_upload
 from ..utils.image_processor import auto_crop_sample_image
 
-router = APIRouter(prefix="/samples", tags=["样本管理"])
+router = APIRouter(prefix="/samples", tags=["样本管理"], default_response_class=ORJSONResponse)
+
+# 自动裁剪线程池：限制并发的裁剪任务数（同时也限制了其占用的数据库连接数），
+# 超出的任务在队列中等待。线程池在首次使用时创建。
+AUTO_CROP_MAX_WORKERS = min(8, os.cpu_count() or 1)
+_auto_crop_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_auto_crop_executor() -> ThreadPoolExecutor:
+    """获取自动裁剪线程池"""
+    global _auto_crop_executor
+    if _auto_crop_executor is None:
+        _auto_crop_executor = ThreadPoolExecutor(
+            max_workers=AUTO_CROP_MAX_WORKERS,
+            thread_name_prefix="auto-crop"
+        )
+    return _auto_crop_executor
+
+
+def shutdown_auto_crop_executor() -> None:
+    """关闭自动裁剪线程池（应用关闭时调用，丢弃尚未开始的任务）"""
+    global _auto_crop_executor
+    if _auto_crop_executor is not None:
+        _auto_crop_executor.shutdown(wait=False, cancel_futures=True)
+        _auto_crop_executor = None
+
+
+def _process_auto_crop(sample_id: int, image_path: str):
+    """后台处理自动裁剪"""
+    local_db = SessionLocal()
+    try:
+        print(f"开始自动裁剪样本 {sample_id}")
+
+        # 调用自动裁剪函数
+        bbox, cropped_path = auto_crop_sample_image(image_path, sample_id)
+
+        if bbox and cropped_path:
+            # 创建自动检测的区域记录
+            region = SampleRegion(
+                sample_id=sample_id,
+                bbox=bbox,
+                is_auto_detected=True  # 自动检测
+            )
+            local_db.add(region)
+
+            # 更新样本信息
+            sample_record = local_db.get(Sample, sample_id)
+            if sample_record:
+                sample_record.status = SampleStatus.PROCESSED
+                sample_record.extracted_region_path = cropped_path
+                sample_record.processed_at = datetime.utcnow()
+
+            local_db.commit()
+            print(f"样本 {sample_id} 自动裁剪成功")
+        else:
+            print(f"样本 {sample_id} 自动裁剪失败")
+            # 如果没有检测到文本区域，保持PENDING状态等待手动处理
+
+    except Exception as e:
+        print(f"样本 {sample_id} 自动裁剪处理异常: {str(e)}")
+        local_db.rollback()
+    finally:
+        local_db.close()
+
+
+# 上传接口的请求体说明（接口直接解析请求流，需手动声明 OpenAPI 表单结构）
+_UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "student_id": {"type": "string"},
+                    },
+                }
+            }
+        },
+    }
+}
+
+
+def _remove_if_exists(path: str) -> None:
+    """删除文件（不存在时忽略）"""
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def get_sample_by_id(
+    sample_id: int,
+    request: Request,
+    db: Session = Depends(get_db)
+) -> Sample:
+    """依赖项：加载路径中的样本（同一请求内缓存），不存在时返回404
+
+    用户与区域一并预加载：详情接口需要返回区域列表，删除时级联删除也需要区域，
+    避免访问 sample.sample_regions 时再触发一次延迟加载。
+    """
+    sample = get_or_load(
+        request, db, Sample, sample_id,
+        joinedload(Sample.user), selectinload(Sample.sample_regions)
+    )
+    if not sample:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="样本不存在"
+        )
+    return sample
 
 
 class UserInfo(BaseModel):
@@ -60,149 +175,151 @@ class SampleDetailResponse(SampleResponse):
     sample_regions: List[SampleRegionResponse]
 
 
+def _image_url_prefix(request: Request) -> str:
+    """样本图片的访问地址前缀（与 main.py 的 app.mount("/uploads", ...) 对齐）"""
+    return str(request.base_url).rstrip('/') + "/uploads/samples/"
+
+
+def _sample_to_dict(sample: Sample, url_prefix: str, with_user: bool = True) -> dict:
+    """把样本转换为 SampleResponse 结构的字典
+
+    数据来自数据库，无需再经过 Pydantic 校验，直接交给 orjson 序列化。
+    url_prefix 由 _image_url_prefix 每个请求计算一次。
+    """
+    user = sample.user if with_user else None
+    return {
+        "id": sample.id,
+        "user_id": sample.user_id,
+        "user": {
+            "id": user.id,
+            "username": user.username,
+            "nickname": user.nickname,
+            "role": user.role.value,
+        } if user else None,
+        "image_path": sample.image_path,
+        "image_url": url_prefix + sample.image_path.rpartition(os.sep)[2],
+        "original_filename": sample.original_filename,
+        "status": sample.status,
+        "extracted_region_path": sample.extracted_region_path,
+        "sample_metadata": sample.sample_metadata,
+        "uploaded_at": sample.uploaded_at,
+        "processed_at": sample.processed_at,
+    }
+
+
+def _region_to_dict(region: SampleRegion) -> dict:
+    """把样本区域转换为 SampleRegionResponse 结构的字典"""
+    return {
+        "id": region.id,
+        "sample_id": region.sample_id,
+        "bbox": region.bbox,
+        "is_auto_detected": int(region.is_auto_detected),
+        "created_at": region.created_at,
+    }
+
+
+class BBox(BaseModel):
+    """裁剪区域（像素），取值范围与 sample_regions 的 SMALLINT 列一致"""
+    x: int = Field(..., ge=0, le=32767)
+    y: int = Field(..., ge=0, le=32767)
+    width: int = Field(..., ge=0, le=32767)
+    height: int = Field(..., ge=0, le=32767)
+
+
 class CropRequest(BaseModel):
-    bbox: dict  # {"x": 10, "y": 20, "width": 100, "height": 50}
+    bbox: BBox  # {"x": 10, "y": 20, "width": 100, "height": 50}
 
 
 class SampleUploadRequest(BaseModel):
     student_id: Optional[int] = None  # 目标学生ID，仅教师及以上权限可用
 
 
-@router.post("/upload", response_model=SampleResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/upload",
+    response_model=SampleResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=_UPLOAD_REQUEST_BODY
+)
 async def upload_sample(
     request: Request,
-    file: UploadFile = File(...),
-    student_id: Optional[str] = Form(None),
     db: Session = Depends(get_db),
     current_user: CurrentUserResponse = Depends(get_current_user)
 ):
-    """上传样本图片"""
-    # 验证文件类型和大小
-    await validate_upload_file(file, settings.MAX_UPLOAD_SIZE)
+    """上传样本图片
 
-    # 确定目标用户ID
-    target_user_id = current_user.id
-    
-    # 如果提供了student_id，验证权限并获取目标用户
-    if student_id:
-        # 只有教师及以上权限才能为其他用户上传样本
-        if current_user.role not in ["teacher", "school_admin", "system_admin"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权为其他用户上传样本"
-            )
-        
-        try:
-            target_user_id = int(student_id)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="student_id必须是有效的整数"
-            )
-        
-        # 验证目标用户是否存在
-        target_user = db.query(User).filter(User.id == target_user_id).first()
-        if not target_user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="目标用户不存在"
-            )
-        
-        # 学校管理员只能为同校用户上传样本
-        if current_user.role == "school_admin" and current_user.school_id != target_user.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="只能为同校用户上传样本"
-            )
-    
-    # 创建上传目录
-    os.makedirs(settings.SAMPLES_DIR, exist_ok=True)
-    
-    # 保存文件
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{target_user_id}_{timestamp}_{file.filename}"
-    file_path = os.path.join(settings.SAMPLES_DIR, filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    # 对外暴露的访问路径（与 main.py 的 app.mount("/uploads", ...) 对齐）
-    image_url = f"/uploads/samples/{filename}"
+    请求体为 multipart/form-data（file: 图片文件，student_id: 可选的目标学生ID）。
+    文件内容边接收边写入样本目录，类型和大小在接收过程中校验。
+    """
+    fields, upload = await receive_upload(request, settings.SAMPLES_DIR, settings.MAX_UPLOAD_SIZE)
+    student_id = fields.get("student_id")
+
+    try:
+        # 确定目标用户ID
+        target_user_id = current_user.id
+
+        # 如果提供了student_id，验证权限并获取目标用户
+        if student_id:
+            # 只有教师及以上权限才能为其他用户上传样本
+            if current_user.role not in ["teacher", "school_admin", "system_admin"]:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="无权为其他用户上传样本"
+                )
+
+            try:
+                target_user_id = int(student_id)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="student_id必须是有效的整数"
+                )
+
+            # 验证目标用户是否存在
+            target_user = db.get(User, target_user_id)
+            if not target_user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="目标用户不存在"
+                )
+
+            # 学校管理员只能为同校用户上传样本
+            if current_user.role == "school_admin" and current_user.school_id != target_user.school_id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="只能为同校用户上传样本"
+                )
+
+        # 保存文件：临时文件与目标位于同一目录，直接重命名即可（上传目录在应用启动时创建）
+        # 纳秒时间戳加内容摘要，避免同一时刻上传同名文件时互相覆盖
+        filename = f"{target_user_id}_{time.time_ns()}_{upload.digest}_{upload.filename}"
+        file_path = os.path.join(settings.SAMPLES_DIR, filename)
+        await asyncio.to_thread(os.replace, upload.path, file_path)
+    except BaseException:
+        await asyncio.to_thread(_remove_if_exists, upload.path)
+        raise
 
     # 创建样本记录
     sample = Sample(
         user_id=target_user_id,
         image_path=file_path,
-        original_filename=file.filename,
+        original_filename=upload.filename,
         status=SampleStatus.PENDING
     )
     db.add(sample)
     db.commit()
     db.refresh(sample)
 
-    # 启动后台线程进行自动裁剪
-    def process_auto_crop(sample_id: int, image_path: str):
-        """后台处理自动裁剪"""
-        from sqlalchemy.orm import sessionmaker
-        from ..core.database import engine
-        
-        # 创建新的数据库会话
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-        local_db = SessionLocal()
-        
-        try:
-            print(f"开始自动裁剪样本 {sample_id}")
-            
-            # 调用自动裁剪函数
-            bbox, cropped_path = auto_crop_sample_image(image_path, sample_id)
-            
-            if bbox and cropped_path:
-                # 创建自动检测的区域记录
-                region = SampleRegion(
-                    sample_id=sample_id,
-                    bbox=json.dumps(bbox),
-                    is_auto_detected=1  # 自动检测
-                )
-                local_db.add(region)
-                
-                # 更新样本信息
-                sample_record = local_db.query(Sample).filter(Sample.id == sample_id).first()
-                if sample_record:
-                    sample_record.status = SampleStatus.PROCESSED
-                    sample_record.extracted_region_path = cropped_path
-                    sample_record.processed_at = datetime.utcnow()
-                
-                local_db.commit()
-                print(f"样本 {sample_id} 自动裁剪成功")
-            else:
-                print(f"样本 {sample_id} 自动裁剪失败")
-                # 如果没有检测到文本区域，保持PENDING状态等待手动处理
-                
-        except Exception as e:
-            print(f"样本 {sample_id} 自动裁剪处理异常: {str(e)}")
-            local_db.rollback()
-        finally:
-            local_db.close()
-    
-    # 启动后台线程
-    threading.Thread(target=process_auto_crop, args=(sample.id, sample.image_path), daemon=True).start()
-
-    return SampleResponse(
-        id=sample.id,
-        user_id=sample.user_id,
-        image_path=sample.image_path,
-        image_url=str(request.base_url).rstrip('/') + image_url,
-        original_filename=sample.original_filename,
-        status=sample.status,
-        extracted_region_path=sample.extracted_region_path,
-        sample_metadata=getattr(sample, 'sample_metadata', None),
-        uploaded_at=sample.uploaded_at,
-        processed_at=getattr(sample, 'processed_at', None),
+    # 提交到自动裁剪线程池
+    _get_auto_crop_executor().submit(_process_auto_crop, sample.id, sample.image_path)
+
+    return ORJSONResponse(
+        _sample_to_dict(sample, _image_url_prefix(request), with_user=False),
+        status_code=status.HTTP_201_CREATED
     )
 
 
 @router.get("", response_model=List[SampleResponse])
-async def list_samples(
+def list_samples(
     request: Request,
     user_id: Optional[int] = None,
     status: Optional[SampleStatus] = None,
@@ -210,68 +327,39 @@ async def list_samples(
     db: Session = Depends(get_db),
     current_user: CurrentUserResponse = Depends(get_current_user)
 ):
-    """获取样本列表"""
-    query = db.query(Sample).options(joinedload(Sample.user))
+    """获取样本列表
 
+    响应带有 ETag：由实际返回的这一页序列化结果计算（包含关联用户的昵称等字段），
+    与 If-None-Match 一致时返回 304，省去响应体传输；不额外执行聚合查询。
+    """
     # 权限控制：学生只能查看自己的样本
-    if current_user.role == "student":
-        query = query.filter(Sample.user_id == current_user.id)
-    elif user_id:
-        query = query.filter(Sample.user_id == user_id)
+    owner_id = current_user.id if current_user.role == "student" else user_id
 
+    stmt = select(Sample).options(joinedload(Sample.user))
+    if owner_id:
+        stmt = stmt.where(Sample.user_id == owner_id)
     if status:
-        query = query.filter(Sample.status == status)
-
-    samples = query.order_by(Sample.uploaded_at.desc()).limit(limit).all()
-
-    base = str(request.base_url).rstrip('/')
-    resp: List[SampleResponse] = []
-    for s in samples:
-        filename = os.path.basename(s.image_path)
-
-        # 构建用户信息
-        user_info = None
-        if s.user:
-            user_info = UserInfo(
-                id=s.user.id,
-                username=s.user.username,
-                nickname=s.user.nickname,
-                role=str(s.user.role)
-            )
+        stmt = stmt.where(Sample.status == status)
+    stmt = stmt.order_by(Sample.uploaded_at.desc()).limit(limit)
+    samples = db.execute(stmt).unique().scalars().all()
 
-        resp.append(
-            SampleResponse(
-                id=s.id,
-                user_id=s.user_id,
-                user=user_info,
-                image_path=s.image_path,
-                image_url=f"{base}/uploads/samples/{filename}",
-                original_filename=s.original_filename,
-                status=s.status,
-                extracted_region_path=s.extracted_region_path,
-                sample_metadata=getattr(s, 'sample_metadata', None),
-                uploaded_at=s.uploaded_at,
-                processed_at=getattr(s, 'processed_at', None),
-            )
-        )
-    return resp
+    url_prefix = _image_url_prefix(request)
+    body = orjson.dumps([_sample_to_dict(s, url_prefix) for s in samples])
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/{sample_id}", response_model=SampleDetailResponse)
-async def get_sample(
+def get_sample(
     request: Request,
-    sample_id: int,
-    db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(get_current_user)
+    current_user: CurrentUserResponse = Depends(get_current_user),
+    sample: Sample = Depends(get_sample_by_id)
 ):
     """获取样本详情"""
-    sample = db.query(Sample).options(joinedload(Sample.user)).filter(Sample.id == sample_id).first()
-    if not sample:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="样本不存在"
-        )
-
     # 权限检查
     if current_user.role == "student" and sample.user_id != current_user.id:
         raise HTTPException(
@@ -279,58 +367,18 @@ async def get_sample(
             detail="无权查看其他用户的样本"
         )
 
-    base = str(request.base_url).rstrip('/')
-    filename = os.path.basename(sample.image_path)
-
-    # 构建用户信息
-    user_info = None
-    if sample.user:
-        user_info = UserInfo(
-            id=sample.user.id,
-            username=sample.user.username,
-            nickname=sample.user.nickname,
-            role=str(sample.user.role)
-        )
-
-    return SampleDetailResponse(
-        id=sample.id,
-        user_id=sample.user_id,
-        user=user_info,
-        image_path=sample.image_path,
-        image_url=f"{base}/uploads/samples/{filename}",
-        original_filename=sample.original_filename,
-        status=sample.status,
-        extracted_region_path=sample.extracted_region_path,
-        sample_metadata=getattr(sample, 'sample_metadata', None),
-        uploaded_at=sample.uploaded_at,
-        processed_at=getattr(sample, 'processed_at', None),
-        sample_regions=[
-            SampleRegionResponse(
-                id=r.id,
-                sample_id=r.sample_id,
-                bbox=r.bbox,
-                is_auto_detected=r.is_auto_detected,
-                created_at=r.created_at,
-            )
-            for r in getattr(sample, 'sample_regions', [])
-        ],
-    )
+    detail = _sample_to_dict(sample, _image_url_prefix(request))
+    detail["sample_regions"] = [_region_to_dict(r) for r in sample.sample_regions]
+    return ORJSONResponse(detail)
 
 
 @router.delete("/{sample_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_sample(
-    sample_id: int,
+def delete_sample(
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(get_current_user)
+    current_user: CurrentUserResponse = Depends(get_current_user),
+    sample: Sample = Depends(get_sample_by_id)
 ):
     """删除样本"""
-    sample = db.query(Sample).filter(Sample.id == sample_id).first()
-    if not sample:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="样本不存在"
-        )
-    
     # 权限检查
     if current_user.role == "student" and sample.user_id != current_user.id:
         raise HTTPException(
@@ -338,11 +386,10 @@ async def delete_sample(
             detail="无权删除其他用户的样本"
         )
     
-    # 删除文件
-    if os.path.exists(sample.image_path):
-        os.remove(sample.image_path)
-    if sample.extracted_region_path and os.path.exists(sample.extracted_region_path):
-        os.remove(sample.extracted_region_path)
+    # 删除文件（接口在线程池中执行，不阻塞事件循环）
+    _remove_if_exists(sample.image_path)
+    if sample.extracted_region_path:
+        _remove_if_exists(sample.extracted_region_path)
     
     db.delete(sample)
     db.commit()
@@ -350,45 +397,36 @@ async def delete_sample(
 
 
 @router.post("/{sample_id}/crop", response_model=SampleRegionResponse, status_code=status.HTTP_201_CREATED)
-async def crop_sample_region(
-    sample_id: int,
+def crop_sample_region(
     crop_data: CropRequest,
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(require_teacher_or_above)
+    current_user: CurrentUserResponse = Depends(require_teacher_or_above),
+    sample: Sample = Depends(get_sample_by_id)
 ):
     """手动裁剪手写区域"""
-    sample = db.query(Sample).filter(Sample.id == sample_id).first()
-    if not sample:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="样本不存在"
-        )
-
-    # 查找是否已存在手动标注的区域
-    existing_region = db.query(SampleRegion).filter(
-        SampleRegion.sample_id == sample_id,
-        SampleRegion.is_auto_detected == 0  # 只查找手动标注的
-    ).first()
-
-    bbox_json = json.dumps(crop_data.bbox)
+    sample_id = sample.id
+    bbox = crop_data.bbox.model_dump()
+    # 查找是否已存在手动标注的区域（区域已随样本预加载，无需再查询）
+    existing_region = next(
+        (r for r in sample.sample_regions if not r.is_auto_detected), None
+    )
 
     if existing_region:
-        # 更新现有的手动标注区域
-        existing_region.bbox = bbox_json
-        db.flush()
+        # 更新现有的手动标注区域（与样本状态的修改在同一次提交中写入）
+        existing_region.bbox = bbox
         region = existing_region
     else:
         # 创建新的区域记录
         region = SampleRegion(
             sample_id=sample_id,
-            bbox=bbox_json,
-            is_auto_detected=0  # 手动标注
+            bbox=bbox,
+            is_auto_detected=False  # 手动标注
         )
         db.add(region)
 
     # 裁剪图片并保存
     try:
-        cropped_path = auto_crop_sample_image(sample.image_path, sample_id, crop_data.bbox)
+        cropped_path = auto_crop_sample_image(sample.image_path, sample_id, bbox)
         if cropped_path:
             sample.extracted_region_path = cropped_path
     except Exception as e:
@@ -401,4 +439,4 @@ async def crop_sample_region(
     db.commit()
     db.refresh(region)
 
-    return region
+    return ORJSONResponse(_region_to_dict(region), status_code=status.HTTP_201_CREATED)
@@ -3,25 +3,46 @@ Scheduled Tasks API
 
 提供定时任务的CRUD操作和执行管理
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from pydantic import BaseModel, field_validator, field_serializer
+import asyncio
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import ColumnElement, func, select, true, tuple_
+from sqlalchemy.orm import Session, joinedload
+from pydantic import BaseModel, field_validator
 from datetime import datetime, timezone
-import croniter
 
+from ..core.config import settings
 from ..core.database import get_db
 from ..models.scheduled_task import (
     ScheduledTask, ScheduledTaskExecution,
     ScheduleStatus, ScheduleTriggerType
 )
 from ..models.training_job import TrainingJob, TrainingJobStatus
-from ..models.user import User
 from ..models.school import School
+from ..models.user import User
+from ..utils.cache import get_cache
 from ..utils.dependencies import require_teacher_or_above, get_current_user, CurrentUserResponse
 from ..services.task_scheduler import task_scheduler
 
-router = APIRouter(prefix="/scheduled-tasks", tags=["定时任务"])
+router = APIRouter(prefix="/scheduled-tasks", tags=["定时任务"], default_response_class=ORJSONResponse)
+
+
+class ScheduledTaskExecutionResponse(BaseModel):
+    """定时任务执行记录响应"""
+    id: int
+    scheduled_task_id: int
+    training_job_id: int | None
+    started_at: str
+    completed_at: str | None
+    status: str
+    output: str | None
+    error_message: str | None
+
+    class Config:
+        from_attributes = True
 
 
 class ScheduledTaskResponse(BaseModel):
@@ -33,32 +54,84 @@ class ScheduledTaskResponse(BaseModel):
     trigger_type: str
     interval_seconds: int | None
     cron_expression: str | None
-    run_at: datetime | None
+    run_at: str | None  # ISO 8601（UTC），由 _iso 预先格式化
     training_mode: str
     school_id: int | None
     school_name: str | None
     force_retrain: bool
-    last_run_at: datetime | None
-    next_run_at: datetime | None
+    last_run_at: str | None
+    next_run_at: str | None
     total_runs: int
     success_runs: int
     failed_runs: int
     last_error: str | None
     created_by: int
     creator_name: str | None
-    created_at: datetime
-    updated_at: datetime
+    created_at: str
+    updated_at: str
+    # 仅在列表接口传入 include_last_execution=true 时填充
+    last_execution: ScheduledTaskExecutionResponse | None = None
 
     class Config:
         from_attributes = True
 
-    @field_serializer('created_at', 'updated_at', 'last_run_at', 'next_run_at', 'run_at')
-    def serialize_datetime(self, dt: Optional[datetime], _info):
-        if dt is None:
-            return None
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt.isoformat()
+
+# cron字段中的单项：*、数值/名称、范围，可带步长（如 */5、1-10/2、mon-fri）
+_CRON_ITEM_RE = re.compile(r"^(?:\*|([0-9a-z]+)(?:-([0-9a-z]+))?)(?:/([0-9]+))?$")
+
+_MONTH_NAMES = {name: i for i, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+_DAY_OF_WEEK_NAMES = {name: i for i, name in enumerate(
+    ("sun", "mon", "tue", "wed", "thu", "fri", "sat"))}
+
+# (字段名, 最小值, 最大值, 可用名称)
+_CRON_FIELDS = (
+    ("minute", 0, 59, {}),
+    ("hour", 0, 23, {}),
+    ("day", 1, 31, {}),
+    ("month", 1, 12, _MONTH_NAMES),
+    ("day_of_week", 0, 7, _DAY_OF_WEEK_NAMES),
+)
+
+
+def _parse_cron_value(value: str, low: int, high: int, names: dict) -> int:
+    if value.isdigit():
+        number = int(value)
+    elif value in names:
+        number = names[value]
+    else:
+        raise ValueError(f'invalid value "{value}"')
+    if not low <= number <= high:
+        raise ValueError(f'value {number} out of range {low}-{high}')
+    return number
+
+
+@lru_cache(maxsize=512)
+def _validate_cron_expression(expr: str) -> None:
+    """验证cron表达式格式（结果按表达式缓存，常用表达式只解析一次；无效表达式不缓存）
+
+    只做逐字段的语法与取值范围检查，不构建 croniter 迭代器；
+    下次执行时间由调度器的 CronTrigger 计算。
+    """
+    parts = expr.lower().split()
+    if len(parts) != 5:
+        raise ValueError('Invalid cron expression: Cron expression must have 5 parts: minute hour day month day_of_week')
+
+    for part, (field, low, high, names) in zip(parts, _CRON_FIELDS):
+        for item in part.split(','):
+            match = _CRON_ITEM_RE.match(item)
+            if match is None:
+                raise ValueError(f'Invalid cron expression: invalid {field} field "{part}"')
+            start, end, step = match.groups()
+            try:
+                if start is not None:
+                    first = _parse_cron_value(start, low, high, names)
+                    if end is not None and _parse_cron_value(end, low, high, names) < first:
+                        raise ValueError(f'invalid range "{start}-{end}"')
+                if step is not None and int(step) == 0:
+                    raise ValueError('step must be positive')
+            except ValueError as e:
+                raise ValueError(f'Invalid cron expression: {field} field: {e}')
 
 
 class ScheduledTaskCreate(BaseModel):
@@ -78,15 +151,7 @@ class ScheduledTaskCreate(BaseModel):
         if info.data.get('trigger_type') == ScheduleTriggerType.CRON:
             if not v:
                 raise ValueError('Cron expression is required for cron trigger type')
-            # 验证cron表达式格式
-            try:
-                parts = v.split()
-                if len(parts) != 5:
-                    raise ValueError('Cron expression must have 5 parts: minute hour day month day_of_week')
-                # 验证基本格式
-                croniter.croniter(v)
-            except Exception as e:
-                raise ValueError(f'Invalid cron expression: {e}')
+            _validate_cron_expression(v)
         return v
 
     @field_validator('run_at')
@@ -126,27 +191,148 @@ class ScheduledTaskUpdate(BaseModel):
     force_retrain: bool | None = None
 
 
-class ScheduledTaskExecutionResponse(BaseModel):
-    """定时任务执行记录响应"""
-    id: int
-    scheduled_task_id: int
-    training_job_id: int | None
-    started_at: datetime
-    completed_at: datetime | None
-    status: str
-    output: str | None
-    error_message: str | None
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    """格式化为ISO 8601字符串（数据库返回的无时区时间按UTC处理）"""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.isoformat()
 
-    class Config:
-        from_attributes = True
 
-    @field_serializer('started_at', 'completed_at')
-    def serialize_datetime(self, dt: Optional[datetime], _info):
-        if dt is None:
-            return None
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt.isoformat()
+def _school_scope_filter(
+    current_user: CurrentUserResponse = Depends(get_current_user)
+) -> ColumnElement[bool]:
+    """学校管理员和教师只能访问本校的定时任务，返回对应的过滤条件（不受限时为 true()）"""
+    if current_user.role in ("school_admin", "teacher") and current_user.school_id:
+        return ScheduledTask.school_id == current_user.school_id
+    return true()
+
+
+def _get_scoped_task(
+    db: Session,
+    query,
+    task_id: int,
+    scope: ColumnElement[bool],
+    detail: str
+) -> ScheduledTask:
+    """按ID和学校范围查询任务；查不到时再区分任务不存在（404）与无权访问（403）"""
+    task = query.filter(ScheduledTask.id == task_id, scope).first()
+    if task is not None:
+        return task
+
+    if db.query(ScheduledTask.id).filter(ScheduledTask.id == task_id).first() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"定时任务 {task_id} 不存在"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=detail
+    )
+
+
+# 列表接口查询的任务列（即 ScheduledTaskResponse 需要的全部任务字段）
+_TASK_LIST_COLUMNS = (
+    ScheduledTask.id, ScheduledTask.name, ScheduledTask.description, ScheduledTask.status,
+    ScheduledTask.trigger_type, ScheduledTask.interval_seconds, ScheduledTask.cron_expression,
+    ScheduledTask.run_at, ScheduledTask.training_mode, ScheduledTask.school_id,
+    ScheduledTask.force_retrain, ScheduledTask.last_run_at, ScheduledTask.next_run_at,
+    ScheduledTask.total_runs, ScheduledTask.success_runs, ScheduledTask.failed_runs,
+    ScheduledTask.last_error, ScheduledTask.created_by, ScheduledTask.created_at,
+    ScheduledTask.updated_at,
+)
+
+
+# updated_at 精度为秒，同一秒内的先后两次写入无法通过 updated_at 区分；
+# 距最近一次修改不足该秒数的任务不写入缓存，避免与并发写入竞争时缓存旧数据
+_TASK_CACHE_SETTLE_SECONDS = 2
+
+
+def _task_cache_key(task_id: int) -> str:
+    return f"scheduled_task:{task_id}"
+
+
+def _invalidate_task_cache(task_id: int) -> None:
+    """任务修改后删除详情缓存"""
+    get_cache().delete(_task_cache_key(task_id))
+
+
+async def _ainvalidate_task_cache(task_id: int) -> None:
+    """在线程池中删除详情缓存（Redis 访问不阻塞事件循环）"""
+    await asyncio.to_thread(_invalidate_task_cache, task_id)
+
+
+def _task_cache_state(db: Session, task_id: int, scope: ColumnElement[bool]):
+    """校验详情缓存所需的列：任务的 updated_at、数据库当前时间，以及学校名称和创建者名称
+
+    学校名称和创建者名称可能在任务之外被修改，不放入缓存，每次随这条查询一起读取。
+    """
+    return (
+        db.query(
+            ScheduledTask.updated_at,
+            func.now().label("db_now"),
+            School.name.label("school_name"),
+            User.nickname.label("creator_nickname"),
+            User.username.label("creator_username"),
+        )
+        .outerjoin(School, School.id == ScheduledTask.school_id)
+        .outerjoin(User, User.id == ScheduledTask.created_by)
+        .filter(ScheduledTask.id == task_id, scope)
+        .first()
+    )
+
+
+def _task_cache_settled(state) -> bool:
+    """任务最近一次修改是否已超过 _TASK_CACHE_SETTLE_SECONDS（均为数据库时间）"""
+    if state.updated_at is None or state.db_now is None:
+        return False
+    updated_at = state.updated_at.replace(tzinfo=None)
+    db_now = state.db_now.replace(tzinfo=None)
+    return (db_now - updated_at).total_seconds() >= _TASK_CACHE_SETTLE_SECONDS
+
+
+def _latest_executions(db: Session, task_ids: List[int]) -> Dict[int, ScheduledTaskExecutionResponse]:
+    """一次查询取出每个任务最近一次的执行记录（按任务分区的 ROW_NUMBER 取第一行）"""
+    if not task_ids:
+        return {}
+
+    row_number = func.row_number().over(
+        partition_by=ScheduledTaskExecution.scheduled_task_id,
+        order_by=(ScheduledTaskExecution.started_at.desc(), ScheduledTaskExecution.id.desc())
+    ).label("row_number")
+    ranked = (
+        select(ScheduledTaskExecution.id, row_number)
+        .where(ScheduledTaskExecution.scheduled_task_id.in_(task_ids))
+        .subquery()
+    )
+    executions = (
+        db.query(ScheduledTaskExecution)
+        .join(ranked, ranked.c.id == ScheduledTaskExecution.id)
+        .filter(ranked.c.row_number == 1)
+        .all()
+    )
+    return {
+        execution.scheduled_task_id: _execution_to_response(execution)
+        for execution in executions
+    }
+
+
+def _task_query(db: Session):
+    """定时任务查询（预加载学校与创建者，构建响应时无需再逐条查询）"""
+    return db.query(ScheduledTask).options(
+        joinedload(ScheduledTask.school),
+        joinedload(ScheduledTask.creator)
+    )
+
+
+def _reload_task(db: Session, task_id: int) -> ScheduledTask:
+    """提交后重新加载任务
+
+    MySQL 不支持 RETURNING，服务端生成的时间戳只能重新查询取得；这里用一次关联查询
+    同时取回任务列、学校和创建者，代替 refresh 之后再逐个懒加载关联对象。
+    """
+    return _task_query(db).filter(ScheduledTask.id == task_id).one()
 
 
 @router.post("", response_model=ScheduledTaskResponse, status_code=status.HTTP_201_CREATED)
@@ -158,8 +344,8 @@ async def create_scheduled_task(
     """创建定时任务"""
     # 检查学校是否存在
     if task_data.school_id:
-        school = db.query(School).filter(School.id == task_data.school_id).first()
-        if not school:
+        school_id = db.query(School.id).filter(School.id == task_data.school_id).scalar()
+        if school_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"学校 {task_data.school_id} 不存在"
@@ -180,87 +366,125 @@ async def create_scheduled_task(
         created_by=current_user.id
     )
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    # 先 flush 取得任务ID，调度成功后与下次执行时间一起提交
+    db.flush()
+    task_id = task.id
 
     # 调度任务
-    success = await task_scheduler.schedule_task(task.id, db=db)
+    success = await task_scheduler.add_task_job(task)
     if not success:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="调度任务失败"
         )
 
-    return _task_to_response(task, db)
+    try:
+        db.commit()
+    except Exception:
+        await task_scheduler.unschedule_task(task_id)
+        raise
+    task = _reload_task(db, task_id)
+
+    return _task_to_response(task)
 
 
 @router.get("", response_model=List[ScheduledTaskResponse])
-async def list_scheduled_tasks(
+def list_scheduled_tasks(
     status: Optional[ScheduleStatus] = None,
     school_id: Optional[int] = None,
     training_mode: Optional[str] = None,
+    include_last_execution: bool = Query(False, description="是否同时返回每个任务最近一次的执行记录"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    scope: ColumnElement[bool] = Depends(_school_scope_filter)
 ):
-    """列出定时任务"""
-    query = db.query(ScheduledTask)
-
-    # 根据用户角色过滤
-    if current_user.role == "school_admin":
-        school_admin = db.query(User).filter(User.id == current_user.id).first()
-        if school_admin and school_admin.school_id:
-            query = query.filter(ScheduledTask.school_id == school_admin.school_id)
-    elif current_user.role == "teacher":
-        teacher = db.query(User).filter(User.id == current_user.id).first()
-        if teacher and teacher.school_id:
-            query = query.filter(ScheduledTask.school_id == teacher.school_id)
+    """列出定时任务
+
+    只查询响应需要的列，学校名称与创建者名称通过 LEFT JOIN 一并取出，不构建ORM对象。
+    include_last_execution=true 时再用一次查询取出本页所有任务最近的执行记录。
+    """
+    stmt = (
+        select(
+            *_TASK_LIST_COLUMNS,
+            School.name.label("school_name"),
+            User.nickname.label("creator_nickname"),
+            User.username.label("creator_username"),
+        )
+        .outerjoin(School, School.id == ScheduledTask.school_id)
+        .outerjoin(User, User.id == ScheduledTask.created_by)
+        # 根据用户角色过滤
+        .where(scope)
+    )
 
     # 应用过滤条件
     if status:
-        query = query.filter(ScheduledTask.status == status)
+        stmt = stmt.where(ScheduledTask.status == status)
     if school_id:
-        query = query.filter(ScheduledTask.school_id == school_id)
+        stmt = stmt.where(ScheduledTask.school_id == school_id)
     if training_mode:
-        query = query.filter(ScheduledTask.training_mode == training_mode)
+        stmt = stmt.where(ScheduledTask.training_mode == training_mode)
 
-    tasks = query.order_by(ScheduledTask.created_at.desc()).offset(skip).limit(limit).all()
+    rows = db.execute(
+        stmt.order_by(ScheduledTask.created_at.desc()).offset(skip).limit(limit)
+    ).all()
 
-    return [_task_to_response(task, db) for task in tasks]
+    tasks = [
+        _build_task_response(
+            row,
+            school_name=row.school_name,
+            creator_name=row.creator_nickname or row.creator_username
+        )
+        for row in rows
+    ]
+
+    if include_last_execution:
+        last_executions = _latest_executions(db, [task.id for task in tasks])
+        for task in tasks:
+            task.last_execution = last_executions.get(task.id)
+
+    return tasks
 
 
 @router.get("/{task_id}", response_model=ScheduledTaskResponse)
-async def get_scheduled_task(
+def get_scheduled_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    scope: ColumnElement[bool] = Depends(_school_scope_filter)
 ):
-    """获取定时任务详情"""
-    task = db.query(ScheduledTask).filter(ScheduledTask.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"定时任务 {task_id} 不存在"
-        )
-
-    # 权限检查
-    if current_user.role == "school_admin":
-        school_admin = db.query(User).filter(User.id == current_user.id).first()
-        if school_admin and school_admin.school_id and task.school_id != school_admin.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权访问此任务"
+    """获取定时任务详情
+
+    任务列按任务ID缓存，并记录生成时任务的 updated_at；先用一条只取少量列的查询
+    读出 updated_at 和学校、创建者名称，与缓存一致时直接返回缓存内容，
+    无需再加载任务对象和构建响应模型。
+    """
+    cache_ttl = settings.SCHEDULED_TASK_CACHE_TTL_SECONDS
+    state = None
+    if cache_ttl > 0:
+        state = _task_cache_state(db, task_id, scope)
+        cached = get_cache().get(_task_cache_key(task_id)) if state is not None else None
+        if cached and cached.get("updated_at") == _iso(state.updated_at):
+            data = dict(cached["data"])
+            data["school_name"] = state.school_name
+            data["creator_name"] = (
+                (state.creator_nickname or state.creator_username)
+                if state.creator_username else None
             )
-    elif current_user.role == "teacher":
-        teacher = db.query(User).filter(User.id == current_user.id).first()
-        if teacher and teacher.school_id and task.school_id != teacher.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权访问此任务"
-            )
-
-    return _task_to_response(task, db)
+            return ORJSONResponse(data)
+
+    task = _get_scoped_task(db, _task_query(db), task_id, scope, "无权访问此任务")
+    response = _task_to_response(task)
+
+    if state is not None and _task_cache_settled(state):
+        data = response.model_dump()
+        data["school_name"] = data["creator_name"] = None
+        get_cache().set(
+            _task_cache_key(task_id),
+            {"updated_at": response.updated_at, "data": data},
+            ttl=cache_ttl
+        )
+    return response
 
 
 @router.put("/{task_id}", response_model=ScheduledTaskResponse)
@@ -268,36 +492,16 @@ async def update_scheduled_task(
     task_id: int,
     task_data: ScheduledTaskUpdate,
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(require_teacher_or_above)
+    current_user: CurrentUserResponse = Depends(require_teacher_or_above),
+    scope: ColumnElement[bool] = Depends(_school_scope_filter)
 ):
     """更新定时任务"""
-    task = db.query(ScheduledTask).filter(ScheduledTask.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"定时任务 {task_id} 不存在"
-        )
-
-    # 权限检查
-    if current_user.role == "school_admin":
-        school_admin = db.query(User).filter(User.id == current_user.id).first()
-        if school_admin and school_admin.school_id and task.school_id != school_admin.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权修改此任务"
-            )
-    elif current_user.role == "teacher":
-        teacher = db.query(User).filter(User.id == current_user.id).first()
-        if teacher and teacher.school_id and task.school_id != teacher.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权修改此任务"
-            )
+    task = _get_scoped_task(db, _task_query(db), task_id, scope, "无权修改此任务")
 
     # 检查学校是否存在
     if task_data.school_id is not None:
-        school = db.query(School).filter(School.id == task_data.school_id).first()
-        if not school:
+        school_id = db.query(School.id).filter(School.id == task_data.school_id).scalar()
+        if school_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"学校 {task_data.school_id} 不存在"
@@ -308,48 +512,30 @@ async def update_scheduled_task(
     for field, value in update_data.items():
         setattr(task, field, value)
 
-    db.commit()
-    db.refresh(task)
-
-    # 如果状态或触发器配置改变，重新调度任务
+    # 如果状态或触发器配置改变，重新调度任务（调度结果与字段修改一次提交）
     if 'status' in update_data or 'trigger_type' in update_data:
         if task.status == ScheduleStatus.ACTIVE:
-            await task_scheduler.schedule_task(task.id, db=db)
+            await task_scheduler.add_task_job(task)
         else:
-            await task_scheduler.pause_task(task.id, db=db)
+            await task_scheduler.unschedule_task(task.id)
+            task.status = ScheduleStatus.PAUSED
+
+    db.commit()
+    await _ainvalidate_task_cache(task_id)
+    task = _reload_task(db, task_id)
 
-    return _task_to_response(task, db)
+    return _task_to_response(task)
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_scheduled_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(require_teacher_or_above)
+    current_user: CurrentUserResponse = Depends(require_teacher_or_above),
+    scope: ColumnElement[bool] = Depends(_school_scope_filter)
 ):
     """删除定时任务"""
-    task = db.query(ScheduledTask).filter(ScheduledTask.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"定时任务 {task_id} 不存在"
-        )
-
-    # 权限检查
-    if current_user.role == "school_admin":
-        school_admin = db.query(User).filter(User.id == current_user.id).first()
-        if school_admin and school_admin.school_id and task.school_id != school_admin.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权删除此任务"
-            )
-    elif current_user.role == "teacher":
-        teacher = db.query(User).filter(User.id == current_user.id).first()
-        if teacher and teacher.school_id and task.school_id != teacher.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权删除此任务"
-            )
+    task = _get_scoped_task(db, db.query(ScheduledTask), task_id, scope, "无权删除此任务")
 
     # 取消调度
     await task_scheduler.unschedule_task(task_id)
@@ -357,6 +543,7 @@ async def delete_scheduled_task(
     # 删除任务
     db.delete(task)
     db.commit()
+    await _ainvalidate_task_cache(task_id)
 
     return None
 
@@ -365,157 +552,122 @@ async def delete_scheduled_task(
 async def pause_scheduled_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(require_teacher_or_above)
+    current_user: CurrentUserResponse = Depends(require_teacher_or_above),
+    scope: ColumnElement[bool] = Depends(_school_scope_filter)
 ):
     """暂停定时任务"""
-    task = db.query(ScheduledTask).filter(ScheduledTask.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"定时任务 {task_id} 不存在"
-        )
-
-    # 权限检查
-    if current_user.role == "school_admin":
-        school_admin = db.query(User).filter(User.id == current_user.id).first()
-        if school_admin and school_admin.school_id and task.school_id != school_admin.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权暂停此任务"
-            )
-    elif current_user.role == "teacher":
-        teacher = db.query(User).filter(User.id == current_user.id).first()
-        if teacher and teacher.school_id and task.school_id != teacher.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权暂停此任务"
-            )
+    task = _get_scoped_task(db, _task_query(db), task_id, scope, "无权暂停此任务")
 
     await task_scheduler.pause_task(task_id, db=db)
+    await _ainvalidate_task_cache(task_id)
 
-    db.refresh(task)
-    return _task_to_response(task, db)
+    task = _reload_task(db, task_id)
+    return _task_to_response(task)
 
 
 @router.post("/{task_id}/resume", response_model=ScheduledTaskResponse)
 async def resume_scheduled_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: CurrentUserResponse = Depends(require_teacher_or_above)
+    current_user: CurrentUserResponse = Depends(require_teacher_or_above),
+    scope: ColumnElement[bool] = Depends(_school_scope_filter)
 ):
     """恢复定时任务"""
-    task = db.query(ScheduledTask).filter(ScheduledTask.id == task_id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"定时任务 {task_id} 不存在"
-        )
-
-    # 权限检查
-    if current_user.role == "school_admin":
-        school_admin = db.query(User).filter(User.id == current_user.id).first()
-        if school_admin and school_admin.school_id and task.school_id != school_admin.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权恢复此任务"
-            )
-    elif current_user.role == "teacher":
-        teacher = db.query(User).filter(User.id == current_user.id).first()
-        if teacher and teacher.school_id and task.school_id != teacher.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权恢复此任务"
-            )
+    task = _get_scoped_task(db, _task_query(db), task_id, scope, "无权恢复此任务")
 
     success = await task_scheduler.resume_task(task_id, db=db)
+    await _ainvalidate_task_cache(task_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="恢复任务失败"
         )
 
-    db.refresh(task)
-    return _task_to_response(task, db)
+    task = _reload_task(db, task_id)
+    return _task_to_response(task)
 
 
 @router.get("/{task_id}/executions", response_model=List[ScheduledTaskExecutionResponse])
-async def list_task_executions(
+def list_task_executions(
     task_id: int,
-    skip: int = Query(0, ge=0),
+    response: Response,
     limit: int = Query(100, ge=1, le=1000),
+    before_started_at: Optional[datetime] = Query(None, description="与 before_id 一起使用，只返回在该记录之前开始的执行记录"),
+    before_id: Optional[int] = Query(None, description="与 before_started_at 一起使用（用于向前翻页）"),
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    scope: ColumnElement[bool] = Depends(_school_scope_filter)
 ):
-    """列出任务的执行记录"""
-    task = db.query(ScheduledTask).filter(ScheduledTask.id == task_id).first()
-    if not task:
+    """列出任务的执行记录
+
+    按 (started_at, id) 倒序进行键集分页：下一页的游标通过 X-Next-Before-Started-At
+    和 X-Next-Before-Id 响应头返回，作为下一次请求的 before_started_at 和 before_id。
+    """
+    if (before_started_at is None) != (before_id is None):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"定时任务 {task_id} 不存在"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="before_started_at 和 before_id 必须同时提供"
         )
 
-    # 权限检查
-    if current_user.role == "school_admin":
-        school_admin = db.query(User).filter(User.id == current_user.id).first()
-        if school_admin and school_admin.school_id and task.school_id != school_admin.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权访问此任务的执行记录"
-            )
-    elif current_user.role == "teacher":
-        teacher = db.query(User).filter(User.id == current_user.id).first()
-        if teacher and teacher.school_id and task.school_id != teacher.school_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="无权访问此任务的执行记录"
-            )
+    _get_scoped_task(db, db.query(ScheduledTask), task_id, scope, "无权访问此任务的执行记录")
 
-    executions = db.query(ScheduledTaskExecution).filter(
+    query = db.query(ScheduledTaskExecution).filter(
         ScheduledTaskExecution.scheduled_task_id == task_id
-    ).order_by(ScheduledTaskExecution.started_at.desc()).offset(skip).limit(limit).all()
+    )
+    if before_id is not None:
+        query = query.filter(
+            tuple_(ScheduledTaskExecution.started_at, ScheduledTaskExecution.id)
+            < (before_started_at, before_id)
+        )
+    executions = query.order_by(
+        ScheduledTaskExecution.started_at.desc(), ScheduledTaskExecution.id.desc()
+    ).limit(limit).all()
 
+    if executions:
+        response.headers["X-Next-Before-Started-At"] = _iso(executions[-1].started_at)
+        response.headers["X-Next-Before-Id"] = str(executions[-1].id)
     return [_execution_to_response(execution) for execution in executions]
 
 
-def _task_to_response(task: ScheduledTask, db: Session) -> ScheduledTaskResponse:
-    """将任务对象转换为响应对象"""
-    # 获取学校名称
-    school_name = None
-    if task.school_id:
-        school = db.query(School).filter(School.id == task.school_id).first()
-        if school:
-            school_name = school.name
+def _task_to_response(task: ScheduledTask) -> ScheduledTaskResponse:
+    """将任务对象转换为响应对象（学校与创建者通过关系读取，单条查询中已预加载）"""
+    creator = task.creator
+    return _build_task_response(
+        task,
+        school_name=task.school.name if task.school else None,
+        creator_name=(creator.nickname or creator.username) if creator else None
+    )
+
+
+# 枚举成员到字符串值的映射（字典查找比逐行访问 Enum.value 属性更快）
+_STATUS_VALUES = {member: member.value for member in ScheduleStatus}
+_TRIGGER_TYPE_VALUES = {member: member.value for member in ScheduleTriggerType}
 
-    # 获取创建者名称
-    creator_name = None
-    if task.created_by:
-        creator = db.query(User).filter(User.id == task.created_by).first()
-        if creator:
-            creator_name = creator.nickname or creator.username
 
+def _build_task_response(task, school_name: Optional[str], creator_name: Optional[str]) -> ScheduledTaskResponse:
+    """由任务对象或列表查询的结果行构建响应对象"""
     return ScheduledTaskResponse(
         id=task.id,
         name=task.name,
         description=task.description,
-        status=task.status.value,
-        trigger_type=task.trigger_type.value,
+        status=_STATUS_VALUES[task.status],
+        trigger_type=_TRIGGER_TYPE_VALUES[task.trigger_type],
         interval_seconds=task.interval_seconds,
         cron_expression=task.cron_expression,
-        run_at=task.run_at,
+        run_at=_iso(task.run_at),
         training_mode=task.training_mode,
         school_id=task.school_id,
         school_name=school_name,
         force_retrain=task.force_retrain,
-        last_run_at=task.last_run_at,
-        next_run_at=task.next_run_at,
+        last_run_at=_iso(task.last_run_at),
+        next_run_at=_iso(task.next_run_at),
         total_runs=task.total_runs,
         success_runs=task.success_runs,
         failed_runs=task.failed_runs,
         last_error=task.last_error,
         created_by=task.created_by,
         creator_name=creator_name,
-        created_at=task.created_at,
-        updated_at=task.updated_at
+        created_at=_iso(task.created_at),
+        updated_at=_iso(task.updated_at)
     )
 
 
@@ -525,9 +677,9 @@ def _execution_to_response(execution: ScheduledTaskExecution) -> ScheduledTaskEx
         id=execution.id,
         scheduled_task_id=execution.scheduled_task_id,
         training_job_id=execution.training_job_id,
-        started_at=execution.started_at,
-        completed_at=execution.completed_at,
-        status=execution.status.value,
+        started_at=_iso(execution.started_at),
+        completed_at=_iso(execution.completed_at),
+        status=execution.status,
         output=execution.output,
         error_message=execution.error_message
     )
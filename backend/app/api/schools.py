@@ -1,9 +1,12 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from ..core.database import get_db
 from ..models.school import School
+from ..models.user import User
 from ..utils.dependencies import require_system_admin, CurrentUserResponse
 
 router = APIRouter(prefix="/schools", tags=["学校管理"])
@@ -27,15 +30,34 @@ class SchoolResponse(BaseModel):
         from_attributes = True
 
 
+def _school_summaries(db: Session):
+    """学校的响应列及用户数量（只查询需要的列，不构建ORM对象）"""
+    return (
+        db.query(School.id, School.name, School.created_at, func.count(User.id).label("user_count"))
+        .outerjoin(User, User.school_id == School.id)
+        .group_by(School.id, School.name, School.created_at)
+    )
+
+
+def _to_response(school, user_count: int) -> SchoolResponse:
+    """由学校对象或列表查询的结果行构建响应对象"""
+    return SchoolResponse(
+        id=school.id,
+        name=school.name,
+        created_at=school.created_at.isoformat() if school.created_at else "",
+        user_count=user_count
+    )
+
+
 @router.post("", response_model=SchoolResponse, status_code=status.HTTP_201_CREATED)
-async def create_school(
+def create_school(
     school_data: SchoolCreate,
     db: Session = Depends(get_db),
     current_user: CurrentUserResponse = Depends(require_system_admin)
 ):
     """创建学校（仅系统管理员）"""
-    existing = db.query(School).filter(School.name == school_data.name).first()
-    if existing:
+    existing_id = db.query(School.id).filter(School.name == school_data.name).scalar()
+    if existing_id is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="学校名称已存在"
@@ -46,121 +68,96 @@ async def create_school(
     db.commit()
     db.refresh(school)
     # 返回序列化后的数据
-    return SchoolResponse(
-        id=school.id,
-        name=school.name,
-        created_at=school.created_at.isoformat() if school.created_at else "",
-        user_count=0
-    )
+    return _to_response(school, 0)
 
 
 @router.get("", response_model=List[SchoolResponse])
-async def list_schools(
+def list_schools(
     db: Session = Depends(get_db),
     current_user: CurrentUserResponse = Depends(require_system_admin)
 ):
-    """列出所有学校"""
-    schools = db.query(School).all()
-    result = []
-    for school in schools:
-        # 计算每个学校的用户数量
-        user_count = db.query(School).filter(School.id == school.id).first() and \
-                    len(school.users) if hasattr(school, 'users') else 0
-        if not hasattr(school, 'users'):
-            from ..models.user import User
-            user_count = db.query(User).filter(User.school_id == school.id).count()
-        result.append(SchoolResponse(
-            id=school.id,
-            name=school.name,
-            created_at=school.created_at.isoformat() if school.created_at else "",
-            user_count=user_count
-        ))
-    return result
+    """列出所有学校（用户数量由同一条 GROUP BY 查询统计）"""
+    rows = _school_summaries(db).order_by(School.id).all()
+    return [_to_response(row, row.user_count) for row in rows]
 
 
 @router.get("/{school_id}", response_model=SchoolResponse)
-async def get_school(
+def get_school(
     school_id: int,
     db: Session = Depends(get_db),
     current_user: CurrentUserResponse = Depends(require_system_admin)
 ):
     """获取单个学校信息"""
-    school = db.query(School).filter(School.id == school_id).first()
-    if not school:
+    row = _school_summaries(db).filter(School.id == school_id).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="学校不存在"
         )
-    from ..models.user import User
-    user_count = db.query(User).filter(User.school_id == school_id).count()
-    return SchoolResponse(
-        id=school.id,
-        name=school.name,
-        created_at=school.created_at.isoformat() if school.created_at else "",
-        user_count=user_count
-    )
+    return _to_response(row, row.user_count)
 
 
 @router.put("/{school_id}", response_model=SchoolResponse)
-async def update_school(
+def update_school(
     school_id: int,
     school_data: SchoolUpdate,
     db: Session = Depends(get_db),
     current_user: CurrentUserResponse = Depends(require_system_admin)
 ):
-    """更新学校信息（仅系统管理员）"""
-    school = db.query(School).filter(School.id == school_id).first()
-    if not school:
+    """更新学校信息（仅系统管理员）
+
+    不预先查询学校和重名：直接执行一条 UPDATE，由 schools.name 唯一约束原子地
+    拒绝重名（避免检查与更新之间的竞态），未匹配到行时返回404。
+    """
+    try:
+        result = db.execute(
+            update(School).where(School.id == school_id).values(name=school_data.name)
+        )
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="学校名称已存在"
+        )
+    if result.rowcount == 0:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="学校不存在"
         )
 
-    # 检查学校名称是否已被其他学校使用
-    if school_data.name != school.name:
-        existing = db.query(School).filter(School.name == school_data.name).first()
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="学校名称已存在"
-            )
-
-    school.name = school_data.name
+    row = _school_summaries(db).filter(School.id == school_id).one()
     db.commit()
-    db.refresh(school)
-
-    from ..models.user import User
-    user_count = db.query(User).filter(User.school_id == school_id).count()
-    return SchoolResponse(
-        id=school.id,
-        name=school.name,
-        created_at=school.created_at.isoformat() if school.created_at else "",
-        user_count=user_count
-    )
+    return _to_response(row, row.user_count)
 
 
 @router.delete("/{school_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_school(
+def delete_school(
     school_id: int,
     db: Session = Depends(get_db),
     current_user: CurrentUserResponse = Depends(require_system_admin)
 ):
-    """删除学校（仅系统管理员）"""
-    school = db.query(School).filter(School.id == school_id).first()
+    """删除学校（仅系统管理员）
+
+    不预先统计关联用户：users.school_id 外键会在同一条 DELETE 中原子地拒绝删除
+    仍有用户的学校（避免检查与删除之间新增用户的竞态），失败时再统计用户数返回。
+    """
+    school = db.get(School, school_id)
     if not school:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="学校不存在"
         )
 
-    # 检查学校是否有关联用户
-    from ..models.user import User
-    user_count = db.query(User).filter(User.school_id == school_id).count()
-    if user_count > 0:
+    db.delete(school)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        user_count = db.query(func.count(User.id)).filter(User.school_id == school_id).scalar()
+        if not user_count:
+            raise
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"该学校下有 {user_count} 个用户，无法删除"
         )
-
-    db.delete(school)
-    db.commit()
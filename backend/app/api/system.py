@@ -1,5 +1,7 @@
 import os
-from fastapi import APIRouter, Depends, HTTPException, status
+from functools import lru_cache
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from ..core.database import get_db
@@ -7,6 +9,8 @@ from ..core.config import settings
 from ..models.user import User
 from ..utils.dependencies import get_current_user, require_system_admin, require_manage_system_permission, CurrentUserResponse
 from ..core.config import Settings
+from ..core import migrations
+from ..utils.reloadable import clear_settings_caches, on_settings_reload
 from importlib import reload
 
 
@@ -19,6 +23,16 @@ class ReloadResponse(BaseModel):
 router = APIRouter(prefix="/system", tags=["系统管理"])
 
 
+@router.get("/migration-status")
+async def get_migration_status():
+    """
+    获取数据库迁移状态
+
+    公开接口，用于部署脚本/负载均衡判断后台迁移是否完成。
+    """
+    return migrations.get_migration_status()
+
+
 @router.post("/reload", response_model=ReloadResponse)
 async def reload_system(
     current_user: CurrentUserResponse = Depends(require_manage_system_permission)
@@ -45,6 +59,9 @@ async def reload_system(
             new_settings = Settings()
             settings.__dict__.update(new_settings.__dict__)
 
+            # 清空依赖旧配置的缓存
+            clear_settings_caches()
+
         return ReloadResponse(
             message="系统配置已重新加载",
             reloaded=True
@@ -56,6 +73,43 @@ async def reload_system(
         )
 
 
+@lru_cache(maxsize=4)
+def _build_system_config(
+    database_url: str,
+    inference_host: str,
+    inference_port: int,
+    redis_host: str,
+    redis_port: int,
+    upload_dir: str,
+    samples_dir: str,
+    models_dir: str,
+    max_upload_size: int,
+    cors_origins: str,
+) -> bytes:
+    """构建序列化后的系统配置（以配置值为键缓存，配置重载后自动生成新值）"""
+    # 隐藏数据库密码
+    if '//' in database_url:
+        at_index = database_url.index('//')
+        # 保留到@之前的部分，然后拼接@***来隐藏密码
+        database_url = database_url[:at_index] + '//***'
+
+    return orjson.dumps({
+        "database_url": database_url,
+        "inference_service": f"{inference_host}:{inference_port}",
+        "redis": f"{redis_host}:{redis_port}",
+        "upload_dir": upload_dir,
+        "samples_dir": samples_dir,
+        "models_dir": models_dir,
+        "max_upload_size": max_upload_size,
+        "max_upload_size_mb": max_upload_size // (1024 * 1024),
+        # cors_origins 作为缓存键，解析结果由 settings 给出
+        "cors_origins": settings.cors_origins_list,
+    })
+
+
+on_settings_reload(_build_system_config.cache_clear)
+
+
 @router.get("/config", response_model=dict)
 async def get_system_config(
     current_user: CurrentUserResponse = Depends(require_manage_system_permission)
@@ -65,23 +119,16 @@ async def get_system_config(
 
     返回当前加载的配置信息，用于验证配置是否正确加载。
     """
-    # 隐藏数据库密码
-    if '//' in settings.DATABASE_URL:
-        at_index = settings.DATABASE_URL.index('//')
-        # 保留到@之前的部分，然后拼接@***来隐藏密码
-        database_url = settings.DATABASE_URL[:at_index] + '//***'
-    else:
-        database_url = settings.DATABASE_URL
-
-    config_dict = {
-        "database_url": database_url,
-        "inference_service": f"{settings.INFERENCE_SERVICE_HOST}:{settings.INFERENCE_SERVICE_PORT}",
-        "redis": f"{settings.REDIS_HOST}:{settings.REDIS_PORT}",
-        "upload_dir": settings.UPLOAD_DIR,
-        "samples_dir": settings.SAMPLES_DIR,
-        "models_dir": settings.MODELS_DIR,
-        "max_upload_size": settings.MAX_UPLOAD_SIZE,
-        "max_upload_size_mb": settings.MAX_UPLOAD_SIZE // (1024 * 1024),
-        "cors_origins": settings.cors_origins_list,
-    }
-    return config_dict
+    body = _build_system_config(
+        settings.DATABASE_URL,
+        settings.INFERENCE_SERVICE_HOST,
+        settings.INFERENCE_SERVICE_PORT,
+        settings.REDIS_HOST,
+        settings.REDIS_PORT,
+        settings.UPLOAD_DIR,
+        settings.SAMPLES_DIR,
+        settings.MODELS_DIR,
+        settings.MAX_UPLOAD_SIZE,
+        settings.CORS_ORIGINS,
+    )
+    return Response(content=body, media_type="application/json")
@@ -1,22 +1,35 @@
 """
 Token API for external application integration
 """
-from datetime import timedelta, timezone
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from functools import lru_cache
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Header
+from fastapi.responses import ORJSONResponse
 from fastapi.security import APIKeyHeader
+from sqlalchemy import select
+from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, field_validator, Field
 from ..core.database import get_db
 from ..core.config import settings
 from ..models.user import User, UserRole
-from ..utils.security import verify_password, create_access_token
+from ..models.api_token import ApiToken, TokenPermission, PERMISSION_BITS, SCOPE_PERMISSIONS
+from ..utils.security import ais_token_blacklisted, averify_credentials, create_access_token
 from ..utils.dependencies import get_current_user, CurrentUserResponse, require_role, require_manage_system_permission, require_school_admin_or_above
 from ..utils.datetime_utils import utc_now, serialize_datetime_utc
+from ..utils.cache import get_cache
+from ..utils.reloadable import on_settings_reload
+import asyncio
+import hashlib
+import hmac
+import orjson
 import secrets
 import string
+import time
 
-router = APIRouter(prefix="/v1/tokens", tags=["External Token API"])
+router = APIRouter(prefix="/v1/tokens", tags=["External Token API"], default_response_class=ORJSONResponse)
 
 # Add token management routes
 token_management_router = APIRouter(prefix="/tokens", tags=["Token Management"])
@@ -26,6 +39,22 @@ token_management_router = APIRouter(prefix="/tokens", tags=["Token Management"])
 # Pydantic Models for Request/Response
 # ============================================================================
 
+class Scope(IntEnum):
+    """Token scope (a higher value grants more access)"""
+    READ = 1
+    WRITE = 2
+    ADMIN = 3
+
+
+# Maximum scope each role may request
+_ROLE_MAX_SCOPE = {
+    UserRole.STUDENT: Scope.READ,
+    UserRole.TEACHER: Scope.WRITE,
+    UserRole.SCHOOL_ADMIN: Scope.ADMIN,
+    UserRole.SYSTEM_ADMIN: Scope.ADMIN,
+}
+
+
 class ExternalTokenRequest(BaseModel):
     """External application token request"""
     username: str = Field(..., description="Username (学生/老师/管理员)")
@@ -96,6 +125,46 @@ class UserInfoResponse(BaseModel):
     created_at: str
 
 
+# 校验通过的令牌缓存保存在共享缓存（Redis）中，所有worker共用：吊销或删除API令牌时删除对应的键，
+# 立即对所有worker生效。用户被删除或角色变更不会主动失效，最长在
+# TOKEN_VERIFY_CACHE_TTL_SECONDS 内仍可能返回变更前的结果。
+VERIFY_CACHE_PREFIX = "token_verify:"
+
+
+def _verify_cache_key(token: str) -> str:
+    """校验缓存键（以签名密钥计算的令牌摘要：不保存完整令牌，更换密钥后旧条目不再命中）"""
+    digest = hmac.new(settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+    return VERIFY_CACHE_PREFIX + digest[:32]
+
+
+def _get_cached_verification(cache_key: str) -> Optional[dict]:
+    """命中且未超过缓存截止时间时返回缓存的校验结果"""
+    if settings.TOKEN_VERIFY_CACHE_TTL_SECONDS <= 0:
+        return None
+    cached = get_cache().get(cache_key)
+    if not isinstance(cached, dict):
+        return None
+    # Redis 不可用时的内存缓存不会自动过期，按写入时记录的截止时间判断
+    if cached["cached_until"] <= time.time():
+        get_cache().delete(cache_key)
+        return None
+    return cached["response"]
+
+
+def _cache_verification(cache_key: str, response: "TokenVerifyResponse", expires_ts: Optional[float]) -> None:
+    """缓存校验通过的结果，缓存时间不超过令牌的剩余有效期"""
+    ttl = settings.TOKEN_VERIFY_CACHE_TTL_SECONDS
+    if expires_ts is not None:
+        ttl = min(ttl, int(expires_ts - time.time()))
+    if ttl <= 0:
+        return
+    get_cache().set(
+        cache_key,
+        {"response": response.model_dump(), "cached_until": time.time() + ttl},
+        ttl=ttl
+    )
+
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
@@ -164,7 +233,7 @@ async def create_external_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not verify_password(request.password, user.password_hash):
+    if not await averify_credentials(request.username, request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication failed: Invalid password",
@@ -172,21 +241,13 @@ async def create_external_token(
         )
 
     # Validate scope based on user role
-    role_to_max_scope = {
-        UserRole.STUDENT: "read",
-        UserRole.TEACHER: "write",
-        UserRole.SCHOOL_ADMIN: "admin",
-        UserRole.SYSTEM_ADMIN: "admin",
-    }
-
-    max_allowed_scope = role_to_max_scope.get(user.role, "read")
+    max_allowed_scope = _ROLE_MAX_SCOPE.get(user.role, Scope.READ)
 
     # Check if requested scope is allowed
-    scope_priority = {"read": 1, "write": 2, "admin": 3}
-    if scope_priority.get(request.scope, 0) > scope_priority.get(max_allowed_scope, 0):
+    if Scope[request.scope.upper()] > max_allowed_scope:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"Permission denied: User role '{user.role}' cannot request scope '{request.scope}'. Maximum allowed scope is '{max_allowed_scope}'"
+            detail=f"Permission denied: User role '{user.role.value}' cannot request scope '{request.scope}'. Maximum allowed scope is '{max_allowed_scope.name.lower()}'"
         )
 
     # Create access token with extended expiration for external apps
@@ -264,13 +325,31 @@ async def verify_token(request: TokenVerifyRequest, db: Session = Depends(get_db
     }
     ```
     """
-    from jose import JWTError, jwt
-    from ..models.api_token import ApiToken
+    # 已登出的JWT令牌：黑名单在共享缓存中，所有worker可见，须先于本地校验缓存检查
+    if not request.token.startswith("hwtk_") and await ais_token_blacklisted(request.token):
+        return TokenVerifyResponse(
+            valid=False,
+            error="Token has been revoked"
+        )
+
+    # 短时间内重复校验同一令牌时直接返回缓存结果，跳过签名校验和数据库查询
+    cache_key = _verify_cache_key(request.token)
+    cached = await asyncio.to_thread(_get_cached_verification, cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
 
     # Check if it's an API token
     if request.token.startswith("hwtk_"):
-        # Verify API token
-        api_token = db.query(ApiToken).filter(ApiToken.token == request.token).first()
+        # Verify API token: 令牌与所属用户用一次 LEFT JOIN 查询取出所需的列，不构建ORM对象
+        api_token = db.execute(
+            select(
+                ApiToken.is_active, ApiToken.is_revoked, ApiToken.expires_at, ApiToken.scope,
+                User.id, User.username, User.nickname, User.role, User.school_id
+            )
+            .select_from(ApiToken)
+            .outerjoin(User, User.id == ApiToken.user_id)
+            .where(ApiToken.token == request.token)
+        ).first()
 
         if not api_token:
             return TokenVerifyResponse(
@@ -289,7 +368,6 @@ async def verify_token(request: TokenVerifyRequest, db: Session = Depends(get_db
         # Ensure expires_at is timezone-aware before comparison
         expires_at = api_token.expires_at
         if expires_at is not None:
-            from datetime import timezone
             if expires_at.tzinfo is None:
                 expires_at = expires_at.replace(tzinfo=timezone.utc)
 
@@ -299,9 +377,8 @@ async def verify_token(request: TokenVerifyRequest, db: Session = Depends(get_db
                 error="API token has expired"
             )
 
-        # Get user associated with token
-        user = db.query(User).filter(User.id == api_token.user_id).first()
-        if not user:
+        # User associated with token
+        if api_token.id is None:
             return TokenVerifyResponse(
                 valid=False,
                 error="User not found"
@@ -309,34 +386,39 @@ async def verify_token(request: TokenVerifyRequest, db: Session = Depends(get_db
 
         # Build user info
         user_info = {
-            "id": user.id,
-            "username": user.username,
-            "nickname": user.nickname,
-            "role": user.role.value,
-            "school_id": user.school_id,
+            "id": api_token.id,
+            "username": api_token.username,
+            "nickname": api_token.nickname,
+            "role": api_token.role.value,
+            "school_id": api_token.school_id,
             "scope": api_token.scope
         }
 
         # Ensure expires_at is timezone-aware before formatting
         expires_at_response = api_token.expires_at
         if expires_at_response is not None:
-            from datetime import timezone
             if expires_at_response.tzinfo is None:
                 expires_at_response = expires_at_response.replace(tzinfo=timezone.utc)
             expires_at_response = expires_at_response.isoformat() + "Z"
         else:
             expires_at_response = None
 
-        return TokenVerifyResponse(
+        response = TokenVerifyResponse(
             valid=True,
             user_info=user_info,
             expires_at=expires_at_response
         )
+        await asyncio.to_thread(
+            _cache_verification, cache_key, response, expires_at.timestamp() if expires_at else None
+        )
+        return response
 
     # Verify JWT token
     try:
-        # Decode and verify token
-        payload = jwt.decode(request.token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        # Decode and verify token（签名校验在线程池中执行，避免认证高峰时阻塞事件循环）
+        payload = await asyncio.to_thread(
+            jwt.decode, request.token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
         username: str = payload.get("sub")
         scope: str = payload.get("scope", "read")
         exp: int = payload.get("exp")
@@ -347,8 +429,11 @@ async def verify_token(request: TokenVerifyRequest, db: Session = Depends(get_db
                 error="Invalid token: missing username claim"
             )
 
-        # Get user from database
-        user = db.query(User).filter(User.username == username).first()
+        # Get user from database (only the columns needed for user info)
+        user = db.execute(
+            select(User.id, User.username, User.nickname, User.role, User.school_id)
+            .where(User.username == username)
+        ).first()
         if user is None:
             return TokenVerifyResponse(
                 valid=False,
@@ -365,11 +450,13 @@ async def verify_token(request: TokenVerifyRequest, db: Session = Depends(get_db
             "scope": scope
         }
 
-        return TokenVerifyResponse(
+        response = TokenVerifyResponse(
             valid=True,
             user_info=user_info,
             expires_at=datetime.fromtimestamp(exp).isoformat() + "Z"
         )
+        await asyncio.to_thread(_cache_verification, cache_key, response, exp)
+        return response
 
     except JWTError as e:
         error_msg = str(e)
@@ -409,14 +496,15 @@ async def get_token_user(current_user: CurrentUserResponse = Depends(get_current
     }
     ```
     """
-    return UserInfoResponse(
-        id=current_user.id,
-        username=current_user.username,
-        nickname=current_user.nickname,
-        role=current_user.role,
-        school_id=current_user.school_id,
-        created_at=current_user.created_at or serialize_datetime_utc(utc_now())
-    )
+    # 字段已由 CurrentUserResponse 校验，直接序列化，跳过 UserInfoResponse 的再次校验
+    return ORJSONResponse({
+        "id": current_user.id,
+        "username": current_user.username,
+        "nickname": current_user.nickname,
+        "role": current_user.role,
+        "school_id": current_user.school_id,
+        "created_at": current_user.created_at or serialize_datetime_utc(utc_now()),
+    })
 
 
 @router.post("/revoke", response_model=ExternalAPIMessage)
@@ -454,6 +542,75 @@ async def revoke_token(
     )
 
 
+@lru_cache(maxsize=4)
+def _build_api_config(base_url: str, max_upload_size: int, token_expiry_minutes: int) -> bytes:
+    """构建序列化后的API配置（以配置值为键缓存，配置重载后自动生成新值）"""
+    return orjson.dumps({
+        "version": "1.0.0",
+        "base_url": base_url,
+        "endpoints": {
+            "token_create": "/api/v1/tokens/create",
+            "token_verify": "/api/v1/tokens/verify",
+            "recognition": "/api/recognition",
+            "samples": "/api/samples",
+            "samples_upload": "/api/samples/upload",
+            "users": "/api/users",
+            "users_me": "/api/auth/me",
+            "training": "/api/training",
+            "quotas": "/api/quotas"
+        },
+        "limits": {
+            "max_upload_size": max_upload_size,
+            "token_expiry_minutes": token_expiry_minutes
+        },
+        "supported_scopes": ["read", "write", "admin"],
+        "supported_roles": ["student", "teacher", "school_admin", "system_admin"]
+    })
+
+
+on_settings_reload(_build_api_config.cache_clear)
+
+
+# API信息与配置无关，启动时序列化一次
+_API_INFO_BODY = orjson.dumps({
+    "name": "Handwriting Recognition Token API",
+    "version": "1.0.0",
+    "description": "External API for handwriting recognition system integration",
+    "authentication": "Bearer Token",
+    "base_url": "http://localhost:8000",
+    "documentation": "/docs",
+    "endpoints": [
+        "/api/v1/tokens/create (POST)",
+        "/api/v1/tokens/verify (POST)",
+        "/api/v1/tokens/me (GET)",
+        "/api/v1/tokens/revoke (POST)",
+        "/api/v1/tokens/config (GET)",
+        "/api/v1/tokens/info (GET)"
+    ],
+    "scopes": {
+        "read": "View samples, users, recognition logs",
+        "write": "Upload samples, perform recognition",
+        "admin": "Full administrative access"
+    },
+    "roles": {
+        "student": "Can only access own data",
+        "teacher": "Can manage students and perform recognition",
+        "school_admin": "Can manage school users",
+        "system_admin": "Full system access"
+    },
+    "rate_limiting": {
+        "supported": True,
+        "description": "Rate limiting is enabled for recognition requests",
+        "quota_management": "/api/quotas"
+    }
+})
+# ETag 取内容摘要，升级后内容变化时客户端自然重新获取
+_API_INFO_HEADERS = {
+    "ETag": '"' + hashlib.blake2b(_API_INFO_BODY, digest_size=8).hexdigest() + '"',
+    "Cache-Control": "public, no-cache",
+}
+
+
 @router.get("/config", response_model=dict)
 async def get_api_config(
     current_user: CurrentUserResponse = Depends(get_current_user)
@@ -486,31 +643,16 @@ async def get_api_config(
     }
     ```
     """
-    return {
-        "version": "1.0.0",
-        "base_url": str(settings.__dict__.get('SERVER_URL', 'http://localhost:8000')),
-        "endpoints": {
-            "token_create": "/api/v1/tokens/create",
-            "token_verify": "/api/v1/tokens/verify",
-            "recognition": "/api/recognition",
-            "samples": "/api/samples",
-            "samples_upload": "/api/samples/upload",
-            "users": "/api/users",
-            "users_me": "/api/auth/me",
-            "training": "/api/training",
-            "quotas": "/api/quotas"
-        },
-        "limits": {
-            "max_upload_size": settings.MAX_UPLOAD_SIZE,
-            "token_expiry_minutes": settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        },
-        "supported_scopes": ["read", "write", "admin"],
-        "supported_roles": ["student", "teacher", "school_admin", "system_admin"]
-    }
+    body = _build_api_config(
+        str(settings.__dict__.get('SERVER_URL', 'http://localhost:8000')),
+        settings.MAX_UPLOAD_SIZE,
+        settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    )
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/info", response_model=dict)
-async def get_api_info():
+async def get_api_info(request: Request):
     """
     Get API information (public endpoint)
 
@@ -537,38 +679,10 @@ async def get_api_info():
     }
     ```
     """
-    return {
-        "name": "Handwriting Recognition Token API",
-        "version": "1.0.0",
-        "description": "External API for handwriting recognition system integration",
-        "authentication": "Bearer Token",
-        "base_url": "http://localhost:8000",
-        "documentation": "/docs",
-        "endpoints": [
-            "/api/v1/tokens/create (POST)",
-            "/api/v1/tokens/verify (POST)",
-            "/api/v1/tokens/me (GET)",
-            "/api/v1/tokens/revoke (POST)",
-            "/api/v1/tokens/config (GET)",
-            "/api/v1/tokens/info (GET)"
-        ],
-        "scopes": {
-            "read": "View samples, users, recognition logs",
-            "write": "Upload samples, perform recognition",
-            "admin": "Full administrative access"
-        },
-        "roles": {
-            "student": "Can only access own data",
-            "teacher": "Can manage students and perform recognition",
-            "school_admin": "Can manage school users",
-            "system_admin": "Full system access"
-        },
-        "rate_limiting": {
-            "supported": True,
-            "description": "Rate limiting is enabled for recognition requests",
-            "quota_management": "/api/quotas"
-        }
-    }
+    # 内容固定，ETag 与 If-None-Match 一致时直接返回 304
+    if request.headers.get("if-none-match") == _API_INFO_HEADERS["ETag"]:
+        return Response(status_code=304, headers=_API_INFO_HEADERS)
+    return Response(content=_API_INFO_BODY, media_type="application/json", headers=_API_INFO_HEADERS)
 
 
 # ============================================================================
@@ -602,8 +716,6 @@ async def list_api_tokens(
 
     Returns all API tokens owned by the current user.
     """
-    from ..models.api_token import ApiToken
-
     # Build base query
     query = db.query(ApiToken).filter(ApiToken.user_id == current_user.id)
 
@@ -618,16 +730,7 @@ async def list_api_tokens(
     for token in tokens:
         token_dict = token.to_dict(include_token=False)
         # Map database permissions to frontend format
-        token_dict["permissions"] = {
-            "read_samples": token.can_read_samples,
-            "write_samples": token.can_write_samples,
-            "recognize": token.can_recognize,
-            "read_users": token.can_read_users,
-            "manage_users": token.can_manage_users,
-            "manage_schools": token.can_manage_schools,
-            "manage_training": token.can_manage_training,
-            "manage_system": token.can_manage_system
-        }
+        token_dict["permissions"] = token.permission_dict()
         tokens_data.append(token_dict)
 
     return ApiTokenListResponse(tokens=tokens_data, total=len(tokens_data))
@@ -644,9 +747,6 @@ async def create_api_token(
 
     Creates a new persistent API token with the specified scope and permissions.
     """
-    from ..models.api_token import ApiToken
-    from datetime import timedelta
-
     # Validate scope
     valid_scopes = ['read', 'write', 'admin']
     if request.scope not in valid_scopes:
@@ -667,7 +767,6 @@ async def create_api_token(
         elif request.expiration_type == "90d":
             expires_at = utc_now() + timedelta(days=90)
         elif request.expiration_type == "custom" and request.custom_expires_at:
-            from datetime import datetime
             try:
                 expires_at = datetime.fromisoformat(request.custom_expires_at.replace('Z', '+00:00'))
                 if expires_at.tzinfo is None:
@@ -683,53 +782,13 @@ async def create_api_token(
     token_value = "hwtk_" + ''.join(secrets.choice(token_chars) for _ in range(64))
 
     # Set permissions based on scope and custom permissions
-    if request.scope == "read":
-        can_read_samples = True
-        can_write_samples = False
-        can_recognize = False
-        can_read_users = True
-        can_manage_users = False
-        can_manage_schools = False
-        can_manage_training = False
-        can_manage_system = False
-    elif request.scope == "write":
-        can_read_samples = True
-        can_write_samples = True
-        can_recognize = True
-        can_read_users = True
-        can_manage_users = False
-        can_manage_schools = False
-        can_manage_training = False
-        can_manage_system = False
-    elif request.scope == "admin":
-        can_read_samples = True
-        can_write_samples = True
-        can_recognize = True
-        can_read_users = True
-        can_manage_users = True
-        can_manage_schools = True
-        can_manage_training = True
-        can_manage_system = True
-    else:
-        can_read_samples = False
-        can_write_samples = False
-        can_recognize = False
-        can_read_users = False
-        can_manage_users = False
-        can_manage_schools = False
-        can_manage_training = False
-        can_manage_system = False
+    permissions = SCOPE_PERMISSIONS.get(request.scope, TokenPermission(0))
 
     # Override with custom permissions if provided
     if request.permissions:
-        can_read_samples = "read_samples" in request.permissions
-        can_write_samples = "write_samples" in request.permissions
-        can_recognize = "recognize" in request.permissions
-        can_read_users = "read_users" in request.permissions
-        can_manage_users = "manage_users" in request.permissions
-        can_manage_schools = "manage_schools" in request.permissions
-        can_manage_training = "manage_training" in request.permissions
-        can_manage_system = "manage_system" in request.permissions
+        permissions = TokenPermission(0)
+        for name in request.permissions:
+            permissions |= PERMISSION_BITS.get(name, TokenPermission(0))
 
     # Create API token
     api_token = ApiToken(
@@ -743,14 +802,7 @@ async def create_api_token(
         is_active=True,
         is_revoked=False,
         expires_at=expires_at,
-        can_read_samples=can_read_samples,
-        can_write_samples=can_write_samples,
-        can_recognize=can_recognize,
-        can_read_users=can_read_users,
-        can_manage_users=can_manage_users,
-        can_manage_schools=can_manage_schools,
-        can_manage_training=can_manage_training,
-        can_manage_system=can_manage_system
+        permissions=int(permissions)
     )
 
     db.add(api_token)
@@ -762,16 +814,7 @@ async def create_api_token(
         "name": api_token.name,
         "token": api_token.token,
         "scope": api_token.scope,
-        "permissions": {
-            "read_samples": api_token.can_read_samples,
-            "write_samples": api_token.can_write_samples,
-            "recognize": api_token.can_recognize,
-            "read_users": api_token.can_read_users,
-            "manage_users": api_token.can_manage_users,
-            "manage_schools": api_token.can_manage_schools,
-            "manage_training": api_token.can_manage_training,
-            "manage_system": api_token.can_manage_system
-        },
+        "permissions": api_token.permission_dict(),
         "created_at": serialize_datetime_utc(utc_now()),
         "expires_at": expires_at.isoformat() + "Z" if expires_at else None,
         "message": "API Token created successfully"
@@ -789,8 +832,6 @@ async def delete_api_token(
 
     Permanently deletes the specified API token.
     """
-    from ..models.api_token import ApiToken
-
     # Find the token
     api_token = db.query(ApiToken).filter(ApiToken.id == token_id).first()
 
@@ -809,8 +850,10 @@ async def delete_api_token(
         )
 
     # Delete the token
+    cache_key = _verify_cache_key(api_token.token)
     db.delete(api_token)
     db.commit()
+    await asyncio.to_thread(get_cache().delete, cache_key)
 
     return {
         "message": "Token deleted successfully",
@@ -829,8 +872,6 @@ async def revoke_api_token(
 
     Revokes the specified API token. It can no longer be used to access the API.
     """
-    from ..models.api_token import ApiToken
-
     # Find the token
     api_token = db.query(ApiToken).filter(ApiToken.id == token_id).first()
 
@@ -849,10 +890,12 @@ async def revoke_api_token(
         )
 
     # Revoke the token
+    cache_key = _verify_cache_key(api_token.token)
     api_token.is_revoked = True
     api_token.is_active = False
     api_token.revoked_at = utc_now()
     db.commit()
+    await asyncio.to_thread(get_cache().delete, cache_key)
 
     return {
         "message": "Token revoked successfully",
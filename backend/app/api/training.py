@@ -8,7 +8,7 @@ from ..models.training_job import TrainingJob, TrainingJobStatus
 from ..models.model import Model
 from ..utils.dependencies import require_teacher_or_above, get_current_user, CurrentUserResponse
 import grpc
-from ..services.inference_client import InferenceClient
+from ..services.inference_client import get_inference_client
 
 router = APIRouter(prefix="/training", tags=["训练管理"])
 
@@ -49,7 +49,8 @@ async def start_training(
 ):
     """启动训练任务"""
     from ..models.sample import Sample, SampleStatus
-    eligible_samples = db.query(Sample).filter(Sample.status == SampleStatus.PROCESSED).count()
+    # 只需判断是否达到3个，最多统计3行即可
+    eligible_samples = db.query(Sample.id).filter(Sample.status == SampleStatus.PROCESSED).limit(3).count()
     if eligible_samples < 3:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,7 +75,7 @@ async def start_training(
     db.refresh(job)
 
     try:
-        client = InferenceClient()
+        client = get_inference_client()
         await client.train_model(job.id, force_retrain=training_data.force_retrain)
         job.status = TrainingJobStatus.RUNNING
         job.started_at = datetime.now(timezone.utc)
@@ -113,7 +114,7 @@ async def list_training_jobs(
 
     jobs = query.order_by(TrainingJob.created_at.desc()).limit(50).all()
 
-    client = InferenceClient()
+    client = get_inference_client()
     for job in jobs:
         if job.status in (TrainingJobStatus.PENDING, TrainingJobStatus.RUNNING):
             try:
@@ -174,7 +175,7 @@ async def get_training_recommendation(
 ):
     """获取训练建议"""
     try:
-        client = InferenceClient()
+        client = get_inference_client()
         recommendation = await client.get_training_recommendation()
         return recommendation
     except Exception as e:
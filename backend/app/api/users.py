@@ -81,10 +81,10 @@ async def create_user(
             detail="用户名已存在"
         )
     
-    from ..utils.security import get_password_hash
+    from ..utils.security import aget_password_hash
     new_user = User(
         username=user_data.username,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await aget_password_hash(user_data.password),
         nickname=user_data.nickname,  # 添加昵称
         role=user_data.role,
         school_id=user_data.school_id or current_user.school_id
@@ -378,8 +378,8 @@ async def update_user(
         )
 
     if user_data.password:
-        from ..utils.security import get_password_hash
-        user.password_hash = get_password_hash(user_data.password)
+        from ..utils.security import aget_password_hash
+        user.password_hash = await aget_password_hash(user_data.password)
     if user_data.nickname is not None:
         user.nickname = user_data.nickname
     if user_data.role:
@@ -491,10 +491,10 @@ async def batch_create_students(
                 continue
 
             # 创建用户
-            from ..utils.security import get_password_hash
+            from ..utils.security import aget_password_hash
             new_user = User(
                 username=username,
-                password_hash=get_password_hash(password),
+                password_hash=await aget_password_hash(password),
                 nickname=student_data.get('nickname'),
                 role=UserRole.STUDENT,
                 school_id=student_data.get('school_id') or current_user.school_id
@@ -659,8 +659,8 @@ async def batch_reset_password(
 
             # 生成或使用提供的密码
             password = request.password or _generate_password()
-            from ..utils.security import get_password_hash
-            user.password_hash = get_password_hash(password)
+            from ..utils.security import aget_password_hash
+            user.password_hash = await aget_password_hash(password)
             db.commit()
             db.refresh(user)
 
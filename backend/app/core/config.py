@@ -38,6 +38,25 @@ class Settings(BaseSettings):
     # 文件上传配置
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
 
+    # 数据库迁移配置: sync(启动时同步迁移) / async(后台迁移) / skip(不迁移)
+    MIGRATION_MODE: str = "skip"
+
+    # 监控汇总数据（/api/monitoring/metrics、/stats）缓存时间（秒），0表示不缓存
+    METRICS_CACHE_TTL_SECONDS: int = 5
+
+    # 识别日志列表（/api/recognition/logs）缓存时间（秒），0表示不缓存；新的识别记录写入时立即失效
+    RECOGNITION_LOGS_CACHE_TTL_SECONDS: int = 5
+
+    # 定时任务详情（/api/scheduled-tasks/{id}）缓存时间（秒），0表示不缓存；任务更新后按 updated_at 自动失效
+    SCHEDULED_TASK_CACHE_TTL_SECONDS: int = 300
+
+    # 令牌校验结果（/api/v1/tokens/verify）缓存时间（秒），0表示不缓存；缓存在Redis中由所有worker共享，
+    # API令牌吊销或删除时立即失效，用户被删除或角色变更后最长在该时间内仍可能返回旧结果
+    TOKEN_VERIFY_CACHE_TTL_SECONDS: int = 10
+
+    # 登录失败的凭据在该时间（秒）内再次提交时直接拒绝，不再计算密码哈希；0表示不缓存
+    FAILED_LOGIN_CACHE_TTL_SECONDS: int = 60
+
     # CORS配置 - store as string to avoid JSON parsing issues
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
     
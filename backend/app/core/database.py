@@ -67,6 +67,7 @@ engine = create_engine(
     pool_size=get_pool_size(),   # 连接池大小
     max_overflow=get_max_overflow(),  # 最大溢出连接数
     echo=False,                 # 不输出SQL语句
+    query_cache_size=2048,      # 编译语句缓存容量（默认500），保证热点查询只编译一次
     connect_args={
         'charset': 'utf8mb4',
         'connect_timeout': 10
@@ -0,0 +1,104 @@
+"""
+启动时数据库迁移
+
+根据 settings.MIGRATION_MODE 决定应用启动时如何执行 Alembic 迁移：
+- sync: 启动时同步执行迁移，完成后才开始处理请求
+- async: 在后台线程中执行迁移，应用立即开始处理请求
+- skip: 不执行迁移（由部署脚本负责 alembic upgrade head）
+"""
+import asyncio
+import enum
+import os
+from typing import Optional
+
+from .config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MIGRATION_MODES = ("sync", "async", "skip")
+
+
+class MigrationState(str, enum.Enum):
+    """迁移状态"""
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    FAILED = "failed"
+
+
+# skip 模式下迁移由部署脚本负责，未经过 lifespan 的应用（如测试中的 TestClient）也可直接处理请求；
+# sync/async 模式由 start_migrations 切换为 PENDING/RUNNING
+MIGRATION_STATE: MigrationState = (
+    MigrationState.READY if settings.MIGRATION_MODE == "skip" else MigrationState.PENDING
+)
+MIGRATION_ERROR: Optional[str] = None
+
+
+def run_alembic_upgrade() -> None:
+    """执行 alembic upgrade head（阻塞调用）"""
+    from alembic import command
+    from alembic.config import Config
+
+    # 不传入 alembic.ini，避免 env.py 中的 fileConfig 覆盖应用的日志配置；
+    # 数据库URL由 env.py 从 settings 中读取
+    config = Config()
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+
+
+async def run_migrations() -> None:
+    """在线程池中执行迁移并更新迁移状态"""
+    global MIGRATION_STATE, MIGRATION_ERROR
+
+    MIGRATION_STATE = MigrationState.RUNNING
+    logger.info("开始执行数据库迁移")
+    try:
+        await asyncio.to_thread(run_alembic_upgrade)
+    except Exception as e:
+        MIGRATION_STATE = MigrationState.FAILED
+        MIGRATION_ERROR = str(e)
+        logger.error(f"数据库迁移失败: {str(e)}", exc_info=True)
+        raise
+    MIGRATION_STATE = MigrationState.READY
+    logger.info("数据库迁移完成")
+
+
+async def start_migrations(mode: str) -> Optional[asyncio.Task]:
+    """
+    按照迁移模式启动数据库迁移
+
+    Args:
+        mode: 迁移模式（sync/async/skip）
+
+    Returns:
+        async 模式下返回后台迁移任务，其他模式返回 None
+    """
+    global MIGRATION_STATE
+
+    if mode not in MIGRATION_MODES:
+        raise ValueError(f"无效的迁移模式: {mode}，可选值: {', '.join(MIGRATION_MODES)}")
+
+    if mode == "skip":
+        MIGRATION_STATE = MigrationState.READY
+        return None
+
+    MIGRATION_STATE = MigrationState.PENDING
+    if mode == "sync":
+        await run_migrations()
+        return None
+
+    task = asyncio.create_task(run_migrations())
+    # 后台任务的异常已记录在日志和 MIGRATION_ERROR 中，这里只需取出避免告警
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return task
+
+
+def get_migration_status() -> dict:
+    """获取当前迁移状态"""
+    return {
+        "state": MIGRATION_STATE.value,
+        "error": MIGRATION_ERROR,
+    }
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
@@ -9,6 +9,7 @@ from .utils.logger import get_logger
 from .utils.config_validator import validate_all_settings, print_validation_results
 from .middleware.error_handler import error_handler_middleware
 from .middleware.performance import PerformanceMiddleware
+import asyncio
 import os
 from datetime import datetime
 from .api import (
@@ -27,6 +28,13 @@ from .api import (
     monitoring_router
 )
 from .services.task_scheduler import task_scheduler
+from .services.inference_client import get_inference_client, close_inference_client
+from .core.migrations import start_migrations
+from .utils.security import shutdown_password_pool
+from .utils.dependencies import require_migrations_done
+from .api.monitoring import run_health_snapshotter, run_component_prober
+from .api.samples import shutdown_auto_crop_executor
+from .utils.structured_logger import stop_structured_loggers
 
 logger = get_logger(__name__)
 
@@ -53,6 +61,10 @@ async def lifespan(app: FastAPI):
         logger.error(f"应用启动失败: {str(e)}")
         raise
 
+    # 数据库迁移（async 模式下在后台执行，不阻塞启动）
+    print(f"Running database migrations (mode: {settings.MIGRATION_MODE})...")
+    await start_migrations(settings.MIGRATION_MODE)
+
     # 启动任务调度器
     print("Starting task scheduler...")
     try:
@@ -63,6 +75,17 @@ async def lifespan(app: FastAPI):
         print(f"Failed to start task scheduler: {e}")
         logger.error(f"任务调度器启动失败: {str(e)}")
 
+    # 预热推理服务客户端（建立共享gRPC通道）
+    try:
+        await get_inference_client().connect()
+    except Exception as e:
+        logger.error(f"推理服务客户端初始化失败: {str(e)}")
+
+    # 后台定期采集系统资源快照，供健康检查使用
+    health_snapshot_task = asyncio.create_task(run_health_snapshotter())
+    # 后台定期探测数据库、Redis、推理服务的连通性
+    component_probe_task = asyncio.create_task(run_component_prober())
+
     logger.info("应用启动完成")
     logger.info("========== 应用启动完成 ==========")
 
@@ -82,9 +105,23 @@ async def lifespan(app: FastAPI):
         print(f"Failed to stop task scheduler: {e}")
         logger.error(f"任务调度器停止失败: {str(e)}")
 
+    # 停止系统资源快照和组件探测任务
+    health_snapshot_task.cancel()
+    component_probe_task.cancel()
+
+    # 关闭推理服务客户端
+    await close_inference_client()
+
+    # 关闭密码哈希进程池和自动裁剪线程池
+    shutdown_password_pool()
+    shutdown_auto_crop_executor()
+
     logger.info("应用关闭完成")
     logger.info("========== 应用关闭完成 ==========")
 
+    # 写出后台日志队列中剩余的日志
+    stop_structured_loggers()
+
 
 app = FastAPI(
     title="字迹识别系统API",
@@ -164,18 +201,20 @@ os.makedirs(settings.SAMPLES_DIR, exist_ok=True)
 app.mount("/uploads", CORSStaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 # 注册路由（统一添加 /api 前缀）
+# 认证、配置、系统路由在后台迁移期间保持可用；其余依赖数据库的路由需等待迁移完成
+migration_guard = [Depends(require_migrations_done)]
 app.include_router(auth_router, prefix="/api")
-app.include_router(users_router, prefix="/api")
-app.include_router(training_router, prefix="/api")
-app.include_router(recognition_router, prefix="/api")
-app.include_router(schools_router, prefix="/api")
-app.include_router(samples_router, prefix="/api")
+app.include_router(users_router, prefix="/api", dependencies=migration_guard)
+app.include_router(training_router, prefix="/api", dependencies=migration_guard)
+app.include_router(recognition_router, prefix="/api", dependencies=migration_guard)
+app.include_router(schools_router, prefix="/api", dependencies=migration_guard)
+app.include_router(samples_router, prefix="/api", dependencies=migration_guard)
 app.include_router(config_router, prefix="/api")
 app.include_router(system_router, prefix="/api")
-app.include_router(token_router, prefix="/api")
-app.include_router(tokens_management_router, prefix="/api")
-app.include_router(scheduled_tasks_router, prefix="/api")
-app.include_router(quotas_router, prefix="/api")
+app.include_router(token_router, prefix="/api", dependencies=migration_guard)
+app.include_router(tokens_management_router, prefix="/api", dependencies=migration_guard)
+app.include_router(scheduled_tasks_router, prefix="/api", dependencies=migration_guard)
+app.include_router(quotas_router, prefix="/api", dependencies=migration_guard)
 app.include_router(monitoring_router)  # 监控路由已包含 /api 前缀
 
 
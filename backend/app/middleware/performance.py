@@ -6,8 +6,9 @@ import time
 import logging
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import Mount
 from typing import Callable
-from collections import defaultdict
+from collections import defaultdict, deque
 import threading
 from datetime import datetime, timedelta
 from ..utils.logger import get_logger
@@ -15,21 +16,83 @@ from ..utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+# 直方图参数：0 ~ 10000 范围内 1000 个等宽桶（耗时指标单位为毫秒，每桶10ms），超出范围的值计入最后一个桶
+HISTOGRAM_BUCKETS = 1000
+HISTOGRAM_MAX_VALUE = 10000.0
+HISTOGRAM_RESOLUTION = HISTOGRAM_MAX_VALUE / HISTOGRAM_BUCKETS
+# 直方图保留的分钟数（与监控接口的最大查询范围一致），更早的分钟桶在记录时自动丢弃
+HISTOGRAM_RETENTION_MINUTES = 60
+# 每个指标保留的原始数据点数量（仅用于 raw 查询）
+RAW_METRICS_MAXLEN = 1000
+
+
+class _MinuteHistogram:
+    """单个指标在一分钟内的定宽直方图"""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def add(self, value: float):
+        index = int(value / HISTOGRAM_RESOLUTION)
+        self.counts[min(max(index, 0), HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
 class PerformanceMetrics:
-    """性能指标收集器"""
+    """性能指标收集器
+
+    原始数据点只保留每个指标最近 RAW_METRICS_MAXLEN 条，用于 raw 查询；汇总统计
+    （数量、平均值、百分位数）由按分钟划分的定宽直方图给出，查询时只需累加桶计数，
+    无需遍历和排序原始数据。直方图只保留最近 HISTOGRAM_RETENTION_MINUTES 分钟，
+    内存占用有上限。
+    """
 
     def __init__(self):
-        self._metrics = defaultdict(list)
+        self._metrics = defaultdict(lambda: deque(maxlen=RAW_METRICS_MAXLEN))
+        # metric_name -> {minute: _MinuteHistogram}
+        self._histograms = defaultdict(dict)
+        self._last_prune_minute = None
         self._lock = threading.Lock()
 
+    def _prune(self, cutoff_minute: int):
+        """丢弃早于 cutoff_minute 的分钟直方图，并移除已无数据的指标（调用方持有锁）"""
+        for metric_name in list(self._histograms.keys()):
+            histograms = self._histograms[metric_name]
+            for minute in [m for m in histograms if m < cutoff_minute]:
+                del histograms[minute]
+            if not histograms:
+                del self._histograms[metric_name]
+                self._metrics.pop(metric_name, None)
+
     def record_metric(self, metric_name: str, value: float, tags: dict = None):
         """记录指标"""
+        now = datetime.utcnow()
+        minute = int(time.time() // 60)
         with self._lock:
+            # 每分钟第一次记录时清理一次过期的分钟桶
+            if minute != self._last_prune_minute:
+                self._prune(minute - HISTOGRAM_RETENTION_MINUTES + 1)
+                self._last_prune_minute = minute
             self._metrics[metric_name].append({
                 'value': value,
-                'timestamp': datetime.utcnow(),
+                'timestamp': now,
                 'tags': tags or {}
             })
+            histogram = self._histograms[metric_name].get(minute)
+            if histogram is None:
+                histogram = self._histograms[metric_name][minute] = _MinuteHistogram()
+            histogram.add(value)
 
     def get_metrics(self, metric_name: str, minutes: int = 5) -> list:
         """获取指定时间范围内的指标"""
@@ -40,31 +103,71 @@ class PerformanceMetrics:
                 if m['timestamp'] >= cutoff_time
             ]
 
+    def get_summary(self, metric_name: str, minutes: int = 5,
+                    percentiles: tuple = (95, 99)) -> dict:
+        """
+        一次计算数量、平均值和多个百分位数
+
+        合并最近 minutes 个分钟直方图后按累计计数定位百分位数所在的桶，
+        返回桶中点（限制在观测到的最小/最大值之间）。
+
+        Returns:
+            {"count": ..., "average": ..., "p95": ..., "p99": ...}
+        """
+        first_minute = int(time.time() // 60) - minutes + 1
+        counts = [0] * HISTOGRAM_BUCKETS
+        count = 0
+        total = 0.0
+        low = float('inf')
+        high = float('-inf')
+        with self._lock:
+            for minute, histogram in self._histograms.get(metric_name, {}).items():
+                if minute < first_minute:
+                    continue
+                counts = [a + b for a, b in zip(counts, histogram.counts)]
+                count += histogram.count
+                total += histogram.total
+                low = min(low, histogram.min)
+                high = max(high, histogram.max)
+
+        summary = {"count": count, "average": total / count if count else 0.0}
+        if not count:
+            summary.update({f"p{p}": 0.0 for p in percentiles})
+            return summary
+
+        # 单次累加遍历同时求出全部百分位数
+        targets = sorted((max(1, int(count * p / 100) + 1), p) for p in percentiles)
+        cumulative = 0
+        target_index = 0
+        for bucket, bucket_count in enumerate(counts):
+            cumulative += bucket_count
+            while target_index < len(targets) and cumulative >= min(targets[target_index][0], count):
+                midpoint = (bucket + 0.5) * HISTOGRAM_RESOLUTION
+                summary[f"p{targets[target_index][1]}"] = min(max(midpoint, low), high)
+                target_index += 1
+            if target_index == len(targets):
+                break
+        return summary
+
     def get_average(self, metric_name: str, minutes: int = 5) -> float:
         """计算平均值"""
-        metrics = self.get_metrics(metric_name, minutes)
-        if not metrics:
-            return 0.0
-        return sum(m['value'] for m in metrics) / len(metrics)
+        return self.get_summary(metric_name, minutes, percentiles=())["average"]
 
     def get_percentile(self, metric_name: str, percentile: float = 95, minutes: int = 5) -> float:
-        """计算百分位数"""
-        metrics = self.get_metrics(metric_name, minutes)
-        if not metrics:
-            return 0.0
-        values = sorted(m['value'] for m in metrics)
-        index = int(len(values) * percentile / 100)
-        return values[min(index, len(values) - 1)]
+        """计算百分位数（直方图近似值）"""
+        return self.get_summary(metric_name, minutes, percentiles=(percentile,))[f"p{percentile}"]
 
     def clear_old_metrics(self, hours: int = 24):
         """清理旧指标数据"""
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        cutoff_minute = int(time.time() // 60) - hours * 60
         with self._lock:
             for metric_name in list(self._metrics.keys()):
-                self._metrics[metric_name] = [
-                    m for m in self._metrics[metric_name]
-                    if m['timestamp'] >= cutoff_time
-                ]
+                self._metrics[metric_name] = deque(
+                    (m for m in self._metrics[metric_name] if m['timestamp'] >= cutoff_time),
+                    maxlen=RAW_METRICS_MAXLEN
+                )
+            self._prune(cutoff_minute)
 
 
 # 全局指标收集器
@@ -95,13 +198,16 @@ class PerformanceMiddleware(BaseHTTPMiddleware):
             method = request.method
             status_code = response.status_code
 
-            # 记录请求耗时指标
-            metric_name = f"http.{method.lower()}.{path.replace('/', '_')}"
-            metrics_collector.record_metric(metric_name, duration_ms, {
-                'method': method,
-                'path': path,
-                'status_code': status_code
-            })
+            # 按路由模板（如 /api/samples/{sample_id}）记录单个接口的耗时指标，
+            # 指标数量以路由数为上限；静态文件挂载和未匹配的路径只计入汇总指标
+            route = request.scope.get("route")
+            if route is not None and not isinstance(route, Mount):
+                metric_name = f"http.{method.lower()}.{route.path.replace('/', '_')}"
+                metrics_collector.record_metric(metric_name, duration_ms, {
+                    'method': method,
+                    'path': route.path,
+                    'status_code': status_code
+                })
 
             # 记录通用指标
             metrics_collector.record_metric('http_request_duration_ms', duration_ms, {
@@ -1,13 +1,51 @@
 """
 API Token Model for external application integration
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import timezone
+import enum
 from ..core.database import Base
 
 
+class TokenPermission(enum.IntFlag):
+    """API Token 权限位（存储于 api_tokens.permissions，位值一经使用不可修改）"""
+    READ_SAMPLES = 0x01
+    WRITE_SAMPLES = 0x02
+    RECOGNIZE = 0x04
+    READ_USERS = 0x08
+    MANAGE_USERS = 0x10
+    MANAGE_SCHOOLS = 0x20
+    MANAGE_TRAINING = 0x40
+    MANAGE_SYSTEM = 0x80
+
+
+# 权限名称（前端/接口使用的小写名称）-> 权限位
+PERMISSION_BITS = {flag.name.lower(): flag for flag in TokenPermission}
+
+DEFAULT_PERMISSIONS = TokenPermission.READ_SAMPLES | TokenPermission.READ_USERS
+
+# 各 scope 对应的默认权限
+SCOPE_PERMISSIONS = {
+    "read": DEFAULT_PERMISSIONS,
+    "write": DEFAULT_PERMISSIONS | TokenPermission.WRITE_SAMPLES | TokenPermission.RECOGNIZE,
+    "admin": TokenPermission(sum(TokenPermission)),
+}
+
+
+def _permission_property(flag: TokenPermission):
+    """将单个权限位暴露为布尔属性（兼容原 can_* 列）"""
+    def getter(self) -> bool:
+        return bool((self.permissions or 0) & flag)
+
+    def setter(self, value: bool) -> None:
+        current = self.permissions or 0
+        self.permissions = (current | flag) if value else (current & ~flag)
+
+    return property(getter, setter)
+
+
 class ApiToken(Base):
     """API Token model for external application integration"""
     __tablename__ = "api_tokens"
@@ -19,15 +57,8 @@ class ApiToken(Base):
     app_version = Column(String(50), nullable=True)  # Application version
     scope = Column(String(50), nullable=False, default="read")  # read, write, admin
 
-    # Permissions - specific API endpoints that can be accessed
-    can_read_samples = Column(Boolean, default=True)
-    can_write_samples = Column(Boolean, default=False)
-    can_recognize = Column(Boolean, default=False)
-    can_read_users = Column(Boolean, default=True)
-    can_manage_users = Column(Boolean, default=False)
-    can_manage_schools = Column(Boolean, default=False)
-    can_manage_training = Column(Boolean, default=False)
-    can_manage_system = Column(Boolean, default=False)
+    # Permissions - specific API endpoints that can be accessed（TokenPermission 位掩码）
+    permissions = Column(Integer, nullable=False, default=int(DEFAULT_PERMISSIONS))
 
     # Owner information
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -50,6 +81,30 @@ class ApiToken(Base):
     # Relationships
     user = relationship("User", back_populates="api_tokens")
 
+    # 覆盖Token校验查询（token + 状态）的复合索引
+    __table_args__ = (
+        Index('ix_api_tokens_lookup', 'token', 'is_active', 'is_revoked'),
+    )
+
+    can_read_samples = _permission_property(TokenPermission.READ_SAMPLES)
+    can_write_samples = _permission_property(TokenPermission.WRITE_SAMPLES)
+    can_recognize = _permission_property(TokenPermission.RECOGNIZE)
+    can_read_users = _permission_property(TokenPermission.READ_USERS)
+    can_manage_users = _permission_property(TokenPermission.MANAGE_USERS)
+    can_manage_schools = _permission_property(TokenPermission.MANAGE_SCHOOLS)
+    can_manage_training = _permission_property(TokenPermission.MANAGE_TRAINING)
+    can_manage_system = _permission_property(TokenPermission.MANAGE_SYSTEM)
+
+    def has_permission(self, permission: str) -> bool:
+        """检查是否拥有指定名称的权限（未知权限返回False）"""
+        flag = PERMISSION_BITS.get(permission)
+        return flag is not None and (self.permissions or 0) & flag == flag
+
+    def permission_dict(self) -> dict:
+        """权限名称 -> 是否拥有（前端格式）"""
+        mask = self.permissions or 0
+        return {name: bool(mask & flag) for name, flag in PERMISSION_BITS.items()}
+
     def __repr__(self):
         return f"<ApiToken(id={self.id}, name='{self.name}', user_id={self.user_id})>"
 
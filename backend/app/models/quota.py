@@ -88,4 +88,7 @@ class QuotaUsageLog(Base):
     __table_args__ = (
         Index('ix_quota_usage_user_created', 'user_id', 'created_at'),
         Index('ix_quota_usage_school_created', 'school_id', 'created_at'),
+        # 使用日志按ID倒序的键集分页
+        Index('ix_quota_usage_user_id_id', 'user_id', 'id'),
+        Index('ix_quota_usage_school_id_id', 'school_id', 'id'),
     )
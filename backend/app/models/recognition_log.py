@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, DateTime, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -17,3 +17,12 @@ class RecognitionLog(Base):
 
     # Relationships
     user = relationship("User", back_populates="recognition_logs")
+
+    __table_args__ = (
+        # 按时间范围统计识别次数（如最近24小时）
+        Index('ix_recognition_logs_created_at', 'created_at'),
+        # 按用户筛选并按时间倒序查看识别日志
+        Index('ix_recognition_logs_user_created', 'user_id', 'created_at'),
+        # 按用户筛选并按ID倒序的键集分页（WHERE user_id=? AND id<? ORDER BY id DESC）
+        Index('ix_recognition_logs_user_id_id', 'user_id', 'id'),
+    )
@@ -1,10 +1,34 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, SmallInteger, Boolean, String, Enum, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
+import os
+import string
+
+import orjson
 from ..core.database import Base
 
 
+def filename_from_image_path(image_path: str) -> str:
+    """从存储路径还原上传时的文件名
+
+    上传文件保存为 "{user_id}_{time_ns}_{十六进制摘要}_{原文件名}"
+    （早期为 "{user_id}_{YYYYmmdd}_{HHMMSS}_{原文件名}"），去掉前缀即为原文件名；
+    不符合该格式的路径直接返回文件名部分。
+    """
+    basename = os.path.basename(image_path)
+    parts = basename.split("_", 3)
+    if (
+        len(parts) == 4
+        and parts[0].isdigit()
+        and parts[1].isdigit()
+        and parts[2]
+        and all(c in string.hexdigits for c in parts[2])
+    ):
+        return parts[3]
+    return basename
+
+
 class SampleStatus(str, enum.Enum):
     PENDING = "pending"
     PROCESSED = "processed"
@@ -16,13 +40,32 @@ class SampleRegion(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     sample_id = Column(Integer, ForeignKey("samples.id"), nullable=False)
-    bbox = Column(String(100), nullable=False)  # JSON格式: {"x": 10, "y": 20, "width": 100, "height": 50}
-    is_auto_detected = Column(Integer, default=1)  # 1: 自动检测, 0: 手动标注
+    # 区域坐标（像素），定长列代替原 JSON 字符串
+    x = Column(SmallInteger, nullable=False)
+    y = Column(SmallInteger, nullable=False)
+    w = Column(SmallInteger, nullable=False)
+    h = Column(SmallInteger, nullable=False)
+    is_auto_detected = Column(Boolean, nullable=False, default=True)  # True: 自动检测, False: 手动标注
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     sample = relationship("Sample", back_populates="sample_regions")
 
+    @property
+    def bbox(self) -> str:
+        """JSON格式的区域: {"x": 10, "y": 20, "width": 100, "height": 50}（与原 bbox 列格式一致）"""
+        return orjson.dumps({"x": self.x, "y": self.y, "width": self.w, "height": self.h}).decode()
+
+    @bbox.setter
+    def bbox(self, value) -> None:
+        # 兼容 dict 与 JSON 字符串
+        if isinstance(value, str):
+            value = orjson.loads(value)
+        self.x = int(round(value["x"]))
+        self.y = int(round(value["y"]))
+        self.w = int(round(value["width"]))
+        self.h = int(round(value["height"]))
+
 
 class Sample(Base):
     __tablename__ = "samples"
@@ -30,13 +73,36 @@ class Sample(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     image_path = Column(String(500), nullable=False)
-    original_filename = Column(String(255), nullable=False)
+    # 仅当原文件名无法从 image_path 还原时才保存，通常为 NULL
+    display_name = Column(String(255), nullable=True)
     status = Column(Enum(SampleStatus), nullable=False, default=SampleStatus.PENDING)
     extracted_region_path = Column(String(500), nullable=True)  # 提取的手写区域路径
     sample_metadata = Column(Text, nullable=True)  # JSON格式的元数据（metadata是SQLAlchemy保留字）
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
     processed_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # 样本列表按上传时间倒序分页（可按用户或状态筛选）
+        Index('ix_samples_uploaded_at', 'uploaded_at'),
+        Index('ix_samples_user_uploaded', 'user_id', 'uploaded_at'),
+        Index('ix_samples_status_uploaded', 'status', 'uploaded_at'),
+    )
+
     # Relationships
     user = relationship("User", back_populates="samples")
     sample_regions = relationship("SampleRegion", back_populates="sample", cascade="all, delete-orphan")
+
+    @property
+    def original_filename(self) -> str:
+        """上传时的原文件名"""
+        if self.display_name:
+            return self.display_name
+        return filename_from_image_path(self.image_path) if self.image_path else None
+
+    @original_filename.setter
+    def original_filename(self, value: str) -> None:
+        # 与从路径还原的文件名一致时不额外存储
+        if self.image_path and filename_from_image_path(self.image_path) == value:
+            self.display_name = None
+        else:
+            self.display_name = value
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Enum, DateTime, Text, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, Enum, DateTime, Text, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -63,6 +63,11 @@ class ScheduledTask(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # 按学校/状态筛选并按创建时间倒序列出任务
+        Index('ix_sched_school_status_created', 'school_id', 'status', 'created_at'),
+    )
+
     # 关系
     school = relationship("School", back_populates="scheduled_tasks")
     creator = relationship("User", back_populates="scheduled_tasks")
@@ -84,6 +89,11 @@ class ScheduledTaskExecution(Base):
     output = Column(Text, nullable=True, comment="执行输出")
     error_message = Column(Text, nullable=True, comment="错误信息")
 
+    __table_args__ = (
+        # 按任务查看执行记录（按开始时间倒序）
+        Index('ix_exec_task_started', 'scheduled_task_id', 'started_at'),
+    )
+
     # 关系
     scheduled_task = relationship("ScheduledTask", back_populates="executions")
     training_job = relationship("TrainingJob", back_populates="scheduled_task_execution")
@@ -12,6 +12,7 @@ class School(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    users = relationship("User", back_populates="school")
+    # 删除学校时不由ORM清空用户的 school_id，由外键约束拒绝删除仍有用户的学校
+    users = relationship("User", back_populates="school", passive_deletes="all")
     scheduled_tasks = relationship("ScheduledTask", back_populates="school", cascade="all, delete-orphan")
     quota = relationship("Quota", back_populates="school", uselist=False, cascade="all, delete-orphan")
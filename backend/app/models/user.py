@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, SmallInteger, ForeignKey, DateTime, Index
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -12,6 +13,36 @@ class UserRole(str, enum.Enum):
     STUDENT = "student"
 
 
+# 角色在数据库中以 SMALLINT 存储，编号一经使用不可修改
+ROLE_CODES = {
+    UserRole.SYSTEM_ADMIN: 0,
+    UserRole.SCHOOL_ADMIN: 1,
+    UserRole.TEACHER: 2,
+    UserRole.STUDENT: 3,
+}
+ROLES_BY_CODE = {code: role for role, code in ROLE_CODES.items()}
+
+
+class RoleType(TypeDecorator):
+    """UserRole <-> SMALLINT 的映射类型
+
+    Python 侧仍使用字符串枚举 UserRole（接口与比较逻辑不变），
+    数据库侧只存储 2 字节整数，缩小行宽与索引。
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return ROLE_CODES[UserRole(value)]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return ROLES_BY_CODE[value]
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -19,7 +50,7 @@ class User(Base):
     username = Column(String(50), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     nickname = Column(String(100), nullable=True)  # 昵称/学生姓名
-    role = Column(Enum(UserRole), nullable=False, default=UserRole.STUDENT)
+    role = Column(RoleType(), nullable=False, default=UserRole.STUDENT)
     school_id = Column(Integer, ForeignKey("schools.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -37,3 +68,8 @@ class User(Base):
     scheduled_tasks = relationship("ScheduledTask", back_populates="creator", cascade="all, delete-orphan")
     quota = relationship("Quota", back_populates="user", uselist=False, cascade="all, delete-orphan")
     quota_usage_logs = relationship("QuotaUsageLog", back_populates="user", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # 按学校统计用户数、按学校和角色筛选用户
+        Index('ix_users_school_role', 'school_id', 'role'),
+    )
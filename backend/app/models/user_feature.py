@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -8,8 +8,10 @@ from ..core.database import Base
 class UserFeature(Base):
     __tablename__ = "user_features"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 每个用户只有一行特征，直接以 user_id 作为主键（InnoDB 按 user_id 聚簇存储）
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    feature_vector = Column(Text, nullable=False)  # JSON格式的平均特征向量
+    sample_ids = Column(Text, nullable=True)  # JSON格式的样本ID列表
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="user_features")
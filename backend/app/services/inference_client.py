@@ -39,6 +39,14 @@ from inference_service.grpc_server import handwriting_inference_pb2_grpc as pb2_
 # 这里将使用生成的gRPC客户端代码
 # 暂时提供接口定义
 
+# 共享通道的连接参数：空闲连接定期发送 keepalive ping，连接被中间网络设备断开时
+# 能及时发现并重连，而不是让下一次识别请求阻塞在失效的连接上。
+# 间隔不低于服务端默认允许的最小 ping 间隔（5分钟），避免被服务端以 too_many_pings 断开。
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 300_000),
+    ("grpc.keepalive_timeout_ms", 20_000),
+]
+
 
 class InferenceClient:
     """推理服务客户端"""
@@ -51,16 +59,46 @@ class InferenceClient:
         """获取gRPC通道"""
         if self.channel is None:
             self.channel = grpc.aio.insecure_channel(
-                f"{settings.INFERENCE_SERVICE_HOST}:{settings.INFERENCE_SERVICE_PORT}"
+                f"{settings.INFERENCE_SERVICE_HOST}:{settings.INFERENCE_SERVICE_PORT}",
+                options=CHANNEL_OPTIONS
             )
         return self.channel
+
+    async def connect(self):
+        """预先建立gRPC通道与stub（用于启动时预热）"""
+        channel = await self._get_channel()
+        if self.stub is None:
+            self.stub = pb2_grpc.HandwritingInferenceStub(channel)
+
+    async def is_ready(self, timeout: float) -> bool:
+        """检查gRPC通道能否在超时时间内连通推理服务"""
+        channel = await self._get_channel()
+        try:
+            await asyncio.wait_for(channel.channel_ready(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def close(self):
+        """关闭gRPC通道"""
+        if self.channel is not None:
+            await self.channel.close()
+        self.channel = None
+        self.stub = None
     
     async def recognize(self, image_path: str) -> dict:
         """识别单张图片"""
+        return await self._recognize(pb2.RecognizeRequest(image_path=image_path, top_k=5))
+
+    async def recognize_bytes(self, data: bytes) -> dict:
+        """识别内存中的图片数据（无需先落盘）"""
+        return await self._recognize(pb2.RecognizeRequest(image_data=bytes(data), top_k=5))
+
+    async def _recognize(self, req) -> dict:
+        """发送识别请求并转换结果"""
         channel = await self._get_channel()
         if self.stub is None:
             self.stub = pb2_grpc.HandwritingInferenceStub(channel)
-        req = pb2.RecognizeRequest(image_path=image_path, top_k=5)
         resp = await self.stub.Recognize(req)
         return {
             "top_k": [
@@ -151,3 +189,23 @@ class InferenceClient:
             "priority": getattr(resp, "priority", 0),
             "error_message": getattr(resp, "error_message", ""),
         }
+
+
+# 全局共享的推理服务客户端：gRPC通道可在多个请求间复用，避免每次识别都重新建立连接
+_inference_client: Optional[InferenceClient] = None
+
+
+def get_inference_client() -> InferenceClient:
+    """获取全局共享的推理服务客户端"""
+    global _inference_client
+    if _inference_client is None:
+        _inference_client = InferenceClient()
+    return _inference_client
+
+
+async def close_inference_client() -> None:
+    """关闭全局推理服务客户端的gRPC通道"""
+    global _inference_client
+    if _inference_client is not None:
+        await _inference_client.close()
+        _inference_client = None
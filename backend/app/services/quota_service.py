@@ -1,7 +1,7 @@
 from typing import Optional, Tuple, Dict
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, exists, insert, literal, select, update
 from ..models.quota import Quota, QuotaUsageLog
 from ..models.user import User, UserRole
 
@@ -261,24 +261,48 @@ class QuotaService:
         day_limit: int = 0,
         month_limit: int = 0,
         total_limit: int = 0,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        restrict_school_id: Optional[int] = None
     ) -> int:
-        """批量更新用户配额"""
-        updated_count = 0
-        for user_id in user_ids:
-            quota = QuotaService.get_or_create_user_quota(db, user_id)
-            quota.minute_limit = minute_limit
-            quota.hour_limit = hour_limit
-            quota.day_limit = day_limit
-            quota.month_limit = month_limit
-            quota.total_limit = total_limit
-            if description:
-                quota.description = description
-            quota.updated_at = datetime.utcnow()
-            updated_count += 1
+        """批量更新用户配额
+
+        以集合方式执行：先为尚无配额的用户补建配额，再用一条UPDATE更新全部配额。
+        restrict_school_id 不为空时只更新属于该学校的用户。
+        """
+        target_users = select(User.id).where(User.id.in_(user_ids))
+        if restrict_school_id is not None:
+            target_users = target_users.where(User.school_id == restrict_school_id)
+
+        # 为尚无配额的目标用户补建默认配额
+        missing_users = select(
+            User.id, User.school_id, literal("user")
+        ).where(
+            User.id.in_(target_users),
+            ~exists().where(Quota.quota_type == "user", Quota.user_id == User.id)
+        )
+        db.execute(
+            insert(Quota).from_select(["user_id", "school_id", "quota_type"], missing_users)
+        )
 
+        values = {
+            "minute_limit": minute_limit,
+            "hour_limit": hour_limit,
+            "day_limit": day_limit,
+            "month_limit": month_limit,
+            "total_limit": total_limit,
+            "updated_at": datetime.utcnow(),
+        }
+        if description:
+            values["description"] = description
+
+        result = db.execute(
+            update(Quota)
+            .where(Quota.quota_type == "user", Quota.user_id.in_(target_users))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
-        return updated_count
+        return result.rowcount
 
     @staticmethod
     def batch_update_school_quotas(
@@ -313,17 +337,20 @@ class QuotaService:
         db: Session,
         user_id: Optional[int] = None,
         school_id: Optional[int] = None,
-        limit: int = 100
+        limit: int = 100,
+        before_id: Optional[int] = None
     ) -> list:
-        """获取配额使用日志"""
+        """获取配额使用日志（按ID倒序，before_id 用于键集分页）"""
         query = db.query(QuotaUsageLog)
 
         if user_id:
             query = query.filter(QuotaUsageLog.user_id == user_id)
         if school_id:
             query = query.filter(QuotaUsageLog.school_id == school_id)
+        if before_id is not None:
+            query = query.filter(QuotaUsageLog.id < before_id)
 
-        logs = query.order_by(QuotaUsageLog.created_at.desc()).limit(limit).all()
+        logs = query.order_by(QuotaUsageLog.id.desc()).limit(limit).all()
 
         return [
             {
@@ -350,7 +377,8 @@ class QuotaService:
         """重置配额使用次数
         reset_type: 'minute', 'hour', 'day', 'month', 'total', 'all'
         """
-        quota = db.query(Quota).filter(Quota.id == quota_id).first()
+        # 优先从会话的identity map中取（调用方通常已加载该配额）
+        quota = db.get(Quota, quota_id)
         if not quota:
             raise ValueError(f"Quota with id {quota_id} not found")
 
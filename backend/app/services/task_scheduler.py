@@ -82,9 +82,11 @@ class TaskScheduler:
 
             for task in tasks:
                 try:
-                    await self.schedule_task(task.id, db=db)
+                    await self.add_task_job(task)
                 except Exception as e:
                     logger.error(f"Failed to load task {task.id}: {e}")
+            # 所有任务的下次执行时间一次提交
+            db.commit()
 
             logger.info(f"Loaded {len(tasks)} active tasks")
         finally:
@@ -102,6 +104,27 @@ class TaskScheduler:
                 logger.error(f"Task {task_id} not found")
                 return False
 
+            if not await self.add_task_job(task):
+                return False
+            db.commit()
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to schedule task {task_id}: {e}")
+            return False
+        finally:
+            if should_close_db:
+                db.close()
+
+    async def add_task_job(self, task: ScheduledTask) -> bool:
+        """
+        把已加载的任务加入调度器
+
+        只在 task 对象上设置 next_run_at，不提交事务，
+        调用方可将其与任务本身的修改合并为一次提交。
+        """
+        task_id = task.id
+        try:
             # 如果任务已存在，先移除
             job_id = f"scheduled_task_{task.id}"
             if self.scheduler.get_job(job_id):
@@ -166,7 +189,6 @@ class TaskScheduler:
             job = self.scheduler.get_job(job_id)
             if job:
                 task.next_run_at = job.next_run_time
-                db.commit()
 
             logger.info(f"Scheduled task {task.id} ({task.name}) with trigger type {task.trigger_type}")
             return True
@@ -174,9 +196,6 @@ class TaskScheduler:
         except Exception as e:
             logger.error(f"Failed to schedule task {task_id}: {e}")
             return False
-        finally:
-            if should_close_db:
-                db.close()
 
     async def unschedule_task(self, task_id: int) -> bool:
         """取消任务调度"""
@@ -216,11 +235,13 @@ class TaskScheduler:
             if not task:
                 return False
 
+            # 状态与下次执行时间一次提交
             task.status = ScheduleStatus.ACTIVE
+            if not await self.add_task_job(task):
+                db.rollback()
+                return False
             db.commit()
-
-            # 重新调度
-            return await self.schedule_task(task_id, db=db)
+            return True
         except Exception as e:
             logger.error(f"Failed to resume task {task_id}: {e}")
             return False
@@ -315,7 +336,7 @@ class TaskScheduler:
 
     async def _execute_full_training(self, task: ScheduledTask, training_job: TrainingJob, db: Session):
         """执行全量训练"""
-        from ..services.inference_client import InferenceClient
+        from ..services.inference_client import get_inference_client
 
         try:
             # 检查样本数量
@@ -329,12 +350,13 @@ class TaskScheduler:
                 user_ids = [uid[0] for uid in user_ids]
                 query = query.filter(Sample.user_id.in_(user_ids))
 
-            eligible_samples = query.count()
+            # 只需判断是否达到3个，最多统计3行即可
+            eligible_samples = query.with_entities(Sample.id).limit(3).count()
             if eligible_samples < 3:
                 raise Exception(f"样本数量不足，至少需要3个已处理(PROCESSED)的样本，当前={eligible_samples}")
 
             # 调用推理服务进行训练
-            client = InferenceClient()
+            client = get_inference_client()
             await client.train_model(
                 training_job.id,
                 force_retrain=task.force_retrain,
@@ -357,7 +379,7 @@ class TaskScheduler:
 
     async def _execute_incremental_training(self, task: ScheduledTask, training_job: TrainingJob, db: Session):
         """执行增量训练"""
-        from ..services.inference_client import InferenceClient
+        from ..services.inference_client import get_inference_client
 
         try:
             # 检查是否有新增样本
@@ -380,13 +402,12 @@ class TaskScheduler:
             if latest_model:
                 query = query.filter(Sample.created_at > latest_model.created_at)
 
-            new_samples = query.count()
-
-            if new_samples < 1:
-                raise Exception(f"没有新增样本需要训练，当前={new_samples}")
+            # 只需判断是否存在新增样本，EXISTS 命中第一行即返回，无需统计全部
+            if not db.query(query.exists()).scalar():
+                raise Exception("没有新增样本需要训练，当前=0")
 
             # 调用推理服务进行增量训练
-            client = InferenceClient()
+            client = get_inference_client()
             await client.train_model(
                 training_job.id,
                 force_retrain=True,  # 增量训练需要强制重新训练
@@ -399,7 +420,7 @@ class TaskScheduler:
             training_job.started_at = datetime.now(timezone.utc)
             db.commit()
 
-            logger.info(f"Incremental training started for task {task.id} with {new_samples} new samples")
+            logger.info(f"Incremental training started for task {task.id}")
 
         except Exception as e:
             training_job.status = TrainingJobStatus.FAILED
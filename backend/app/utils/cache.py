@@ -4,10 +4,14 @@
 """
 import json
 from typing import Optional, Any
-from ..logger import get_logger
+from .logger import get_logger
+from .ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
+# Redis 不可用时内存缓存的最大条目数
+MEMORY_CACHE_MAXSIZE = 10000
+
 try:
     import redis
     REDIS_AVAILABLE = True
@@ -21,7 +25,8 @@ class CacheManager:
     缓存管理器
 
     提供统一的缓存接口，自动在Redis和内存缓存之间切换
-    如果Redis不可用，自动降级到内存缓存
+    如果Redis不可用，自动降级到内存缓存（仅当前进程可见）。
+    内存缓存同样按 ttl 过期，并限制最大条目数，避免条目无限累积
     """
 
     def __init__(self, redis_url: Optional[str] = None):
@@ -32,7 +37,7 @@ class CacheManager:
             redis_url: Redis连接URL，如果为None则仅使用内存缓存
         """
         self.redis_client = None
-        self.memory_cache = {}
+        self.memory_cache = TTLCache(maxsize=MEMORY_CACHE_MAXSIZE)
         self.use_redis = False
 
         if REDIS_AVAILABLE and redis_url:
@@ -119,10 +124,10 @@ class CacheManager:
                 return True
             except Exception as e:
                 logger.error(f"Redis写入失败: {str(e)}")
-                self.memory_cache[key] = value
+                self.memory_cache.set(key, value, ttl=ttl)
                 return True
         else:
-            self.memory_cache[key] = value
+            self.memory_cache.set(key, value, ttl=ttl)
             return True
 
     def delete(self, key: str) -> bool:
@@ -146,7 +151,7 @@ class CacheManager:
                 self.redis_client.delete(key)
             except Exception as e:
                 logger.error(f"Redis删除失败: {str(e)}")
-        self.memory_cache.pop(key, None)
+        self.memory_cache.delete(key)
         return True
 
     def exists(self, key: str) -> bool:
@@ -171,9 +176,9 @@ class CacheManager:
                 return self.redis_client.exists(key) == 1
             except Exception as e:
                 logger.error(f"Redis exists查询失败: {str(e)}")
-                return key in self.memory_cache
+                return self.memory_cache.get(key) is not None
         else:
-            return key in self.memory_cache
+            return self.memory_cache.get(key) is not None
 
     def clear(self) -> bool:
         """
@@ -226,13 +231,9 @@ class CacheManager:
                             result[key] = values[i]
             except Exception as e:
                 logger.error(f"Redis批量读取失败: {str(e)}")
-                for key in keys:
-                    if key in self.memory_cache:
-                        result[key] = self.memory_cache[key]
+                result = self._memory_get_many(keys)
         else:
-            for key in keys:
-                if key in self.memory_cache:
-                    result[key] = self.memory_cache[key]
+            result = self._memory_get_many(keys)
         return result
 
     def set_many(self, data: dict, ttl: int = 300) -> bool:
@@ -265,12 +266,26 @@ class CacheManager:
                 return True
             except Exception as e:
                 logger.error(f"Redis批量写入失败: {str(e)}")
-                self.memory_cache.update(data)
+                self._memory_set_many(data, ttl)
                 return True
         else:
-            self.memory_cache.update(data)
+            self._memory_set_many(data, ttl)
             return True
 
+    def _memory_get_many(self, keys: list) -> dict:
+        """从内存缓存批量获取未过期的数据"""
+        result = {}
+        for key in keys:
+            value = self.memory_cache.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def _memory_set_many(self, data: dict, ttl: int) -> None:
+        """批量写入内存缓存"""
+        for key, value in data.items():
+            self.memory_cache.set(key, value, ttl=ttl)
+
 
 # 全局缓存实例（在需要时创建）
 _cache_manager: Optional[CacheManager] = None
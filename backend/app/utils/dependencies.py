@@ -1,17 +1,41 @@
-from typing import Optional, Union
-from fastapi import Depends, HTTPException, status
+from functools import lru_cache
+from typing import Any, Optional, Type, TypeVar, Union
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, load_only
 from jose import JWTError, jwt
 from ..core.database import get_db
 from ..core.config import settings
+from ..core import migrations
 from ..models.user import User, UserRole
 from ..models.api_token import ApiToken
 from .datetime_utils import utc_now, serialize_datetime
+from .security import ais_token_blacklisted
 from pydantic import BaseModel
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
+# 认证时只加载构建当前用户所需的列（不加载 password_hash 等字段）
+_current_user_columns = load_only(
+    User.id,
+    User.username,
+    User.nickname,
+    User.role,
+    User.school_id,
+    User.created_at,
+    User.switched_user_id,
+)
+
+# API Token 认证时只需校验状态、有效期并取得所属用户
+_api_token_columns = load_only(
+    ApiToken.id,
+    ApiToken.user_id,
+    ApiToken.is_active,
+    ApiToken.is_revoked,
+    ApiToken.expires_at,
+)
+
 
 class CurrentUserResponse(BaseModel):
     """当前用户响应（包含切换状态）"""
@@ -53,7 +77,7 @@ def _verify_api_token(token: str, db: Session) -> Optional[User]:
         return None
 
     # Query the token from database
-    api_token = db.query(ApiToken).filter(ApiToken.token == token).first()
+    api_token = db.query(ApiToken).options(_api_token_columns).filter(ApiToken.token == token).first()
 
     if not api_token:
         raise HTTPException(
@@ -84,8 +108,18 @@ def _verify_api_token(token: str, db: Session) -> Optional[User]:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+    # Update last used timestamp and usage count
+    # 在数据库中原子递增使用次数；先提交再加载用户，避免提交后用户对象过期而再次查询
+    user_id = api_token.user_id
+    db.execute(
+        update(ApiToken)
+        .where(ApiToken.id == api_token.id)
+        .values(last_used_at=utc_now(), usage_count=ApiToken.usage_count + 1)
+    )
+    db.commit()
+
     # Get the user associated with the token
-    user = db.query(User).filter(User.id == api_token.user_id).first()
+    user = db.query(User).options(_current_user_columns).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -93,12 +127,6 @@ def _verify_api_token(token: str, db: Session) -> Optional[User]:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Update last used timestamp and usage count
-    api_token.last_used_at = utc_now()
-    api_token.usage_count += 1
-    db.commit()
-    db.refresh(api_token)
-
     return user
 
 
@@ -136,6 +164,9 @@ async def _get_current_user(
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
+        # 已登出的令牌不再有效
+        if await ais_token_blacklisted(token):
+            raise credentials_exception
     except JWTError:
         # If JWT verification fails and token doesn't start with hwtk_, return error
         if not token or not token.startswith("hwtk_"):
@@ -147,13 +178,15 @@ async def _get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.username == username).first()
+    user = db.query(User).options(_current_user_columns).filter(User.username == username).first()
     if user is None:
         raise credentials_exception
 
     # 如果用户已切换到其他用户，返回切换后的用户
     if user.switched_user_id:
-        switched_user = db.query(User).filter(User.id == user.switched_user_id).first()
+        switched_user = db.query(User).options(_current_user_columns).filter(
+            User.id == user.switched_user_id
+        ).first()
         if switched_user:
             return switched_user
 
@@ -183,7 +216,7 @@ async def get_current_user(
 
     # 如果当前用户有 switched_user_id，说明是原始admin用户
     # 需要查找哪个用户切换到了当前用户
-    admin_user = db.query(User).filter(User.switched_user_id == user.id).first()
+    admin_user = db.query(User.id).filter(User.switched_user_id == user.id).first()
     if admin_user:
         is_switched = True
         original_user_id = admin_user.id
@@ -201,8 +234,49 @@ async def get_current_user(
     )
 
 
+ModelT = TypeVar("ModelT")
+
+
+def get_or_load(request: Request, db: Session, model: Type[ModelT], pk: Any, *options) -> Optional[ModelT]:
+    """
+    按 (模型, 主键) 在本次请求内缓存ORM对象
+
+    同一请求中多个依赖项与接口函数读取同一行时只查询一次数据库；
+    未找到的记录同样会被缓存（值为 None）。
+
+    Args:
+        request: 当前请求
+        db: 数据库会话
+        model: ORM模型类
+        pk: 主键值
+        *options: 首次加载时使用的加载选项（如 joinedload）
+    """
+    cache = getattr(request.state, "orm_cache", None)
+    if cache is None:
+        cache = request.state.orm_cache = {}
+
+    key = (model, pk)
+    if key not in cache:
+        cache[key] = db.get(model, pk, options=options or None)
+    return cache[key]
+
+
+def require_migrations_done() -> None:
+    """要求数据库迁移已完成（后台迁移期间依赖数据库的接口返回503）"""
+    if migrations.MIGRATION_STATE != migrations.MigrationState.READY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="数据库迁移进行中，请稍后重试"
+        )
+
+
+@lru_cache(maxsize=8)
 def require_role(*allowed_roles: UserRole):
-    """角色权限装饰器"""
+    """角色权限装饰器
+
+    相同的角色组合返回同一个依赖函数，FastAPI 才能在同一请求内复用其结果，
+    不会因多处 Depends(require_role(...)) 而重复执行。
+    """
     def role_checker(current_user: CurrentUserResponse = Depends(get_current_user)) -> CurrentUserResponse:
         # Convert string role to UserRole for comparison
         role_str = current_user.role
@@ -311,19 +385,8 @@ async def require_token_permission(permission: str):
                     detail="无效的API Token"
                 )
 
-            # 检查权限
-            permission_map = {
-                'read_samples': api_token.can_read_samples,
-                'write_samples': api_token.can_write_samples,
-                'recognize': api_token.can_recognize,
-                'read_users': api_token.can_read_users,
-                'manage_users': api_token.can_manage_users,
-                'manage_schools': api_token.can_manage_schools,
-                'manage_training': api_token.can_manage_training,
-                'manage_system': api_token.can_manage_system
-            }
-
-            if not permission_map.get(permission, False):
+            # 检查权限（权限位掩码按位与）
+            if not api_token.has_permission(permission):
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail=f"缺少所需权限: {permission}。Token需要包含此权限才能访问此端点。"
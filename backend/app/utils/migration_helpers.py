@@ -0,0 +1,97 @@
+"""
+Alembic 迁移辅助函数
+
+用于在迁移脚本中执行尽量不阻塞线上读写的 DDL 操作
+"""
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.schema import CreateColumn
+
+
+def create_index_nonblocking(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    unique: bool = False
+) -> None:
+    """
+    以不锁表的方式创建索引
+
+    - PostgreSQL: CREATE INDEX CONCURRENTLY（需在事务之外执行）
+    - MySQL: ALGORITHM=INPLACE, LOCK=NONE（Online DDL）
+    - 其他数据库: 退回到普通的 op.create_index
+
+    Args:
+        name: 索引名称
+        table: 表名
+        columns: 索引列
+        unique: 是否为唯一索引
+    """
+    context = op.get_context()
+    dialect = context.dialect.name
+    unique_sql = "UNIQUE " if unique else ""
+    column_sql = ", ".join(columns)
+
+    if dialect == "postgresql":
+        with context.autocommit_block():
+            op.execute(
+                f"CREATE {unique_sql}INDEX CONCURRENTLY {name} ON {table} ({column_sql})"
+            )
+    elif dialect == "mysql":
+        op.execute(
+            f"CREATE {unique_sql}INDEX {name} ON {table} ({column_sql}) "
+            f"ALGORITHM=INPLACE LOCK=NONE"
+        )
+    else:
+        op.create_index(name, table, list(columns), unique=unique)
+
+
+def add_columns(table: str, *columns: sa.Column) -> None:
+    """
+    在一条 ALTER TABLE 语句中添加多列
+
+    MySQL 下合并为单条 ALTER TABLE，避免逐列重建表；MySQL 8.0.12+
+    额外指定 ALGORITHM=INSTANT（仅修改元数据）。其他数据库逐列调用
+    op.add_column。
+
+    Args:
+        table: 表名
+        *columns: 要添加的列定义
+    """
+    context = op.get_context()
+    dialect = context.dialect
+
+    if dialect.name != "mysql":
+        for column in columns:
+            op.add_column(table, column)
+        return
+
+    # 列需绑定到表上才能编译出完整的列定义
+    sa.Table(table, sa.MetaData(), *columns)
+    column_specs = ", ".join(
+        f"ADD COLUMN {CreateColumn(column).compile(dialect=dialect)}"
+        for column in columns
+    )
+    algorithm = ""
+    if (dialect.server_version_info or ()) >= (8, 0, 12):
+        algorithm = ", ALGORITHM=INSTANT"
+    op.execute(f"ALTER TABLE {table} {column_specs}{algorithm}")
+
+
+def drop_columns(table: str, *column_names: str) -> None:
+    """
+    在一条 ALTER TABLE 语句中删除多列
+
+    Args:
+        table: 表名
+        *column_names: 要删除的列名
+    """
+    if op.get_context().dialect.name != "mysql":
+        for column_name in column_names:
+            op.drop_column(table, column_name)
+        return
+
+    column_specs = ", ".join(f"DROP COLUMN {name}" for name in column_names)
+    op.execute(f"ALTER TABLE {table} {column_specs}")
@@ -0,0 +1,34 @@
+"""
+配置重载时需要清空的缓存
+依赖配置值的缓存在模块导入时登记清空函数，/api/system/reload 重载配置后统一调用
+"""
+from typing import Callable, List
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+_reload_hooks: List[Callable[[], None]] = []
+
+
+def on_settings_reload(clear: Callable[[], None]) -> Callable[[], None]:
+    """
+    登记配置重载后需要调用的清空函数
+
+    Args:
+        clear: 无参数的清空函数（如 lru_cache 的 cache_clear、TTLCache.clear）
+
+    Returns:
+        原函数，便于直接在赋值语句中使用
+    """
+    _reload_hooks.append(clear)
+    return clear
+
+
+def clear_settings_caches() -> None:
+    """调用所有已登记的清空函数（单个失败不影响其他缓存）"""
+    for clear in _reload_hooks:
+        try:
+            clear()
+        except Exception as e:
+            logger.error(f"清空缓存失败: {str(e)}", exc_info=True)
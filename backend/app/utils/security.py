@@ -1,8 +1,20 @@
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional
+import asyncio
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from ..core.config import settings
+from .cache import get_cache
+from .ttl_cache import TTLCache
 
 pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
 
@@ -17,16 +29,111 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# 密码哈希是CPU密集型操作（argon2/bcrypt），在进程池中执行才能真正利用多核，
+# 同时避免阻塞事件循环。进程池在首次使用时创建，使用spawn方式启动子进程，
+# 避免fork时继承父进程中的线程、数据库连接等状态。
+_password_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_password_pool() -> ProcessPoolExecutor:
+    """获取密码哈希进程池"""
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _password_pool
+
+
+def shutdown_password_pool() -> None:
+    """关闭密码哈希进程池（应用关闭时调用）"""
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """在进程池中验证密码"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_password_pool(), verify_password, plain_password, hashed_password
+    )
+
+
+# 最近校验失败的凭据（键为 HMAC(用户名, 密码哈希, 密码)，不保存明文密码）。
+# 键包含密码哈希，用户修改密码后旧的失败记录自然不再命中。
+_failed_credentials = TTLCache(ttl=lambda: settings.FAILED_LOGIN_CACHE_TTL_SECONDS, maxsize=10000)
+
+
+def _credentials_key(username: str, hashed_password: str, plain_password: str) -> bytes:
+    message = "\0".join((username, hashed_password, plain_password)).encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+
+
+async def averify_credentials(username: str, plain_password: str, hashed_password: str) -> bool:
+    """
+    验证用户凭据
+
+    短时间内重复提交同一组错误凭据时直接拒绝，不再在进程池中计算密码哈希，
+    降低暴力尝试对CPU的占用；首次校验与正确凭据的处理不受影响。
+    """
+    key = _credentials_key(username, hashed_password, plain_password)
+    if _failed_credentials.get(key) is not None:
+        return False
+
+    password_ok = await averify_password(plain_password, hashed_password)
+    if not password_ok:
+        _failed_credentials.set(key, True)
+    return password_ok
+
+
+async def aget_password_hash(password: str) -> str:
+    """在进程池中生成密码哈希"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_password_pool(), get_password_hash, password)
+
+
+def _b64url(data: bytes) -> bytes:
+    """Base64URL编码（去除填充）"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# HMAC 算法对应的摘要函数；JWT头部对同一算法恒定，预先编码
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+_JWT_HEADERS_B64 = {
+    alg: _b64url(json.dumps({"alg": alg, "typ": "JWT"}, separators=(",", ":")).encode())
+    for alg in _HMAC_DIGESTS
+}
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """创建JWT访问令牌"""
+    """创建JWT访问令牌
+
+    HMAC 算法（HS256/HS384/HS512）直接拼接预编码的头部并计算签名，
+    省去 jose 每次编码时的算法查找与头部序列化；其他算法仍交给 jose。
+    """
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+
+    digestmod = _HMAC_DIGESTS.get(settings.ALGORITHM)
+    if digestmod is None:
+        to_encode.update({"exp": expire})
+        return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    to_encode["exp"] = calendar.timegm(expire.utctimetuple())
+    payload_b64 = _b64url(json.dumps(to_encode, separators=(",", ":")).encode())
+    signing_input = _JWT_HEADERS_B64[settings.ALGORITHM] + b"." + payload_b64
+    signature = hmac.new(settings.SECRET_KEY.encode(), signing_input, digestmod).digest()
+    return (signing_input + b"." + _b64url(signature)).decode()
 
 
 def decode_access_token(token: str) -> Optional[dict]:
@@ -36,3 +143,41 @@ def decode_access_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+
+TOKEN_BLACKLIST_PREFIX = "token_blacklist:"
+
+
+def _blacklist_key(token: str) -> str:
+    """黑名单缓存键（使用token摘要，避免在缓存中保存完整token）"""
+    return TOKEN_BLACKLIST_PREFIX + hashlib.sha256(token.encode()).hexdigest()
+
+
+def add_token_to_blacklist(token: str, expires_at: Optional[int] = None) -> None:
+    """将JWT令牌加入黑名单
+
+    黑名单保存在共享缓存（Redis）中，多个worker进程可见；
+    过期时间与令牌剩余有效期一致，令牌失效后条目自动清除。
+
+    Args:
+        token: JWT令牌
+        expires_at: 令牌的exp声明（Unix时间戳），为空时使用默认有效期
+    """
+    if expires_at is not None:
+        ttl = int(expires_at - time.time())
+        if ttl <= 0:
+            # 令牌已过期，无需加入黑名单
+            return
+    else:
+        ttl = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    get_cache().set(_blacklist_key(token), 1, ttl=ttl)
+
+
+def is_token_blacklisted(token: str) -> bool:
+    """检查JWT令牌是否已被加入黑名单"""
+    return get_cache().exists(_blacklist_key(token))
+
+
+async def ais_token_blacklisted(token: str) -> bool:
+    """在线程池中检查JWT令牌是否已被加入黑名单（Redis 访问不阻塞事件循环）"""
+    return await asyncio.to_thread(is_token_blacklisted, token)
@@ -3,12 +3,13 @@
 支持JSON格式输出、日志轮转、多级别日志
 """
 import logging
+import queue
 import sys
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, Optional
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from typing import Any, Dict, List, Optional
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler, QueueHandler, QueueListener
 from pythonjsonlogger import jsonlogger
 
 
@@ -43,6 +44,44 @@ class JsonFormatter(jsonlogger.JsonFormatter):
             }
 
 
+# 异步日志队列容量：队列满时丢弃新日志，避免日志风暴拖慢请求处理
+LOG_QUEUE_MAXSIZE = 10_000
+
+# 已启动的后台日志监听器（应用关闭时统一停止并刷出剩余日志）
+_listeners: List[QueueListener] = []
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """进程内队列处理器
+
+    标准 QueueHandler 会在调用线程中格式化消息和异常堆栈；这里的队列只在
+    本进程内使用，记录无需序列化，因此原样入队，格式化全部交给后台线程。
+
+    队列已满时直接丢弃记录并计入 dropped：标准实现会把 queue.Full 交给
+    handleError，在调用线程中向 stderr 同步输出整段错误堆栈，日志风暴时反而更慢。
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # handle() 持有处理器锁，计数无需额外加锁
+            self.dropped += 1
+
+
+def stop_structured_loggers() -> None:
+    """停止所有后台日志监听器，并写出队列中剩余的日志"""
+    while _listeners:
+        _listeners.pop().stop()
+
+
 class StructuredLogger:
     """结构化日志管理器"""
 
@@ -55,7 +94,8 @@ class StructuredLogger:
         enable_console: bool = True,
         enable_file: bool = True,
         max_bytes: int = 10 * 1024 * 1024,  # 10MB
-        backup_count: int = 10
+        backup_count: int = 10,
+        enable_async: bool = True
     ):
         """
         初始化结构化日志管理器
@@ -69,6 +109,7 @@ class StructuredLogger:
             enable_file: 是否输出到文件
             max_bytes: 单个日志文件最大字节数
             backup_count: 保留的备份文件数量
+            enable_async: 是否通过队列在后台线程中格式化并写出日志
         """
         self.name = name
         self.log_dir = Path(log_dir)
@@ -100,12 +141,24 @@ class StructuredLogger:
         )
 
         # 添加处理器
+        self._handlers: List[logging.Handler] = []
         if enable_console:
             self._add_console_handler()
 
         if enable_file:
             self._add_file_handlers(max_bytes, backup_count)
 
+        if enable_async:
+            # 调用方只需将日志记录放入队列，格式化和文件写入由后台线程完成
+            log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+            self.logger.addHandler(_InProcessQueueHandler(log_queue))
+            listener = QueueListener(log_queue, *self._handlers, respect_handler_level=True)
+            listener.start()
+            _listeners.append(listener)
+        else:
+            for handler in self._handlers:
+                self.logger.addHandler(handler)
+
     def _add_console_handler(self):
         """添加控制台处理器"""
         console_handler = logging.StreamHandler(sys.stdout)
@@ -116,7 +169,7 @@ class StructuredLogger:
         else:
             console_handler.setFormatter(self.text_formatter)
 
-        self.logger.addHandler(console_handler)
+        self._handlers.append(console_handler)
 
     def _add_file_handlers(self, max_bytes: int, backup_count: int):
         """添加文件处理器"""
@@ -130,7 +183,7 @@ class StructuredLogger:
         )
         main_handler.setLevel(self.log_level)
         main_handler.setFormatter(self.json_formatter if self.enable_json else self.text_formatter)
-        self.logger.addHandler(main_handler)
+        self._handlers.append(main_handler)
 
         # 错误日志文件（ERROR及以上）
         error_handler = RotatingFileHandler(
@@ -141,7 +194,7 @@ class StructuredLogger:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(self.json_formatter if self.enable_json else self.text_formatter)
-        self.logger.addHandler(error_handler)
+        self._handlers.append(error_handler)
 
         # 慢请求日志文件（用于性能监控）
         slow_handler = RotatingFileHandler(
@@ -152,7 +205,7 @@ class StructuredLogger:
         )
         slow_handler.setLevel(logging.WARNING)
         slow_handler.setFormatter(self.json_formatter if self.enable_json else self.text_formatter)
-        self.logger.addHandler(slow_handler)
+        self._handlers.append(slow_handler)
 
     def _log_with_context(self, level: int, message: str, context: Dict[str, Any] = None):
         """带上下文的日志记录"""
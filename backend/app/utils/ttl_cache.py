@@ -0,0 +1,70 @@
+"""
+进程内TTL缓存
+用于缓存短时间内可复用的只读计算结果（如监控汇总数据）
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """线程安全的进程内TTL缓存"""
+
+    def __init__(self, ttl: Optional[Callable[[], float]] = None, maxsize: Optional[int] = None):
+        """
+        Args:
+            ttl: 返回过期时间（秒）的函数，每次写入时调用，便于配置重载后立即生效
+            maxsize: 最大条目数，超出时淘汰最早写入的条目（None 表示不限制）
+        """
+        self._ttl = ttl or (lambda: 0)
+        self._maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取未过期的缓存值，不存在或已过期时返回None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存值
+
+        Args:
+            ttl: 本次写入的过期时间（秒），为空时使用构造时传入的 ttl 函数
+        """
+        if ttl is None:
+            ttl = self._ttl()
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + ttl, value)
+            if self._maxsize is not None and len(self._data) > self._maxsize:
+                self._evict()
+
+    def _evict(self) -> None:
+        """超出容量时先清除已过期的条目，仍超出时淘汰最早写入的条目（调用方持有锁）"""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._data.items() if now >= expires_at]
+        for key in expired:
+            del self._data[key]
+        if len(self._data) > self._maxsize:
+            # dict 保持插入顺序，第一个键即最早写入的条目
+            del self._data[next(iter(self._data))]
+
+    def delete(self, key: Hashable) -> None:
+        """删除缓存值"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,222 @@
+"""
+multipart/form-data 上传的流式接收
+
+直接从 ASGI 请求体解析 multipart 数据，文件字段的内容边接收边写入目标目录下的
+临时文件，不再经过 Starlette UploadFile 的 SpooledTemporaryFile 中转（避免一次
+额外的完整读写）。写入时同步校验文件类型和大小，并计算文件内容摘要。
+"""
+import asyncio
+import contextlib
+import hashlib
+import os
+import secrets
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from .validators import upload_too_large_error
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# 普通表单字段的最大字节数
+MAX_FIELD_SIZE = 64 * 1024
+
+
+@dataclass
+class StreamedUpload:
+    """已写入磁盘的上传文件"""
+    field_name: str
+    filename: str
+    content_type: str
+    path: str
+    size: int
+    # 文件内容的 BLAKE2b 摘要（16位十六进制）
+    digest: str = ""
+
+
+def _decode(value: bytes) -> str:
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("latin-1")
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def _remove_if_exists(path: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+class _StreamingMultipartReceiver:
+    """解析器回调只记录数据，文件的打开和写入在异步循环中放到线程池执行"""
+
+    def __init__(self, upload_dir: str, max_size: int):
+        self.upload_dir = upload_dir
+        self.max_size = max_size
+        self.fields: Dict[str, str] = {}
+        self.upload: Optional[StreamedUpload] = None
+
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_name = b""
+        self._header_value = b""
+        self._field_name = ""
+        self._field_data = bytearray()
+        self._is_file = False
+        # 等待写入当前文件的数据块
+        self._pending: List[bytes] = []
+        self._file_opening = False
+        self._file: Optional[BinaryIO] = None
+        self._hash = hashlib.blake2b(digest_size=8)
+
+    # ---------- 解析器回调 ----------
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+        self._field_data = bytearray()
+        self._is_file = False
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if b"name" not in options:
+            raise _bad_request("无效的表单数据")
+        self._field_name = _decode(options[b"name"])
+
+        if b"filename" not in options:
+            return
+
+        if self.upload is not None:
+            raise _bad_request("一次只能上传一个文件")
+        content_type = _decode(self._headers.get(b"content-type", b""))
+        if not content_type.startswith("image/"):
+            raise _bad_request("只能上传图片文件")
+
+        self._is_file = True
+        self._file_opening = True
+        self.upload = StreamedUpload(
+            field_name=self._field_name,
+            filename=_decode(options[b"filename"]),
+            content_type=content_type,
+            path=os.path.join(self.upload_dir, f".upload_{secrets.token_hex(8)}.part"),
+            size=0,
+        )
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._is_file:
+            if len(self._field_data) + end - start > MAX_FIELD_SIZE:
+                raise _bad_request("表单字段过大")
+            self._field_data += data[start:end]
+            return
+
+        self.upload.size += end - start
+        if self.upload.size > self.max_size:
+            raise upload_too_large_error(self.max_size)
+        self._pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if not self._is_file:
+            self.fields[self._field_name] = _decode(bytes(self._field_data))
+
+    # ---------- 文件写入 ----------
+
+    def _write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self._file.write(data)
+
+    async def flush(self) -> None:
+        """把本轮解析出的文件数据写入磁盘"""
+        if self._file_opening:
+            self._file_opening = False
+            self._file = await asyncio.to_thread(open, self.upload.path, "wb")
+        if self._pending:
+            data = b"".join(self._pending)
+            self._pending.clear()
+            await asyncio.to_thread(self._write, data)
+
+    async def close(self) -> None:
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+    async def receive(self, request: Request) -> None:
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise _bad_request("请求必须为 multipart/form-data 格式")
+
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        })
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except HTTPException:
+                raise
+            except Exception:
+                raise _bad_request("无效的表单数据")
+            await self.flush()
+        parser.finalize()
+        if self.upload is not None:
+            self.upload.digest = self._hash.hexdigest()
+
+
+async def receive_upload(
+    request: Request,
+    upload_dir: str,
+    max_size: int,
+    file_field: str = "file"
+) -> Tuple[Dict[str, str], StreamedUpload]:
+    """
+    流式接收包含单个图片文件的 multipart 表单
+
+    文件内容写入 upload_dir 下的临时文件（StreamedUpload.path），由调用方
+    重命名到最终位置；处理失败时调用方负责删除该文件。
+
+    Args:
+        request: 请求对象
+        upload_dir: 临时文件所在目录（应与最终保存目录相同，以便直接重命名）
+        max_size: 文件最大字节数
+        file_field: 文件字段名
+
+    Returns:
+        (普通表单字段, 上传文件信息)
+
+    Raises:
+        HTTPException: 请求格式无效、文件类型不符或文件过大
+    """
+    receiver = _StreamingMultipartReceiver(upload_dir, max_size)
+    try:
+        try:
+            await receiver.receive(request)
+        finally:
+            await receiver.close()
+        if receiver.upload is None or receiver.upload.field_name != file_field:
+            raise _bad_request("缺少上传文件")
+    except BaseException:
+        if receiver.upload is not None:
+            await asyncio.to_thread(_remove_if_exists, receiver.upload.path)
+        raise
+
+    return receiver.fields, receiver.upload
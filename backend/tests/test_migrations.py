@@ -0,0 +1,60 @@
+"""
+测试启动迁移状态
+验证 skip 模式下无需经过 lifespan 即可处理请求，后台迁移期间接口返回503、完成后恢复
+"""
+import sys
+import os
+import asyncio
+import importlib
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import migrations
+from app.core.config import settings
+from app.utils.dependencies import require_migrations_done
+
+
+def _guarded_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/ping", dependencies=[Depends(require_migrations_done)])
+    def ping():
+        return {"ok": True}
+
+    # 不使用 with，lifespan 不会执行
+    return TestClient(app)
+
+
+def test_skip_mode_is_ready_without_lifespan(monkeypatch):
+    """skip 模式下模块加载后即为 READY"""
+    monkeypatch.setattr(settings, "MIGRATION_MODE", "skip")
+    try:
+        importlib.reload(migrations)
+        assert migrations.get_migration_status()["state"] == "ready"
+        assert _guarded_client().get("/ping").status_code == 200
+    finally:
+        monkeypatch.undo()
+        importlib.reload(migrations)
+
+
+def test_async_migration_returns_503_until_done(monkeypatch):
+    """后台迁移完成前返回503，完成后正常处理请求"""
+    release = threading.Event()
+    monkeypatch.setattr(migrations, "run_alembic_upgrade", lambda: release.wait(5))
+    monkeypatch.setattr(migrations, "MIGRATION_STATE", migrations.MIGRATION_STATE)
+    client = _guarded_client()
+
+    async def scenario():
+        task = await migrations.start_migrations("async")
+        assert client.get("/ping").status_code == 503
+
+        release.set()
+        await task
+        assert migrations.get_migration_status()["state"] == "ready"
+        assert client.get("/ping").status_code == 200
+
+    asyncio.run(scenario())
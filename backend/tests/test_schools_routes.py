@@ -0,0 +1,23 @@
+"""
+测试学校API路由
+验证学校路由只在一个模块中以 /schools 前缀注册一次
+"""
+import sys
+import os
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api import schools
+
+
+def test_school_routes_are_unique():
+    """每个 (方法, 路径) 只注册一个处理函数"""
+    seen = set()
+    for route in schools.router.routes:
+        for method in route.methods:
+            key = (method, route.path)
+            assert key not in seen, f"重复的路由: {method} {route.path}"
+            seen.add(key)
+
+    assert all(path.startswith("/schools") for _, path in seen)
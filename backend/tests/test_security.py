@@ -0,0 +1,60 @@
+"""
+测试JWT令牌黑名单
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.security import (
+    create_access_token,
+    decode_access_token,
+    add_token_to_blacklist,
+    is_token_blacklisted,
+)
+from app.utils import ttl_cache
+from app.utils.cache import CacheManager
+
+
+def test_blacklisted_token_is_rejected():
+    """登出后的令牌应被识别为已加入黑名单"""
+    token = create_access_token({"sub": "blacklist_user"})
+    payload = decode_access_token(token)
+
+    assert not is_token_blacklisted(token)
+    add_token_to_blacklist(token, payload["exp"])
+    assert is_token_blacklisted(token)
+
+
+def test_expired_token_is_not_stored():
+    """已过期的令牌无需加入黑名单"""
+    token = create_access_token({"sub": "expired_user"})
+    add_token_to_blacklist(token, int(time.time()) - 10)
+    assert not is_token_blacklisted(token)
+
+
+def test_memory_cache_entries_expire(monkeypatch):
+    """Redis 不可用时，内存缓存中的条目同样按 ttl 过期"""
+    cache = CacheManager()
+    cache.set("token_blacklist:expiring", 1, ttl=60)
+    assert cache.exists("token_blacklist:expiring")
+
+    now = time.monotonic()
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now + 61)
+    assert not cache.exists("token_blacklist:expiring")
+    assert cache.get("token_blacklist:expiring") is None
+
+
+def test_access_token_is_standard_jwt():
+    """自行编码的令牌应能被标准JWT库校验"""
+    from jose import jwt
+    from app.core.config import settings
+
+    token = create_access_token({"sub": "jwt_user", "role": "student"})
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    assert payload["sub"] == "jwt_user"
+    assert payload["role"] == "student"
+    assert isinstance(payload["exp"], int)
+    assert jwt.get_unverified_header(token) == {"alg": settings.ALGORITHM, "typ": "JWT"}
@@ -0,0 +1,140 @@
+"""
+测试 multipart 上传的流式接收
+验证文件大小、字段、类型校验，以及失败时临时文件被删除
+"""
+import sys
+import os
+import asyncio
+import hashlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.utils.upload_stream import MAX_FIELD_SIZE, receive_upload
+
+BOUNDARY = "test-boundary"
+MAX_SIZE = 4096
+# 请求体分块送达，文件数据分多轮写入临时文件（出错时临时文件已存在）
+CHUNK_SIZE = 512
+IMAGE = b"\x89PNG" + b"x" * 1996
+
+
+def _part(name: str, data: bytes, filename: str = None, content_type: str = None) -> bytes:
+    disposition = f'form-data; name="{name}"'
+    if filename is not None:
+        disposition += f'; filename="{filename}"'
+    headers = f"Content-Disposition: {disposition}\r\n"
+    if content_type is not None:
+        headers += f"Content-Type: {content_type}\r\n"
+    return f"--{BOUNDARY}\r\n{headers}\r\n".encode() + data + b"\r\n"
+
+
+def _request(*parts: bytes) -> Request:
+    body = b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+    chunks = [body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/upload",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+    }
+    return Request(scope, receive)
+
+
+def _receive(upload_dir, *parts: bytes):
+    return asyncio.run(receive_upload(_request(*parts), str(upload_dir), MAX_SIZE))
+
+
+def _rejected(upload_dir, *parts: bytes) -> HTTPException:
+    with pytest.raises(HTTPException) as exc_info:
+        _receive(upload_dir, *parts)
+    # 失败时不留下临时文件
+    assert os.listdir(upload_dir) == []
+    return exc_info.value
+
+
+def test_upload_digest_and_size(tmp_path):
+    """正常上传：返回文件大小、摘要和普通表单字段"""
+    fields, upload = _receive(
+        tmp_path,
+        _part("user_id", b"42"),
+        _part("file", IMAGE, filename="a.png", content_type="image/png"),
+    )
+
+    assert fields == {"user_id": "42"}
+    assert upload.field_name == "file"
+    assert upload.filename == "a.png"
+    assert upload.content_type == "image/png"
+    assert upload.size == len(IMAGE)
+    assert upload.digest == hashlib.blake2b(IMAGE, digest_size=8).hexdigest()
+    with open(upload.path, "rb") as f:
+        assert f.read() == IMAGE
+
+
+def test_oversize_upload_is_rejected_and_removed(tmp_path):
+    """超过大小限制返回413，已写入的临时文件被删除"""
+    error = _rejected(
+        tmp_path,
+        _part("file", b"x" * (MAX_SIZE * 3), filename="big.png", content_type="image/png"),
+    )
+    assert error.status_code == 413
+
+
+def test_missing_file_field(tmp_path):
+    """没有文件字段时返回400"""
+    error = _rejected(tmp_path, _part("user_id", b"42"))
+    assert error.status_code == 400
+    assert error.detail == "缺少上传文件"
+
+
+def test_misnamed_file_field(tmp_path):
+    """文件字段名不符时返回400"""
+    error = _rejected(
+        tmp_path,
+        _part("image", IMAGE, filename="a.png", content_type="image/png"),
+    )
+    assert error.status_code == 400
+    assert error.detail == "缺少上传文件"
+
+
+def test_non_image_part_is_rejected(tmp_path):
+    """非图片类型返回400"""
+    error = _rejected(
+        tmp_path,
+        _part("file", b"hello", filename="a.txt", content_type="text/plain"),
+    )
+    assert error.status_code == 400
+    assert error.detail == "只能上传图片文件"
+
+
+def test_two_file_parts_are_rejected(tmp_path):
+    """一次只能上传一个文件"""
+    error = _rejected(
+        tmp_path,
+        _part("file", IMAGE, filename="a.png", content_type="image/png"),
+        _part("file", IMAGE, filename="b.png", content_type="image/png"),
+    )
+    assert error.status_code == 400
+    assert error.detail == "一次只能上传一个文件"
+
+
+def test_oversize_form_field_is_rejected(tmp_path):
+    """普通表单字段超过 MAX_FIELD_SIZE 时返回400"""
+    error = _rejected(
+        tmp_path,
+        _part("file", IMAGE, filename="a.png", content_type="image/png"),
+        _part("note", b"n" * (MAX_FIELD_SIZE + 1)),
+    )
+    assert error.status_code == 400
+    assert error.detail == "表单字段过大"
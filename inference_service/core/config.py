@@ -5,6 +5,8 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     GRPC_HOST: str = "0.0.0.0"
     GRPC_PORT: int = 50051
+    # 单个gRPC消息的最大字节数（识别请求直接携带图片数据，需大于后端的上传大小上限）
+    GRPC_MAX_MESSAGE_SIZE: int = 16 * 1024 * 1024
     MODEL_DIR: str = "./models"
     DEFAULT_MODEL_VERSION: str = "latest"
     SIMILARITY_THRESHOLD: float = 0.7
@@ -51,25 +51,18 @@ class HandwritingInferenceServicer(handwriting_inference_pb2_grpc.HandwritingInf
     async def Recognize(self, request, context):
         """单张图片识别"""
         try:
-            # 获取图片数据
+            top_k = request.top_k if request.top_k > 0 else settings.TOP_K
+
+            # 执行识别：二进制数据直接在内存中解码，无需写入临时文件
             if request.image_path:
-                image_path = request.image_path
+                result = await self.recognizer.recognize(request.image_path, top_k=top_k)
             elif request.image_data:
-                # 如果提供的是二进制数据，需要先保存
-                import tempfile
-                import os
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp:
-                    tmp.write(request.image_data)
-                    image_path = tmp.name
+                result = await self.recognizer.recognize(top_k=top_k, image_data=request.image_data)
             else:
                 context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
                 context.set_details("必须提供image_path或image_data")
                 return handwriting_inference_pb2.RecognizeResponse()
             
-            # 执行识别
-            top_k = request.top_k if request.top_k > 0 else settings.TOP_K
-            result = await self.recognizer.recognize(image_path, top_k=top_k)
-            
             # 构建响应
             response = handwriting_inference_pb2.RecognizeResponse()
             for r in result["top_k"]:
@@ -83,10 +76,6 @@ class HandwritingInferenceServicer(handwriting_inference_pb2_grpc.HandwritingInf
             response.is_unknown = result["is_unknown"]
             response.confidence = result["confidence"]
             
-            # 清理临时文件
-            if not request.image_path and request.image_data:
-                os.unlink(image_path)
-            
             return response
         except Exception as e:
             logger.error(f"识别失败: {str(e)}")
@@ -245,7 +234,7 @@ class HandwritingInferenceServicer(handwriting_inference_pb2_grpc.HandwritingInf
 
                 result = conn.execute(text(f"""
                     SELECT s.id, s.user_id, s.image_path, s.extracted_region_path,
-                           sr.bbox
+                           sr.x, sr.y, sr.w, sr.h
                     FROM samples s
                     LEFT JOIN sample_regions sr ON s.id = sr.sample_id
                     WHERE s.image_path IN ({placeholders})
@@ -256,9 +245,10 @@ class HandwritingInferenceServicer(handwriting_inference_pb2_grpc.HandwritingInf
                 new_samples = []
                 for row in result:
                     annotation_data = None
-                    if row[4]:  # bbox
-                        import json
-                        annotation_data = {"bbox": json.loads(row[4])}
+                    if row[4] is not None:  # 区域坐标
+                        annotation_data = {
+                            "bbox": {"x": row[4], "y": row[5], "width": row[6], "height": row[7]}
+                        }
 
                     new_samples.append({
                         "id": row[0],
@@ -334,7 +324,10 @@ class HandwritingInferenceServicer(handwriting_inference_pb2_grpc.HandwritingInf
 
 async def serve():
     """启动gRPC服务器"""
-    server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.aio.server(
+        futures.ThreadPoolExecutor(max_workers=10),
+        options=[("grpc.max_receive_message_length", settings.GRPC_MAX_MESSAGE_SIZE)]
+    )
     handwriting_inference_pb2_grpc.add_HandwritingInferenceServicer_to_server(
         HandwritingInferenceServicer(), server
     )
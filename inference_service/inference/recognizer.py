@@ -81,14 +81,27 @@ class Recognizer:
             logger.error(f"加载用户特征失败: {str(e)}")
             return {}
     
-    async def recognize(self, image_path: str, top_k: int = 5) -> Dict:
-        """识别单张图片"""
+    async def recognize(
+        self,
+        image_path: Optional[str] = None,
+        top_k: int = 5,
+        image_data: Optional[bytes] = None
+    ) -> Dict:
+        """识别单张图片（image_path 与 image_data 二选一，后者直接在内存中解码）"""
         try:
             # 预处理图片
-            processed_image, extracted_path = self.image_processor.process_sample(
-                image_path,
-                separation_mode="auto"
-            )
+            if image_data is not None:
+                processed_image, extracted_path = self.image_processor.process_sample(
+                    None,
+                    separation_mode="auto",
+                    save_processed=False,
+                    image=self.image_processor.decode_image(image_data)
+                )
+            else:
+                processed_image, extracted_path = self.image_processor.process_sample(
+                    image_path,
+                    separation_mode="auto"
+                )
             
             # 提取融合特征
             query_features = self.feature_fusion.extract_fused_features(processed_image)
@@ -52,6 +52,13 @@ class ImageProcessor:
 
         raise FileNotFoundError(f"图片文件不存在: {image_path}")
     
+    def decode_image(self, data: bytes) -> np.ndarray:
+        """从内存中的图片数据解码（无需先写入临时文件）"""
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError("无法解码图片数据")
+        return image
+
     def crop_region(self, image: np.ndarray, bbox: Dict) -> np.ndarray:
         """裁剪指定区域"""
         x = bbox.get("x", 0)
@@ -69,10 +76,11 @@ class ImageProcessor:
     
     def process_sample(
         self,
-        image_path: str,
+        image_path: Optional[str],
         separation_mode: str = "auto",
         annotation: Optional[Dict] = None,
-        save_processed: bool = True
+        save_processed: bool = True,
+        image: Optional[np.ndarray] = None
     ) -> Tuple[np.ndarray, Optional[str]]:
         """
         处理样本图片
@@ -81,13 +89,15 @@ class ImageProcessor:
             image_path: 图片路径
             separation_mode: 分离模式 ("auto", "color", "texture", "edge", "none")
             annotation: 手动标注的区域信息 {"bbox": {"x": 10, "y": 20, "width": 100, "height": 50}}
-            save_processed: 是否保存处理后的图片
+            save_processed: 是否保存处理后的图片（没有 image_path 时不保存）
+            image: 已解码的图片，提供时不再从 image_path 读取
         
         Returns:
             (processed_image, extracted_path)
         """
         # 加载图片
-        image = self.load_image(image_path)
+        if image is None:
+            image = self.load_image(image_path)
         
         # 提取手写区域
         handwriting_region = None
@@ -135,7 +145,7 @@ class ImageProcessor:
         processed_image = enhanced.astype(np.float32) / 255.0
         
         # 保存处理后的图片
-        if save_processed:
+        if save_processed and image_path:
             base_name = os.path.basename(image_path)
             name, ext = os.path.splitext(base_name)
             extracted_path = os.path.join(self.output_dir, f"{name}_processed{ext}")
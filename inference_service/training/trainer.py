@@ -103,14 +103,14 @@ class Trainer:
 
                 # 获取区域信息（用于fallback）
                 region_result = db.execute(
-                    text("SELECT bbox FROM sample_regions WHERE sample_id = :sample_id LIMIT 1"),
+                    text("SELECT x, y, w, h FROM sample_regions WHERE sample_id = :sample_id LIMIT 1"),
                     {"sample_id": sample_id}
                 ).first()
 
                 annotation_data = None
                 if region_result:
-                    import json
-                    annotation_data = {"bbox": json.loads(region_result[0])}
+                    x, y, w, h = region_result
+                    annotation_data = {"bbox": {"x": x, "y": y, "width": w, "height": h}}
 
                 result.append({
                     "id": sample_id,
@@ -520,7 +520,7 @@ class Trainer:
                         
                         # 检查是否存在
                         existing = db.execute(
-                            text("SELECT id FROM user_features WHERE user_id = :user_id"),
+                            text("SELECT user_id FROM user_features WHERE user_id = :user_id"),
                             {"user_id": user_id}
                         ).first()
                         